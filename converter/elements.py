@@ -1,20 +1,29 @@
 import os.path
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
+from typing import Optional
 
 from loguru import logger
 
+from converter.stage_hooks import stage
 from docrecjson.elements import Document
 
 
 @dataclass
 class ConverterDocument:
+    """
+    original holds the raw input bytes if they were read into memory, the handlers of this module parse memory-mapped
+    files directly and leave it empty.
+    original and tmp_type are only needed while converting, release_input() drops them afterwards.
+    """
+    __slots__ = ("filepath", "filename", "original", "tmp_type", "_shared_file_format_document")
+
     filepath: str
     filename: str
 
-    original: str
-    tmp_type = None
-    _shared_file_format_document: Document
+    original: Optional[bytes]
+    tmp_type: object
+    _shared_file_format_document: Optional[Document]
 
     def __init__(self, filepath: str, original, tmp_type):
         self.filepath = filepath
@@ -22,6 +31,15 @@ class ConverterDocument:
 
         self.original = original
         self.tmp_type = tmp_type
+        self._shared_file_format_document = None
+
+    def release_input(self):
+        """
+        Drops the references to the input text and the parsed input type. Otherwise they would be kept alive as long as
+        the converted document.
+        """
+        self.original = None
+        self.tmp_type = None
 
     @property
     def shared_file_format_document(self) -> Document:
@@ -32,6 +50,19 @@ class ConverterDocument:
         self._shared_file_format_document = shared_file_format_document
 
 
+@dataclass
+class ConversionOptions:
+    """
+    Optional conversion steps, the default options convert the documents without any of them.
+    simplify_tolerance: Douglas-Peucker tolerance in pixels for all coordinates, None keeps the coordinates unchanged
+    geometry_features: adds the bounding box, area and centroid of each region and line polygon as content metadata
+    convert_words: adds the words and glyphs of each text line as content metadata
+    """
+    simplify_tolerance: Optional[float] = None
+    geometry_features: bool = False
+    convert_words: bool = False
+
+
 class ConversionStrategy(ABC):
     @abstractmethod
     def initialize(self, original: ConverterDocument) -> ConverterDocument:
@@ -96,6 +127,10 @@ class PageConversionStrategy(ConversionStrategy, ABC):
     def handle_chart_region(self, document: Document, chart_region) -> Document:
         pass
 
+    @abstractmethod
+    def handle_map_region(self, document: Document, map_region) -> Document:
+        pass
+
     @abstractmethod
     def handle_separator_region(self, document: Document, separator_region) -> Document:
         pass
@@ -124,16 +159,8 @@ class PageConversionStrategy(ConversionStrategy, ABC):
     def handle_unknown_region(self, document: Document, unknown_region) -> Document:
         pass
 
-
-class PageXML2019Strategy(ConversionStrategy):
-
-    def initialize(self, original: ConverterDocument) -> ConverterDocument:
-        pass
-
-    def add_metadata(self, original: ConverterDocument) -> ConverterDocument:
-        pass
-
-    def add_regions(self, original: ConverterDocument) -> ConverterDocument:
+    @abstractmethod
+    def handle_custom_region(self, document: Document, custom_region) -> Document:
         pass
 
 
@@ -154,8 +181,17 @@ class ConversionContext:
     def strategy(self, strategy: ConversionStrategy):
         self._strategy = strategy
 
+    @property
+    def converter_document(self) -> ConverterDocument:
+        return self._converter_doc
+
     def convert(self) -> Document:
-        self._converter_doc = self._strategy.initialize(self._converter_doc)
-        self._converter_doc = self._strategy.add_metadata(self._converter_doc)
-        self._converter_doc = self._strategy.add_regions(self._converter_doc)
+        filepath: str = self._converter_doc.filepath
+        with stage(filepath, "initialize"):
+            self._converter_doc = self._strategy.initialize(self._converter_doc)
+        with stage(filepath, "add_metadata"):
+            self._converter_doc = self._strategy.add_metadata(self._converter_doc)
+        with stage(filepath, "add_regions"):
+            self._converter_doc = self._strategy.add_regions(self._converter_doc)
+        self._converter_doc.release_input()
         return self._converter_doc.shared_file_format_document
@@ -0,0 +1,101 @@
+from types import ModuleType
+from typing import List, Sequence, Tuple
+
+# point lists up to this length are returned unchanged, simplifying them doesn't save anything
+_MIN_SIMPLIFIED_LENGTH: int = 4
+
+
+def require_numpy() -> ModuleType:
+    try:
+        import numpy
+    except ImportError as e:
+        raise RuntimeError("The geometry options of the conversion require the numpy package") from e
+    return numpy
+
+
+def _douglas_peucker(np: ModuleType, points, keep, start: int, end: int, tolerance: float):
+    """
+    Marks the points between start and end (inclusive) which are kept. Instead of recursing, the open ranges are kept
+    on a stack. The distances of all points of a range are computed at once.
+    """
+    stack: List[Tuple[int, int]] = [(start, end)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = points[last] - points[first]
+        offsets = points[first + 1:last] - points[first]
+        length: float = float(np.hypot(segment[0], segment[1]))
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            # perpendicular distance to the line through the first and the last point
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest: int = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index: int = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+
+def simplify(points: Sequence[Tuple[int, int]], tolerance: float, closed: bool = True) -> List[Tuple[int, int]]:
+    """
+    Douglas-Peucker simplification: removes all points which are closer than tolerance pixels to the simplified line.
+    A closed polygon is split at the point farthest from its first point, both halves are simplified separately and
+    the polygon keeps at least three points.
+    :param closed: True for polygons, False for polylines like baselines
+    :return: the kept points in their original order
+    """
+    if len(points) <= _MIN_SIMPLIFIED_LENGTH:
+        return list(points)
+    np = require_numpy()
+    array = np.asarray(points, dtype=np.float64)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = True
+    last: int = len(points) - 1
+    if closed:
+        offsets = array - array[0]
+        split: int = int(np.argmax(np.hypot(offsets[:, 0], offsets[:, 1])))
+        keep[split] = True
+        _douglas_peucker(np, array, keep, 0, split, tolerance)
+        # the second half ends at the first point again
+        ring = np.vstack((array[split:], array[:1]))
+        ring_keep = np.zeros(len(ring), dtype=bool)
+        _douglas_peucker(np, ring, ring_keep, 0, len(ring) - 1, tolerance)
+        keep[split:] |= ring_keep[:-1]
+    else:
+        keep[last] = True
+        _douglas_peucker(np, array, keep, 0, last, tolerance)
+    return [points[index] for index in np.flatnonzero(keep).tolist()]
+
+
+def polygon_features(polygons: Sequence[Sequence[Tuple[int, int]]]):
+    """
+    Computes the bounding box, area (shoelace formula) and centroid of all polygons at once. The points of all polygons
+    are concatenated into one array and the sums per polygon are reduced with numpy.add.reduceat.
+    Degenerate polygons without area get the mean of their points as centroid.
+    :param polygons: non-empty point lists
+    :return: bounding boxes (min x, min y, max x, max y), areas and centroids (x, y) as lists, one entry per polygon
+    """
+    np = require_numpy()
+    lengths = np.fromiter((len(polygon) for polygon in polygons), dtype=np.int64, count=len(polygons))
+    if len(lengths) == 0:
+        return [], [], []
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    points = np.array([point for polygon in polygons for point in polygon], dtype=np.float64).reshape(-1, 2)
+    x, y = points[:, 0], points[:, 1]
+    # the index of the next point of the same polygon, the last point is followed by the first one
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    cross = x * y[following] - x[following] * y
+    signed_area = np.add.reduceat(cross, starts) / 2
+    centroid_x = np.add.reduceat((x + x[following]) * cross, starts)
+    centroid_y = np.add.reduceat((y + y[following]) * cross, starts)
+    degenerate = signed_area == 0
+    divisor = np.where(degenerate, 1, 6 * signed_area)
+    centroids = np.stack((np.where(degenerate, np.add.reduceat(x, starts) / lengths, centroid_x / divisor),
+                          np.where(degenerate, np.add.reduceat(y, starts) / lengths, centroid_y / divisor)), axis=1)
+    bounding_boxes = np.stack((np.minimum.reduceat(x, starts), np.minimum.reduceat(y, starts),
+                               np.maximum.reduceat(x, starts), np.maximum.reduceat(y, starts)), axis=1)
+    return bounding_boxes.astype(np.int64).tolist(), np.abs(signed_area).tolist(), centroids.tolist()
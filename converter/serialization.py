@@ -0,0 +1,167 @@
+import json
+import sys
+from array import array
+from typing import Dict, List, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON: str = "json"
+MSGPACK: str = "msgpack"
+FORMATS: List[str] = [JSON, MSGPACK]
+EXTENSIONS: Dict[str, str] = {JSON: ".json", MSGPACK: ".msgpack"}
+
+# content keys holding a list of [x, y] points
+_COORDINATE_KEYS = ("polygon", "points")
+# msgpack extension types of point lists packed as little-endian int32 x0, y0, x1, y1, ...
+# _INT32_POINTS unpacks into [[x0, y0], ...], _INT32_FLAT into the flat list of the flat and delta geometry profiles
+_INT32_POINTS: int = 1
+_INT32_FLAT: int = 2
+
+NESTED: str = "nested"
+FLAT: str = "flat"
+DELTA: str = "delta"
+GEOMETRY_PROFILES: List[str] = [NESTED, FLAT, DELTA]
+
+
+def dumps(dct: dict, output_format: str = JSON) -> bytes:
+    """
+    :param dct: the result of Document.to_dict()
+    """
+    if output_format == JSON:
+        return json.dumps(dct, indent=2).encode("utf-8")
+    if output_format == MSGPACK:
+        return pack_msgpack(dct)
+    raise ValueError("Unknown output format [" + output_format + "], available formats are: " + str(FORMATS))
+
+
+def loads(content: bytes, output_format: str = JSON) -> dict:
+    if output_format == JSON:
+        return json.loads(content)
+    if output_format == MSGPACK:
+        return unpack_msgpack(content)
+    raise ValueError("Unknown output format [" + output_format + "], available formats are: " + str(FORMATS))
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("The msgpack output format requires the msgpack package")
+
+
+def _pack_points(points: list) -> Union[list, "msgpack.ExtType"]:
+    """
+    :return: the points as a typed int32 array, unchanged if they are no integers
+    """
+    flat: array = array("i")
+    try:
+        if all(isinstance(value, int) for value in points):
+            # the flat and delta geometry profiles
+            flat.extend(points)
+            code: int = _INT32_FLAT
+        else:
+            for point in points:
+                if len(point) != 2:
+                    return points
+                flat.extend(point)
+            code = _INT32_POINTS
+    except (TypeError, OverflowError):
+        return points
+    if sys.byteorder == "big":
+        flat.byteswap()
+    return msgpack.ExtType(code, flat.tobytes())
+
+
+def _unpack_points(code: int, data: bytes):
+    if code not in (_INT32_POINTS, _INT32_FLAT):
+        return msgpack.ExtType(code, data)
+    flat: array = array("i")
+    flat.frombytes(data)
+    if sys.byteorder == "big":
+        flat.byteswap()
+    if code == _INT32_FLAT:
+        return flat.tolist()
+    return [[flat[index], flat[index + 1]] for index in range(0, len(flat), 2)]
+
+
+def pack_msgpack(dct: dict) -> bytes:
+    """
+    Encodes the document as MessagePack. The point lists of the content are packed as int32 arrays instead of nested
+    lists, which is the largest part of a document.
+    """
+    _require_msgpack()
+    content: list = []
+    for element in dct.get("content", []):
+        packed: dict = dict(element)
+        for key in _COORDINATE_KEYS:
+            if key in packed:
+                packed[key] = _pack_points(packed[key])
+        content.append(packed)
+    return msgpack.packb(dict(dct, content=content) if "content" in dct else dct, use_bin_type=True)
+
+
+def unpack_msgpack(content: bytes) -> dict:
+    """
+    :return: the same dict as loading the json output, i.e. points are lists of [x, y] lists
+    """
+    _require_msgpack()
+    return msgpack.unpackb(content, raw=False, ext_hook=_unpack_points, strict_map_key=False)
+
+
+def _encode_points(points: list, profile: str) -> list:
+    flat: list = [value for point in points for value in point]
+    if profile == DELTA:
+        # the first point is absolute, every other value is the difference to the same coordinate of the previous point
+        return flat[:2] + [flat[index] - flat[index - 2] for index in range(2, len(flat))]
+    return flat
+
+
+def _decode_points(values: list, profile: str) -> list:
+    if profile == DELTA:
+        values = list(values)
+        for index in range(2, len(values)):
+            values[index] += values[index - 2]
+    return [[values[index], values[index + 1]] for index in range(0, len(values), 2)]
+
+
+def _map_points(dct: dict, profile: str, map_points) -> dict:
+    content: list = []
+    for element in dct.get("content", []):
+        mapped: dict = dict(element)
+        for key in _COORDINATE_KEYS:
+            if key in mapped:
+                mapped[key] = map_points(mapped[key], profile)
+        content.append(mapped)
+    return dict(dct, content=content)
+
+
+def encode_geometry(dct: dict, profile: str) -> dict:
+    """
+    Encodes the point lists of the content with the given geometry profile:
+    nested keeps [[x0, y0], [x1, y1], ...], flat stores [x0, y0, x1, y1, ...] and delta stores
+    [x0, y0, x1 - x0, y1 - y0, ...], which keeps the numbers small for the neighbouring points of a polygon.
+    Other profiles than nested are recorded in the geometry_profile key of the document, decode_geometry() undoes them.
+    :param dct: the result of Document.to_dict()
+    :return: dct itself for the nested profile, otherwise a copy
+    """
+    if profile == NESTED:
+        return dct
+    if profile not in GEOMETRY_PROFILES:
+        raise ValueError("Unknown geometry profile [" + profile + "], available profiles are: " +
+                         str(GEOMETRY_PROFILES))
+    encoded: dict = _map_points(dct, profile, _encode_points)
+    encoded["geometry_profile"] = profile
+    return encoded
+
+
+def decode_geometry(dct: dict) -> dict:
+    """
+    :return: the document with nested point lists, like written by the nested (default) geometry profile
+    """
+    profile: str = dct.get("geometry_profile", NESTED)
+    if profile == NESTED:
+        return dct
+    decoded: dict = _map_points(dct, profile, _decode_points)
+    del decoded["geometry_profile"]
+    return decoded
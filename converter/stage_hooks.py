@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+
+class StageHook:
+    """
+    Called around each stage of a conversion, in the thread which runs the stage.
+    """
+
+    def enter(self, filepath: str, stage_name: str):
+        pass
+
+    def exit(self, filepath: str, stage_name: str):
+        pass
+
+    def finish(self, filepath: str):
+        """
+        Called once the conversion of filepath ended, successfully or not.
+        """
+        pass
+
+
+_hooks: List[StageHook] = []
+# thread id -> (filepath, stage name) of the stages the thread is in, the innermost stage is the last one
+_stages: Dict[int, List[Tuple[str, str]]] = {}
+
+
+def add_hook(hook: StageHook):
+    _hooks.append(hook)
+
+
+def remove_hook(hook: StageHook):
+    _hooks.remove(hook)
+
+
+@contextmanager
+def stage(filepath: str, stage_name: str) -> Iterator[None]:
+    """
+    Marks a block as a stage of the conversion of filepath, e.g. the validation or add_regions.
+    The hooks are called in the order they were added and exited in the reverse order.
+    """
+    thread_id: int = threading.get_ident()
+    stack: List[Tuple[str, str]] = _stages.setdefault(thread_id, [])
+    stack.append((filepath, stage_name))
+    for hook in _hooks:
+        hook.enter(filepath, stage_name)
+    try:
+        yield
+    finally:
+        for hook in reversed(_hooks):
+            hook.exit(filepath, stage_name)
+        stack.pop()
+        if not stack:
+            del _stages[thread_id]
+
+
+def finish(filepath: str):
+    """
+    Marks the end of the conversion of filepath, successful or not, the hooks release what they kept for the file.
+    """
+    for hook in _hooks:
+        hook.finish(filepath)
+
+
+def current_stages() -> Dict[int, Tuple[str, str]]:
+    """
+    :return: the innermost stage of each thread which is currently in a stage, by thread id
+    """
+    return {thread_id: stack[-1] for thread_id, stack in list(_stages.items()) if stack}
@@ -0,0 +1,28 @@
+from typing import Sequence, Tuple
+
+from converter.strategies.page_xml_pyxb import PageXMLStrategyPyXB
+
+
+class PageXML2019StrategyPyXB(PageXMLStrategyPyXB):
+    """
+    Compared to 2017, PAGE 2019 adds MapRegion and CustomRegion, the table grid, metadata items, labels and the text
+    style of the page. They are handled by the shared engine as soon as they are present.
+    """
+    _VERSION: str = "2019-07-15"
+    _REGION_HANDLERS: Sequence[Tuple[str, str]] = (
+        ("TextRegion", "handle_text_regions"),
+        ("ImageRegion", "handle_image_region"),
+        ("LineDrawingRegion", "handle_line_drawing_region"),
+        ("GraphicRegion", "handle_graphic_region"),
+        ("TableRegion", "handle_table_region"),
+        ("ChartRegion", "handle_chart_region"),
+        ("MapRegion", "handle_map_region"),
+        ("SeparatorRegion", "handle_separator_region"),
+        ("MathsRegion", "handle_maths_region"),
+        ("ChemRegion", "handle_chem_region"),
+        ("MusicRegion", "handle_music_region"),
+        ("AdvertRegion", "handle_advert_region"),
+        ("NoiseRegion", "handle_noise_region"),
+        ("UnknownRegion", "handle_unknown_region"),
+        ("CustomRegion", "handle_custom_region"),
+    )
@@ -0,0 +1,954 @@
+import functools
+import re
+from datetime import date
+from typing import Sequence, Tuple, Optional, List, Dict
+
+from loguru import logger
+# noinspection PyProtectedMember
+from pyxb.binding.content import _PluralBinding
+from pyxb.binding.datatypes import boolean
+
+from converter import geometry
+from converter.elements import PageConversionStrategy, ConverterDocument, ConversionOptions
+# the bindings of the other PAGE versions share these type names, they are only imported as type hints
+from converter.strategies.generated.page_xml.py_xb_2017 import PcGtsType, UserDefinedType, TextRegionType, CoordsType, \
+    PointsType, TextLineType, BaselineType, TextEquivType, TextStyleType, PageType, LineDrawingRegionType, \
+    GraphicRegionType, TableRegionType, ChartRegionType, SeparatorRegionType, MathsRegionType, \
+    ChemRegionType, MusicRegionType, AdvertRegionType, NoiseRegionType, UnknownRegionType, RegionType, \
+    ImageRegionType, UserAttributeType, WordType, AlternativeImageType, BorderType, PrintSpaceType, ReadingOrderType, \
+    LayersType, RelationsType
+from docrecjson.elements import Document, PolygonRegion, GroupRef, DocumentElement
+
+
+def execute_if_present(func):
+    """
+    Wraps a function call into a presence check. This is intended for a presence detection for pyXB objects.
+    requires to argument to be default returned as first position argument and the argument to check presence as the
+    second argument.
+    :param func:
+    :return: returns the second argument (first argument after self) of the function to allow usage in direct
+    assignments.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if type(args[2]) == _PluralBinding:
+            # if the _PluralBinding element has any more elements than 0, it's assumed that there are contents
+            # present which have to be processed.
+            if len(args[2]) != 0:
+                return func(*args, **kwargs)
+            else:
+                return args[1]
+        elif args[2]:
+            return func(*args, **kwargs)
+        else:
+            return args[1]
+
+    return wrapper
+
+
+def recursive(func):
+    """
+    the add_xyz methods annotated with this will call their children or themselves recursively until there are no more
+    children elements.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        document: Document = func(*args, **kwargs)
+        parent: DocumentElement = document.content[-1]
+        # add a group to the parent object if the group is not already present
+        if parent.group is None:
+            document.add_group(parent)
+
+        document.use_group_of(parent)
+
+        strategy: PageXMLStrategyPyXB = args[0]
+        plural_binding_parent = args[2]
+        for element in plural_binding_parent:
+            document = strategy.add_region_content(document, element)
+        document.use_new_group()
+
+        return document
+
+    return wrapper
+
+
+class PageXMLStrategyPyXB(PageConversionStrategy):
+    """
+    Version independent conversion of pyxb PAGE XML objects. The subclasses provide the PAGE version and the region
+    elements of their schema, the elements which are shared between the versions have the same names in all bindings.
+
+    assumptions:
+        *   each region is a group -> top level regions of any type will always share a common group id
+        *   Nested xml objects are currently not allowed
+            In the PageXML 2017 version, there are the following complex base Regions:
+                - TextRegion
+                - ImageRegion
+                - LineDrawingRegion
+                - GraphicRegion
+                - TableRegion
+                - ChartRegion
+                - SeparatorRegion
+                - MathsRegion
+                - ChemRegion
+                - MusicRegion
+                - AdvertRegion
+                - NoiseRegion
+                - UnknownRegion
+            Theoretically, each Region could have any other Region as subtype. This subtyping is not processed.
+            I don't know whether it's intended that you could theoretically have a ImageRegion as Subtype of an
+            TextRegion, but the xsd schema would allow it.
+            It originates from the dependency of each ...Type to RegionType, which includes the other ...Types.
+            The dependency to RegionType is necessary to include basic properties e.g. Coordinates.
+    """
+
+    # PAGE schema version, e.g. 2017-07-15
+    _VERSION: str
+    # (PAGE element name, handler method name) of all region elements in the order they are added to the document
+    _REGION_HANDLERS: Sequence[Tuple[str, str]]
+
+    _options: ConversionOptions
+    # number of points before and after the simplification of the current document
+    _points_read: int
+    _points_written: int
+    # regions and line polygons of the current document, they get the geometry features after add_regions
+    _polygons: List[Tuple[DocumentElement, Sequence[Tuple[int, int]]]]
+    # PAGE id -> element of the current document, resolves the references of ReadingOrder, Layers and Relations
+    _elements_by_id: Dict[str, DocumentElement]
+
+    def __init__(self, options: Optional[ConversionOptions] = None):
+        """
+        The strategy keeps the state of the current document, a strategy object therefore converts one document at a
+        time.
+        """
+        self._options = ConversionOptions() if options is None else options
+        self._points_read = 0
+        self._points_written = 0
+        self._polygons = []
+        self._elements_by_id = {}
+
+    # The next methods are not static-inspected inspected because moving this out of the strategy may be very confusing
+    # Furthermore this may be necessary to implement for each strategy and be moved therefore into ConversionStrategy
+    #   or a page subclass.
+    # noinspection PyMethodMayBeStatic
+    def _execute_if_present(self, condition, func, *args):
+        if self._is_present(condition):
+            func(*args)
+
+    # noinspection PyMethodMayBeStatic
+    def _is_present(self, condition) -> bool:
+        if type(condition) == dict:
+            if len(condition) > 0:
+                return True
+            else:
+                return False
+        # At this point, it's assumed that the condition object is one of the PyXb objects.
+        if condition:
+            return True
+        return False
+
+    def _create_labels_metadata(self, labels_list) -> list:
+        """
+        :param labels_list: LabelsType elements of PAGE 2019 or None
+        """
+        if labels_list is None:
+            return []
+        labels_metadata: list = []
+        for labels in labels_list:
+            metadata: dict = self._create_dict_if_present(externalModel=labels.externalModel,
+                                                          externalId=labels.externalId,
+                                                          prefix=labels.prefix,
+                                                          comments=labels.comments)
+            metadata["labels"] = [self._create_dict_if_present(value=label.value_, type=label.type,
+                                                               comments=label.comments)
+                                  for label in labels.Label]
+            labels_metadata.append(metadata)
+        return labels_metadata
+
+    def _create_dict_if_present(self, **kwargs) -> dict:
+        dct: dict = {}
+        for name, value in kwargs.items():
+            if self._is_present(value):
+                dct[name] = value
+        return dct
+
+    # noinspection PyMethodMayBeStatic
+    def _warn_if_present(self, obj, property_name: str):
+        if type(obj) == boolean or obj:
+            logger.warning(property_name + "= [" + str(obj) + "] is not further processed.")
+
+    # noinspection PyMethodMayBeStatic
+    def _create_user_defined_metadata(self, user_defined_metadata: UserDefinedType) -> dict:
+        if user_defined_metadata is None:
+            return {}
+        dct = {}
+        for attribute in user_defined_metadata.UserAttribute:
+            dct[str(attribute.name)] = str(attribute.value_)
+        return dct
+
+    def _handle_points_type(self, points: PointsType, closed: bool = True,
+                            simplify: bool = True) -> Sequence[Tuple[int, int]]:
+        """
+        :param closed: False for polylines, e.g. baselines. Only used by the simplification.
+        :param simplify: False for points which are no outline, e.g. the points of a table grid
+        """
+        # the points are separated by spaces, the last point has no trailing space
+        points_shared_file_format = [(int(x), int(y)) for x, y in re.findall("([0-9]+),([0-9]+)", str(points))]
+        if self._options.simplify_tolerance is None or not simplify:
+            return points_shared_file_format
+        self._points_read += len(points_shared_file_format)
+        points_shared_file_format = geometry.simplify(points_shared_file_format, self._options.simplify_tolerance,
+                                                      closed)
+        self._points_written += len(points_shared_file_format)
+        return points_shared_file_format
+
+    # noinspection PyMethodMayBeStatic
+    def _get_unvalidated_error_msg(self, element_name: str) -> str:
+        return "Given " + element_name + " was None. " \
+                                         "This is very likely to originate from an unvalidated file."
+
+    def add_region_content(self, document, parent) -> Document:
+        for element_name, handler_name in self._REGION_HANDLERS:
+            # not every region element is allowed as child of a region, e.g. the MapRegion of PAGE 2019
+            regions = getattr(parent, element_name, None)
+            if regions is not None:
+                document = getattr(self, handler_name)(document, regions)
+        return document
+
+    def initialize(self, original: ConverterDocument) -> ConverterDocument:
+        pyxb_object: PcGtsType = original.tmp_type
+        document: Document = Document.empty(pyxb_object.Page.imageFilename,
+                                            (pyxb_object.Page.imageHeight, pyxb_object.Page.imageWidth))
+        if pyxb_object.Metadata is None:
+            logger.warning(self._get_unvalidated_error_msg("metadata"))
+            document.add_creator("PAGE XML", self._VERSION)
+        else:
+            document.add_creator(pyxb_object.Metadata.Creator, self._VERSION)
+
+        document.add_creator("shared-file-converter", str(date.today()))
+        original.shared_file_format_document = document
+        self._points_read = 0
+        self._points_written = 0
+        self._polygons = []
+        self._elements_by_id = {}
+
+        # todo add Page root types e.g. pyxb_object.Page.<xyz> (maybe this is more appropriate in add_metadate)
+        # missing: custom, type, primaryLanguage, secondaryLanguage, primaryScript, secondaryScript, readingOrder
+        #          textLineOrder
+
+        return original
+
+    def add_metadata(self, original: ConverterDocument) -> ConverterDocument:
+        pyxb_object: PcGtsType = original.tmp_type
+        document: Document = original.shared_file_format_document
+
+        if pyxb_object.Metadata is None:
+            logger.warning(self._get_unvalidated_error_msg("metadata"))
+        else:
+            self._execute_if_present(pyxb_object.Metadata.LastChange, document.add_metadata,
+                                     {"LastChange": str(pyxb_object.Metadata.LastChange)})
+            self._execute_if_present(pyxb_object.Metadata.Comments, document.add_metadata,
+                                     {"Comments": str(pyxb_object.Metadata.Comments)})
+            self._execute_if_present(pyxb_object.Metadata.UserDefined, document.add_metadata,
+                                     self._create_user_defined_metadata(pyxb_object.Metadata.UserDefined))
+            self._execute_if_present(pyxb_object.Metadata.externalRef, document.add_metadata,
+                                     {"externalRef": str(pyxb_object.Metadata.externalRef)})
+            # the following elements are not present in all PAGE versions
+            document = self.handle_metadata_item_type(document, getattr(pyxb_object.Metadata, "MetadataItem", None))
+
+        page_text_style: dict = self._create_text_style_metadata(getattr(pyxb_object.Page, "TextStyle", None))
+        self._execute_if_present(page_text_style, document.add_metadata, {"textStyle": page_text_style})
+        document = self.handle_labels_type(document, getattr(pyxb_object.Page, "Labels", None))
+
+        document = self.handle_alternative_image_type(document, pyxb_object.Page.AlternativeImage)
+        document = self.handle_user_defined_type(document, pyxb_object.Page.UserDefined)
+
+        original.shared_file_format_document = document
+        return original
+
+    def add_regions(self, original: ConverterDocument) -> ConverterDocument:
+        pyxb_object: PcGtsType = original.tmp_type
+        page: PageType = pyxb_object.Page
+        document: Document = original.shared_file_format_document
+
+        document = self.handle_border_type(document, page.Border)
+        document = self.handle_print_space_type(document, page.PrintSpace)
+        document = self.add_region_content(document, page)
+        # the references of these elements are resolved to the regions added before
+        document = self.handle_reading_order_type(document, page.ReadingOrder)
+        document = self.handle_layers_type(document, page.Layers)
+        document = self.handle_relations_type(document, page.Relations)
+        if self._options.simplify_tolerance is not None:
+            document = self._add_simplification_metadata(document, original.filepath)
+        if self._options.geometry_features:
+            document = self._add_geometry_features(document)
+
+        original.shared_file_format_document = document
+        return original
+
+    def _add_simplification_metadata(self, document: Document, filepath: str) -> Document:
+        reduction: float = 0 if self._points_read == 0 else 1 - self._points_written / self._points_read
+        logger.info("[" + filepath + "] simplified " + str(self._points_read) + " points to " +
+                    str(self._points_written) + " (" + format(reduction, ".1%") + " fewer)")
+        document.add_metadata({"simplification": {"tolerance": self._options.simplify_tolerance,
+                                                  "points": self._points_read,
+                                                  "simplifiedPoints": self._points_written}})
+        return document
+
+    def _add_geometry_features(self, document: Document) -> Document:
+        polygons = [(element, points) for element, points in self._polygons if len(points) != 0]
+        bounding_boxes, areas, centroids = geometry.polygon_features([points for _, points in polygons])
+        for (element, _), bounding_box, area, centroid in zip(polygons, bounding_boxes, areas, centroids):
+            document.add_content_metadata({"bbox": bounding_box, "area": area, "centroid": centroid}, element,
+                                          element.oid)
+        self._polygons = []
+        return document
+
+    def _add_region(self, document: Document, coordinates: Sequence[Tuple[int, int]], region_type: str,
+                    region_subtype: Optional[str] = None, region_id: Optional[str] = None) -> PolygonRegion:
+        """
+        :param region_id: the PAGE id of the region, references to it are resolved to the added region
+        """
+        region: PolygonRegion = document.add_region(coordinates, region_type, region_subtype)
+        if region_id is not None:
+            self._elements_by_id[str(region_id)] = region
+        if self._options.geometry_features:
+            self._polygons.append((region, coordinates))
+        return region
+
+    def _add_line_polygon(self, document: Document, points: Sequence[Tuple[int, int]],
+                          group_ref: Optional[GroupRef], line_id: Optional[str] = None) -> DocumentElement:
+        line_polygon: DocumentElement = document.add_line_polygon(points, group_ref)
+        if line_id is not None:
+            self._elements_by_id[str(line_id)] = line_polygon
+        if self._options.geometry_features:
+            self._polygons.append((line_polygon, points))
+        return line_polygon
+
+    """
+    page xml element handling = type handling
+    """
+
+    @execute_if_present
+    def handle_alternative_image_type(self, document: Document, alternative_images: _PluralBinding) -> Document:
+        alternative_image: AlternativeImageType
+        for alternative_image in alternative_images:
+            metadata: dict = self._create_dict_if_present(alternativeImage=alternative_image.filename,
+                                                          comments=alternative_image.comments)
+            self._execute_if_present(metadata, document.add_metadata, metadata)
+        return document
+
+    @execute_if_present
+    def handle_border_type(self, document: Document, border: BorderType) -> Document:
+        """
+        Border of the actual page (if the scanned image contains parts not belonging to the page)
+        see reference of page xml xsd schema
+        """
+        coordinates = self._handle_points_type(border.Coords.points)
+        self._add_region(document, coordinates, "border")
+        return document
+
+    @execute_if_present
+    def handle_print_space_type(self, document: Document, print_space: PrintSpaceType) -> Document:
+        coordinates = self._handle_points_type(print_space.Coords.points)
+        self._add_region(document, coordinates, "printSpace")
+        return document
+
+    @execute_if_present
+    def handle_reading_order_type(self, document: Document, reading_order: ReadingOrderType) -> Document:
+        """
+        Added as readingOrder metadata: the nested ordered and unordered groups with the references resolved to the
+        oid and group of the regions.
+        """
+        group = reading_order.OrderedGroup if reading_order.OrderedGroup is not None else reading_order.UnorderedGroup
+        metadata: dict = self._create_reading_order_group(group)
+        # the confidence of the reading order is only part of PAGE 2019
+        confidence = getattr(reading_order, "conf", None)
+        self._execute_if_present(confidence, metadata.update, {"confidence": confidence})
+        document.add_metadata({"readingOrder": metadata})
+        return document
+
+    def _create_reading_order_group(self, group) -> dict:
+        """
+        :param group: any of the ordered or unordered (indexed) group types
+        """
+        metadata: dict = self._create_dict_if_present(id=group.id, caption=group.caption, type=group.type,
+                                                      continuation=group.continuation, custom=group.custom,
+                                                      comments=group.comments)
+        ordered: bool = hasattr(group, "RegionRefIndexed")
+        metadata["ordered"] = ordered
+        if group.regionRef is not None:
+            metadata["region"] = self._resolve_reference(group.regionRef)
+        labels: list = self._create_labels_metadata(getattr(group, "Labels", None))
+        self._execute_if_present(labels, metadata.update, {"labels": labels})
+        if ordered:
+            indexed_elements: list = [(ref.index, self._resolve_reference(ref.regionRef))
+                                      for ref in group.RegionRefIndexed]
+            indexed_elements += [(child.index, self._create_reading_order_group(child))
+                                 for child in list(group.OrderedGroupIndexed) + list(group.UnorderedGroupIndexed)]
+            metadata["elements"] = [element for _, element in sorted(indexed_elements, key=lambda entry: entry[0])]
+        else:
+            metadata["elements"] = [self._resolve_reference(ref.regionRef) for ref in group.RegionRef]
+            metadata["elements"] += [self._create_reading_order_group(child)
+                                     for child in list(group.OrderedGroup) + list(group.UnorderedGroup)]
+        return metadata
+
+    def _resolve_reference(self, region_ref) -> dict:
+        """
+        :param region_ref: the PAGE id of an element of this document
+        :return: the PAGE id with the oid and group of the converted element
+        """
+        reference: dict = {"regionRef": str(region_ref)}
+        element: Optional[DocumentElement] = self._elements_by_id.get(str(region_ref))
+        if element is None:
+            logger.warning("The reference [" + str(region_ref) + "] doesn't match any converted element.")
+            return reference
+        reference["oid"] = element.oid
+        # the group is either an oid or a reference to the group
+        reference["group"] = getattr(element.group, "oid", element.group)
+        return reference
+
+    @execute_if_present
+    def handle_layers_type(self, document: Document, layers: LayersType) -> Document:
+        """
+        Can be used to express the z-index of overlapping regions.
+        An element with a greater z-index is always in front of another element with lower z-index.
+        see reference of page xml xsd schema
+        """
+        layers_metadata: list = []
+        for layer in layers.Layer:
+            metadata: dict = self._create_dict_if_present(id=layer.id, zIndex=layer.zIndex, caption=layer.caption)
+            metadata["regions"] = [self._resolve_reference(ref.regionRef) for ref in layer.RegionRef]
+            layers_metadata.append(metadata)
+        document.add_metadata({"layers": layers_metadata})
+        return document
+
+    @execute_if_present
+    def handle_relations_type(self, document: Document, relations: RelationsType) -> Document:
+        """
+        Container for one-to-one relations between layout objects (for example: DropCap - paragraph, caption - image)
+        PAGE 2017 has two RegionRef elements per relation, they are added as source and target in their order.
+        """
+        relations_metadata: list = []
+        for relation in relations.Relation:
+            metadata: dict = self._create_dict_if_present(id=getattr(relation, "id", None), type=relation.type,
+                                                          custom=relation.custom, comments=relation.comments)
+            if hasattr(relation, "SourceRegionRef"):
+                source_ref, target_ref = relation.SourceRegionRef, relation.TargetRegionRef
+            else:
+                source_ref, target_ref = relation.RegionRef
+            metadata["source"] = self._resolve_reference(source_ref.regionRef)
+            metadata["target"] = self._resolve_reference(target_ref.regionRef)
+            labels: list = self._create_labels_metadata(getattr(relation, "Labels", None))
+            self._execute_if_present(labels, metadata.update, {"labels": labels})
+            relations_metadata.append(metadata)
+        document.add_metadata({"relations": relations_metadata})
+        return document
+
+    @execute_if_present
+    def handle_user_defined_type(self, document: Document, user_defined: UserDefinedType,
+                                 group_ref: Optional[GroupRef] = None) -> Document:
+        user_attribute: UserAttributeType
+        for user_attribute in user_defined.UserAttribute:
+            metadata: dict = self._create_dict_if_present(name=user_attribute.name,
+                                                          description=user_attribute.description,
+                                                          type=user_attribute.type,
+                                                          value=user_attribute.value_)
+            if group_ref is None:
+                # assumption, that this is global metadata if there isn't a group specified
+                self._execute_if_present(metadata, document.add_metadata, metadata)
+            else:
+                self._execute_if_present(metadata, document.add_content_metadata, metadata, group_ref)
+
+        return document
+
+    @execute_if_present
+    def handle_metadata_item_type(self, document: Document, metadata_items: _PluralBinding) -> Document:
+        for metadata_item in metadata_items:
+            metadata: dict = self._create_dict_if_present(type=metadata_item.type,
+                                                          name=metadata_item.name,
+                                                          value=metadata_item.value_,
+                                                          date=None if metadata_item.date is None else str(
+                                                              metadata_item.date),
+                                                          labels=self._create_labels_metadata(metadata_item.Labels))
+            self._execute_if_present(metadata, document.add_metadata, {"metadataItem": metadata})
+        return document
+
+    @execute_if_present
+    def handle_labels_type(self, document: Document, labels_list: _PluralBinding) -> Document:
+        """
+        Semantic labels / tags of the page
+        """
+        document.add_metadata({"labels": self._create_labels_metadata(labels_list)})
+        return document
+
+    @execute_if_present
+    def handle_word_type(self, document: Document, words: _PluralBinding,
+                         group_ref: Optional[GroupRef] = None) -> Document:
+        """
+        The words of a line are added as a single content metadata entry with one list per attribute instead of one
+        object per word, see _create_columns. The glyphs of the words are added the same way, their word column holds
+        the index of their word.
+        """
+        if not self._options.convert_words:
+            for _ in words:
+                logger.warning("This conversion is currently not implemented.")
+            return document
+        word_columns: dict = self._create_columns()
+        glyph_columns: dict = self._create_columns()
+        glyph_columns["word"] = []
+        word: WordType
+        for word_index, word in enumerate(words):
+            self._append_columns(word_columns, word)
+            glyph_columns = self.handle_glyph_type(glyph_columns, word.Glyph, word_index)
+        if len(glyph_columns["word"]) != 0:
+            word_columns["glyphs"] = glyph_columns
+        parent_id = None if group_ref is None else group_ref.oid
+        document.add_content_metadata({"words": word_columns}, group_ref, parent_id)
+        return document
+
+    @execute_if_present
+    def handle_glyph_type(self, glyph_columns: dict, glyphs: _PluralBinding, word_index: int) -> dict:
+        for glyph in glyphs:
+            self._append_columns(glyph_columns, glyph)
+            glyph_columns["word"].append(word_index)
+        return glyph_columns
+
+    # noinspection PyMethodMayBeStatic
+    def _create_columns(self) -> dict:
+        """
+        Parallel lists of the words or glyphs of a line, the entry i of each list belongs to the same element.
+        The coordinates of all elements are stored in one flat list x0, y0, x1, y1, ..., the coordinates of element i
+        are points[pointOffsets[i]:pointOffsets[i + 1]].
+        """
+        return {"id": [], "text": [], "confidence": [], "pointOffsets": [0], "points": []}
+
+    def _append_columns(self, columns: dict, element):
+        """
+        :param element: a WordType or GlyphType, only its first TextEquiv is converted
+        """
+        text_equiv: Optional[TextEquivType] = element.TextEquiv[0] if len(element.TextEquiv) != 0 else None
+        columns["id"].append(str(element.id))
+        columns["text"].append(None if text_equiv is None or text_equiv.Unicode is None else str(text_equiv.Unicode))
+        columns["confidence"].append(None if text_equiv is None or text_equiv.conf is None else float(text_equiv.conf))
+        points: list = columns["points"]
+        for point in self.handle_coords_type(element.Coords):
+            points.extend(point)
+        columns["pointOffsets"].append(len(points))
+
+    """
+    Text Region Handling
+    """
+
+    @execute_if_present
+    @recursive
+    def handle_text_regions(self, document: Document, text_regions) -> Document:
+        text_region: TextRegionType
+        for text_region in text_regions:
+            region: GroupRef
+            if self._has_complex_subtype(text_region):
+                # this text regions has subtypes
+                # -> it only serves the purpose of beeing a group id for it's subtypes
+                document = self._handle_complex_text_region_type(document, text_region)
+            else:
+                # this text region stands for itself without any further information
+                # -> it's added to document engine as text content
+                document = self._handle_simple_text_region_type(document, text_region)
+
+            metadata: dict = self._create_dict_if_present(originalId=text_region.id,
+                                                          align=text_region.align,
+                                                          comments=text_region.comments,
+                                                          continuation=text_region.continuation,
+                                                          custom=text_region.custom,
+                                                          indented=text_region.indented,
+                                                          leading=text_region.leading,
+                                                          orientation=text_region.orientation,
+                                                          primaryLanguage=text_region.primaryLanguage,
+                                                          primaryScript=text_region.primaryScript,
+                                                          production=text_region.production,
+                                                          readingDirection=text_region.readingDirection,
+                                                          readingOrientation=text_region.readingOrientation,
+                                                          secondaryLanguage=text_region.secondaryLanguage,
+                                                          textLineOrder=text_region.textLineOrder)
+            if document.content[-1].group is None:
+                document.add_group(document.content[-1])
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, document.content[-1].group,
+                                     document.content[-1].oid)
+
+        return document
+
+    def _handle_simple_text_region_type(self, document: Document, text_region: TextRegionType) -> Document:
+        coordinates = self.handle_coords_type(text_region.Coords)
+        region_type: str = "text"
+        region_subtype = text_region.type
+        self._add_region(document, coordinates, region_type, region_subtype, region_id=text_region.id)
+        document = self.handle_text_style(document, text_region.TextStyle)
+        return document
+
+    def _handle_complex_text_region_type(self, document: Document, text_region: TextRegionType) -> Document:
+        coordinates = self.handle_coords_type(text_region.Coords)
+        region_type: str = "text"
+        region_subtype = text_region.type
+        region_identification: PolygonRegion = self._add_region(document, coordinates, region_type, region_subtype,
+                                                                text_region.id)
+
+        document = self.handle_text_lines(document, text_region.TextLine, region_identification)
+        document = self.handle_text_equiv(document, text_region.TextEquiv, region_identification)
+        document = self.handle_text_style(document, text_region.TextStyle, region_identification)
+
+        return document
+
+    # noinspection PyMethodMayBeStatic
+    def _len_plural_binding(self, _plural_binding_object: _PluralBinding) -> int:
+        return len(_plural_binding_object)
+
+    def _has_complex_subtype(self, text_region: TextRegionType) -> bool:
+        length_of_all_types: int = self._len_plural_binding(
+            text_region.TextEquiv) + self._len_plural_binding(
+            text_region.TextLine)
+        return True if length_of_all_types != 0 else False
+
+    @execute_if_present
+    def handle_text_lines(self, document: Document, text_lines: _PluralBinding,
+                          group_ref: Optional[GroupRef] = None) -> Document:
+        text_line: TextLineType
+        for text_line in text_lines:
+            points = self.handle_coords_type(text_line.Coords)
+            baseline_points = self.handle_baseline_type([], text_line.Baseline)
+
+            docobject: DocumentElement = document.content[-1]
+            if len(points) != 0:
+                docobject = self._add_line_polygon(document, points, group_ref, text_line.id)
+            if len(baseline_points) != 0:
+                docobject = document.add_baseline(baseline_points, group_ref)
+
+            metadata: dict = self._create_dict_if_present(originalId=text_line.id,
+                                                          primaryLanguage=text_line.primaryLanguage,
+                                                          primaryScript=text_line.primaryScript,
+                                                          secondaryScript=text_line.secondaryScript,
+                                                          readingDirection=text_line.readingDirection,
+                                                          production=text_line.production,
+                                                          custom=text_line.custom,
+                                                          comments=text_line.comments)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, docobject, docobject.oid)
+
+            self.handle_word_type(document, text_line.Word, docobject)
+            self.handle_text_equiv(document, text_line.TextEquiv, docobject)
+            self.handle_text_style(document, text_line.TextStyle, docobject)
+            self.handle_user_defined_type(document, text_line.UserDefined, docobject)
+
+        return document
+
+    @execute_if_present
+    def handle_text_equiv(self, document: Document, text_equivs: _PluralBinding,
+                          group_ref: Optional[GroupRef] = None) -> Document:
+        text_equiv: TextEquivType
+        for text_equiv in text_equivs:
+            unicode: str = text_equiv.Unicode
+            region = document.add_text(unicode, group_ref)
+
+            metadata: dict = self._create_dict_if_present(index=text_equiv.index,
+                                                          confidence=text_equiv.conf,
+                                                          dataType=text_equiv.dataType,
+                                                          dataTypeDetails=text_equiv.dataTypeDetails,
+                                                          comments=text_equiv.comments)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+        return document
+
+    @execute_if_present
+    def handle_text_style(self, document: Document, text_style: TextStyleType,
+                          group_ref: Optional[GroupRef] = None) -> Document:
+        metadata: dict = self._create_text_style_metadata(text_style)
+        parent_id = None if group_ref is None else group_ref.oid
+        self._execute_if_present(metadata, document.add_content_metadata, metadata, group_ref, parent_id)
+        return document
+
+    def _create_text_style_metadata(self, text_style: Optional[TextStyleType]) -> dict:
+        if text_style is None:
+            return {}
+        return self._create_dict_if_present(fontFamily=text_style.fontFamily,
+                                                      serif=text_style.serif,
+                                                      monospace=text_style.monospace,
+                                                      fontSize=text_style.fontSize,
+                                                      xHeight=text_style.xHeight,
+                                                      kerning=text_style.kerning,
+                                                      textColour=text_style.textColour,
+                                                      textColourRgb=text_style.textColourRgb,
+                                                      bgColour=text_style.bgColour,
+                                                      bgColourRgb=text_style.bgColourRgb,
+                                                      reverseVideo=text_style.reverseVideo,
+                                                      bold=text_style.bold,
+                                                      italic=text_style.italic,
+                                                      underlined=text_style.underlined,
+                                                      subscript=text_style.subscript,
+                                                      superscript=text_style.superscript,
+                                                      strikethrough=text_style.strikethrough,
+                                                      smallCaps=text_style.smallCaps,
+                                                      letterSpaced=text_style.letterSpaced)
+
+    def handle_coords_type(self, coords: CoordsType) -> Sequence[Tuple[int, int]]:
+        """
+        the coords entries have been previously xsd-validated using: ([0-9]+,[0-9]+ )+([0-9]+,[0-9]+)
+        :param coords:
+        :return:
+        """
+        if coords is None:
+            logger.warning("The given coords were None."
+                           "This is very likely to originate from an unvalidated file."
+                           "Please review whether your elements have coord points specified when necessary.")
+            return []
+        return self._handle_points_type(coords.points)
+
+    @execute_if_present
+    def handle_baseline_type(self, default_return, baseline: BaselineType) -> Sequence[Tuple[int, int]]:
+        return self._handle_points_type(baseline.points, closed=False)
+
+    """
+    Top Level Region handling
+    """
+
+    def _warn_region_parent_elements(self, region_child_element: RegionType):
+        """
+        This method is used to warn if there are complex subregions in another region (except text_region).
+        This Conversion is currently not supported.
+        :param region_child_element: the Region to check for certain Region elements
+        """
+        self._warn_if_present(region_child_element.custom, "custom")
+        self._warn_if_present(region_child_element.comments, "comments")
+        self._warn_if_present(region_child_element.continuation, "continuation")
+
+        self._warn_if_present(region_child_element.UserDefined, "UserDefined")
+        self._warn_if_present(region_child_element.Roles, "Roles")
+        for element_name, _ in self._REGION_HANDLERS:
+            self._warn_if_present(getattr(region_child_element, element_name, None), element_name)
+
+    @execute_if_present
+    @recursive
+    def handle_image_region(self, document: Document, image_regions: _PluralBinding) -> Document:
+        image_region: ImageRegionType
+        for image_region in image_regions:
+            coordinates = self._handle_points_type(image_region.Coords.points)
+            region = self._add_region(document, coordinates, "image", region_id=image_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=image_region.orientation,
+                                                          colourDepth=image_region.colourDepth,
+                                                          bgColour=image_region.bgColour,
+                                                          embText=image_region.embText)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            # todo what elements need to be added to the recursive functionality to remove this behaviour
+            self._warn_region_parent_elements(image_region)
+
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_line_drawing_region(self, document: Document, line_drawing_regions: _PluralBinding) -> Document:
+        line_drawing_region: LineDrawingRegionType
+        for line_drawing_region in line_drawing_regions:
+            coordinates = self._handle_points_type(line_drawing_region.Coords.points)
+            region = self._add_region(document, coordinates, "line_drawing", region_id=line_drawing_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=line_drawing_region.orientation,
+                                                          penColour=line_drawing_region.penColour,
+                                                          bgColour=line_drawing_region.bgColour,
+                                                          embText=line_drawing_region.embText)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(line_drawing_region)
+
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_graphic_region(self, document: Document, graphic_regions: _PluralBinding) -> Document:
+        graphic_region: GraphicRegionType
+        for graphic_region in graphic_regions:
+            coordinates = self._handle_points_type(graphic_region.Coords.points)
+            region = self._add_region(document, coordinates, "graphic", region_id=graphic_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=graphic_region.orientation,
+                                                          type=graphic_region.type,
+                                                          numColours=graphic_region.numColours,
+                                                          embText=graphic_region.embText)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(graphic_region)
+
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_table_region(self, document: Document, table_regions: _PluralBinding) -> Document:
+        table_region: TableRegionType
+        for table_region in table_regions:
+            coordinates = self._handle_points_type(table_region.Coords.points)
+            region = self._add_region(document, coordinates, "table", region_id=table_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=table_region.orientation,
+                                                          rows=table_region.rows,
+                                                          columns=table_region.columns,
+                                                          lineColour=table_region.lineColour,
+                                                          bgColour=table_region.bgColour,
+                                                          lineSeparators=table_region.lineSeparators,
+                                                          embText=table_region.embText,
+                                                          grid=self._handle_grid_type(
+                                                              getattr(table_region, "Grid", None)))
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(table_region)
+        return document
+
+    def _handle_grid_type(self, grid) -> list:
+        """
+        The table grid of PAGE 2019 is a matrix of grid points, one list of points per grid row. The grid points are
+        not simplified, the rows have to keep their columns.
+        """
+        if grid is None:
+            return []
+        grid_rows = sorted(grid.GridPoints, key=lambda grid_points: grid_points.index)
+        return [self._handle_points_type(grid_points.points, simplify=False) for grid_points in grid_rows]
+
+    @execute_if_present
+    @recursive
+    def handle_chart_region(self, document: Document, chart_regions: _PluralBinding) -> Document:
+        chart_region: ChartRegionType
+        for chart_region in chart_regions:
+            coordinates = self._handle_points_type(chart_region.Coords.points)
+            region = self._add_region(document, coordinates, "chart", region_id=chart_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=chart_region.orientation,
+                                                          type=chart_region.type,
+                                                          numColours=chart_region.numColours,
+                                                          bgColour=chart_region.bgColour,
+                                                          embText=chart_region.embText)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(chart_region)
+
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_map_region(self, document: Document, map_regions: _PluralBinding) -> Document:
+        for map_region in map_regions:
+            coordinates = self._handle_points_type(map_region.Coords.points)
+            region = self._add_region(document, coordinates, "map", region_id=map_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=map_region.orientation)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(map_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_separator_region(self, document: Document, separator_regions: _PluralBinding) -> Document:
+        separator_region: SeparatorRegionType
+        for separator_region in separator_regions:
+            coordinates = self._handle_points_type(separator_region.Coords.points)
+            region = self._add_region(document, coordinates, "separator", region_id=separator_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=separator_region.orientation,
+                                                          colour=separator_region.colour)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(separator_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_maths_region(self, document: Document, maths_regions: _PluralBinding) -> Document:
+        maths_region: MathsRegionType
+        for maths_region in maths_regions:
+            coordinates = self._handle_points_type(maths_region.Coords.points)
+            region = self._add_region(document, coordinates, "maths", region_id=maths_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=maths_region.orientation,
+                                                          bgColour=maths_region.bgColour)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(maths_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_chem_region(self, document: Document, chem_regions: _PluralBinding) -> Document:
+        chem_region: ChemRegionType
+        for chem_region in chem_regions:
+            coordinates = self._handle_points_type(chem_region.Coords.points)
+            region = self._add_region(document, coordinates, "chem", region_id=chem_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=chem_region.orientation,
+                                                          bgColour=chem_region.bgColour)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(chem_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_music_region(self, document: Document, music_regions: _PluralBinding) -> Document:
+        music_region: MusicRegionType
+        for music_region in music_regions:
+            coordinates = self._handle_points_type(music_region.Coords.points)
+            region = self._add_region(document, coordinates, "music", region_id=music_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=music_region.orientation,
+                                                          bgColour=music_region.bgColour)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(music_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_advert_region(self, document: Document, advert_regions: _PluralBinding) -> Document:
+        advert_region: AdvertRegionType
+        for advert_region in advert_regions:
+            coordinates = self._handle_points_type(advert_region.Coords.points)
+            region = self._add_region(document, coordinates, "advert", region_id=advert_region.id)
+
+            metadata: dict = self._create_dict_if_present(orientation=advert_region.orientation,
+                                                          bgColour=advert_region.bgColour)
+            self._execute_if_present(metadata, document.add_content_metadata, metadata, region, region.oid)
+
+            self._warn_region_parent_elements(advert_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_noise_region(self, document: Document, noise_regions: _PluralBinding) -> Document:
+        noise_region: NoiseRegionType
+        for noise_region in noise_regions:
+            coordinates = self._handle_points_type(noise_region.Coords.points)
+            self._add_region(document, coordinates, "noise", region_id=noise_region.id)
+
+            self._warn_region_parent_elements(noise_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_unknown_region(self, document: Document, unknown_regions: _PluralBinding) -> Document:
+        unknown_region: UnknownRegionType
+        for unknown_region in unknown_regions:
+            coordinates = self._handle_points_type(unknown_region.Coords.points)
+            self._add_region(document, coordinates, "unknown", region_id=unknown_region.id)
+
+            self._warn_region_parent_elements(unknown_region)
+        return document
+
+    @execute_if_present
+    @recursive
+    def handle_custom_region(self, document: Document, custom_regions: _PluralBinding) -> Document:
+        """
+        Regions which are not covered by the other region types, the custom type is kept as region subtype.
+        """
+        for custom_region in custom_regions:
+            coordinates = self._handle_points_type(custom_region.Coords.points)
+            self._add_region(document, coordinates, "custom", custom_region.type, region_id=custom_region.id)
+
+            self._warn_region_parent_elements(custom_region)
+        return document
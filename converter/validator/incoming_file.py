@@ -0,0 +1,190 @@
+import bz2
+import gzip
+import hashlib
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Callable, IO, Iterator, Optional, Union
+
+from converter.validator.validation_cache import sha256_of_file
+
+GZIP: str = "gzip"
+BZIP2: str = "bz2"
+ZSTANDARD: str = "zstd"
+
+_MAGIC_BYTES = ((b"\x1f\x8b", GZIP),
+                (b"BZh", BZIP2),
+                (b"\x28\xb5\x2f\xfd", ZSTANDARD))
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """
+    :param header: the first bytes of a file
+    :return: GZIP, BZIP2, ZSTANDARD or None for an uncompressed file
+    """
+    for magic_bytes, compression in _MAGIC_BYTES:
+        if header.startswith(magic_bytes):
+            return compression
+    return None
+
+
+def _decompressing_stream(raw: IO[bytes], compression: str) -> IO[bytes]:
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == BZIP2:
+        return bz2.BZ2File(raw, mode="rb")
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("Reading zstd compressed files requires the zstandard package") from e
+    return zstandard.ZstdDecompressor().stream_reader(raw)
+
+
+@contextmanager
+def open_xml(filepath: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Maps the file into memory instead of reading it. The bytes are passed on to the xml parser without decoding them,
+    the parser takes the encoding from the xml declaration.
+    """
+    with open(filepath, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # empty files can't be mapped, the parser will report them as invalid
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class IncomingFile:
+    """
+    A file which is converted. It is either read from disk or from memory, e.g. a member of an archive which is never
+    extracted.
+    name is the filepath on disk or the path of the archive member, it is used for logging, the validation policies
+    and the output.
+    gzip, bzip2 and zstd compressed files are detected by their magic bytes and decompressed while being read, the
+    parsers therefore receive the same bytes as for the uncompressed file.
+    """
+    name: str
+    _read: Optional[Callable[[], bytes]]
+    _content: Optional[bytes]
+    _compression: Optional[str]
+    _compression_detected: bool
+    _sha256: Optional[str]
+
+    def __init__(self, name: str, read: Optional[Callable[[], bytes]] = None):
+        """
+        :param read: returns the content of an in-memory file. It is called once, on the first access to the content.
+        None reads the file from disk.
+        """
+        self.name = name
+        self._read = read
+        self._content = None
+        self._compression = None
+        self._compression_detected = False
+        self._sha256 = None
+
+    @classmethod
+    def of(cls, request: Union[str, "IncomingFile"]) -> "IncomingFile":
+        if isinstance(request, IncomingFile):
+            return request
+        return cls(request)
+
+    @classmethod
+    def from_bytes(cls, name: str, content: bytes) -> "IncomingFile":
+        return cls(name, lambda: content)
+
+    @property
+    def in_memory(self) -> bool:
+        return self._read is not None
+
+    @property
+    def content(self) -> bytes:
+        """
+        :return: the file as stored, i.e. still compressed for a compressed file
+        """
+        if self._content is None:
+            self._content = self._read() if self.in_memory else self._read_from_disk()
+        return self._content
+
+    def _read_from_disk(self) -> bytes:
+        with open(self.name, "rb") as file:
+            return file.read()
+
+    @property
+    def compression(self) -> Optional[str]:
+        if not self._compression_detected:
+            with self._open_raw() as raw:
+                self._compression = detect_compression(raw.read(4))
+            self._compression_detected = True
+        return self._compression
+
+    def _open_raw(self) -> IO[bytes]:
+        if self.in_memory:
+            return io.BytesIO(self.content)
+        return open(self.name, "rb")
+
+    @contextmanager
+    def stream(self) -> Iterator[IO[bytes]]:
+        """
+        :return: the uncompressed content as a stream, compressed files are decompressed while reading
+        """
+        with self._open_raw() as raw:
+            if self.compression is None:
+                yield raw
+                return
+            with _decompressing_stream(raw, self.compression) as decompressed:
+                yield decompressed
+
+    @contextmanager
+    def open(self) -> Iterator[Union[mmap.mmap, bytes, IO[bytes]]]:
+        """
+        :return: the input for create_from_xml. Files on disk are memory-mapped instead of being read, compressed files
+        are streamed through the decompressor.
+        """
+        if self.compression is not None:
+            with self.stream() as decompressed:
+                yield decompressed
+        elif self.in_memory:
+            yield self.content
+        else:
+            with open_xml(self.name) as xml:
+                yield xml
+
+    @contextmanager
+    def source(self) -> Iterator[Union[str, IO[bytes]]]:
+        """
+        :return: the file as accepted by lxml, which reads uncompressed files on disk by itself
+        """
+        if self.compression is None and not self.in_memory:
+            yield self.name
+        else:
+            with self.stream() as stream:
+                yield stream
+
+    def sha256(self) -> str:
+        """
+        :return: hash of the uncompressed content, a file has the same hash whether it is compressed or not. It is
+        computed once, e.g. for the validation against several schemas.
+        """
+        if self._sha256 is None:
+            self._sha256 = self._compute_sha256()
+        return self._sha256
+
+    def known_sha256(self) -> Optional[str]:
+        """
+        :return: the hash if it was already computed, e.g. for the validation cache, otherwise None
+        """
+        return self._sha256
+
+    def _compute_sha256(self) -> str:
+        if self.compression is None and not self.in_memory:
+            return sha256_of_file(self.name)
+        digest = hashlib.sha256()
+        with self.stream() as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,46 @@
+import threading
+from contextlib import contextmanager
+
+import pyxb
+import pyxb.binding.basis
+
+
+class _ThreadLocalValidationConfig(pyxb.ValidationConfig):
+    """
+    Replacement for pyxb.GlobalValidationConfig whose forBinding setting can be overridden for the current thread only.
+    pyxb.RequireValidWhenParsing(False) would switch off the validation for all files parsed afterwards in any thread of
+    the process.
+    """
+
+    def __init__(self, global_config: pyxb.ValidationConfig):
+        # keeps all settings of the replaced configuration
+        self.__dict__.update(global_config.__dict__)
+        self._local = threading.local()
+
+    def _getForBinding(self):
+        for_binding = getattr(self._local, "for_binding", None)
+        if for_binding is None:
+            return super()._getForBinding()
+        return for_binding
+
+    forBinding = property(_getForBinding)
+
+
+_VALIDATION_CONFIG = _ThreadLocalValidationConfig(pyxb.GlobalValidationConfig)
+# binding classes inherit the configuration from _TypeBinding_mixin, the parser itself looks up the global one
+pyxb.GlobalValidationConfig = _VALIDATION_CONFIG
+pyxb.binding.basis._TypeBinding_mixin._validationConfig_ = _VALIDATION_CONFIG
+
+
+@contextmanager
+def validation_when_parsing(require_valid: bool):
+    """
+    Sets whether pyxb validates the parsed documents for the current thread until the context is left.
+    Other threads keep parsing with their own setting.
+    """
+    previous = getattr(_VALIDATION_CONFIG._local, "for_binding", None)
+    _VALIDATION_CONFIG._local.for_binding = require_valid
+    try:
+        yield
+    finally:
+        _VALIDATION_CONFIG._local.for_binding = previous
@@ -1,44 +1,191 @@
+import functools
+import io
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor, Future
 from enum import unique, Enum
 from pathlib import Path
+from types import ModuleType
+from typing import IO, Union, Tuple
 
 import pyxb
+import pyxb.binding.saxer
 from lxml import etree
 
 from converter.elements import *
-from converter.strategies.generated.page_xml import py_xb_2017
+from converter.stage_hooks import stage
+from converter.strategies.generated.page_xml import py_xb_2017, py_xb_2019
 from converter.strategies.page_xml_2017_pyxb import PageXML2017StrategyPyXB
+from converter.strategies.page_xml_2019_pyxb import PageXML2019StrategyPyXB
+from converter.validator.incoming_file import IncomingFile, open_xml
+from converter.validator.pyxb_validation import validation_when_parsing
+from converter.validator.validation_cache import ValidationCache, sha256_of_file
+from converter.validator.validation_policy import ValidationPolicies, detect_namespace
 
 
 @unique
 class SupportedTypes(Enum):
-    PAGE_XML_2019 = PageXML2019Strategy()
+    PAGE_XML_2019 = PageXML2019StrategyPyXB()
     PAGE_XML_2017 = PageXML2017StrategyPyXB()
 
 
-def read_xml(filepath: str) -> str:
-    with open(filepath, "r") as file:
-        content: str = file.read()
-        return content
+class _MappedFileReader:
+    """
+    Hands a mapped file to the sax parser without copying it. The parser closes its input after parsing, but the
+    mapping is closed by open_xml, which allows parsing it again.
+    """
+    _mapped: mmap.mmap
 
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+        self._mapped.seek(0)
 
-def _validate_xsd_schema(xml_path: str, xsd_path: str) -> bool:
-    xmlschema_doc = etree.parse(os.path.join(xsd_path))
-    xmlschema = etree.XMLSchema(xmlschema_doc)
+    def read(self, size: int = -1) -> bytes:
+        return self._mapped.read(size)
+
+    def close(self):
+        pass
+
+
+def create_from_xml(binding: ModuleType, xml: Union[mmap.mmap, bytes, IO[bytes]]):
+    """
+    Same as CreateFromDocument of the generated pyxb bindings, but the parser reads the given bytes directly.
+    CreateFromDocument would encode text into bytes and copy them into a BytesIO first.
+    :param binding: the generated binding module, e.g. py_xb_2017
+    :param xml: the result of open_xml or IncomingFile.open, i.e. a mapped file, bytes or a stream
+    """
+    saxer = pyxb.binding.saxer.make_parser(fallback_namespace=binding.Namespace.fallbackNamespace())
+    handler = saxer.getContentHandler()
+    if isinstance(xml, mmap.mmap):
+        saxer.parse(_MappedFileReader(xml))
+    elif isinstance(xml, bytes):
+        saxer.parse(io.BytesIO(xml))
+    else:
+        saxer.parse(xml)
+    return handler.rootObject()
+
+
+_validation_cache: Optional[ValidationCache] = None
+
+
+def set_validation_cache(cache: Optional[ValidationCache]):
+    """
+    Enables the persistent cache of validation results for all handlers. None disables it again.
+    """
+    global _validation_cache
+    _validation_cache = cache
+
+
+_validation_policies: ValidationPolicies = ValidationPolicies()
+
+
+def set_validation_policies(policies: ValidationPolicies):
+    """
+    Sets which files are validated before their conversion. By default, all files are validated.
+    """
+    global _validation_policies
+    _validation_policies = policies
+
+
+_conversion_options: ConversionOptions = ConversionOptions()
+
+
+def set_conversion_options(options: ConversionOptions):
+    """
+    Sets the optional conversion steps of all handlers.
+    """
+    global _conversion_options
+    _conversion_options = options
+
+
+@functools.lru_cache(maxsize=None)
+def _xsd_sha256(xsd_path: str) -> str:
+    # the schemas are part of the package and don't change while running
+    return sha256_of_file(xsd_path)
 
-    xml_doc = etree.parse(xml_path)
 
-    # xmlschema.assert_(xml_doc)
-    return_val = xmlschema.validate(xml_doc)
+def _validate_xsd_schema(xml: IncomingFile, xsd_path: str) -> bool:
+    """
+    Validates the file against the schema. A result of a previous run is taken from the validation cache if enabled,
+    the file is neither parsed nor validated in this case.
+    """
+    if _validation_cache is None:
+        return _run_xsd_validation(xml, xsd_path)[0]
+
+    input_sha256: str = xml.sha256()
+    xsd_sha256: str = _xsd_sha256(str(xsd_path))
+    cached: Optional[Tuple[bool, str]] = _validation_cache.get(input_sha256, xsd_sha256)
+    if cached is not None:
+        valid, error = cached
+        if not valid:
+            logger.debug("Validation with [" + str(xsd_path) + "] resulted in (cached):\n" + error)
+        return valid
+
+    valid, error = _run_xsd_validation(xml, xsd_path)
+    _validation_cache.put(input_sha256, xsd_sha256, valid, error)
+    return valid
+
+
+def _run_xsd_validation(xml: IncomingFile, xsd_path: str) -> Tuple[bool, str]:
+    """
+    :return: whether the file is valid and the error text if it isn't
+    """
+    with stage(xml.name, "validation"):
+        xmlschema_doc = etree.parse(os.path.join(xsd_path))
+        xmlschema = etree.XMLSchema(xmlschema_doc)
+
+        with xml.source() as source:
+            xml_doc = etree.parse(source)
+
+        # xmlschema.assert_(xml_doc)
+        return_val = xmlschema.validate(xml_doc)
     if not return_val:
-        _log_xsd_validation_error(xmlschema, xsd_path)
-    return return_val
+        return return_val, _log_xsd_validation_error(xmlschema, xsd_path)
+    return return_val, ""
 
 
-def _log_xsd_validation_error(xmlschema, xsd_path):
+def _log_xsd_validation_error(xmlschema, xsd_path) -> str:
     log = xmlschema.error_log
     error = log.last_error
     logger.debug("Validation with [" + str(xsd_path) + "] resulted in:\n" + str(error))
+    return str(error)
+
+
+def _log_diagnostic_validation(xml: IncomingFile, xsd_path: str):
+    """
+    Validates a file which failed after being converted without validation, the result usually explains the failure.
+    """
+    try:
+        valid, error = _run_xsd_validation(xml, xsd_path)
+    except etree.XMLSyntaxError as e:
+        valid, error = False, str(e)
+    if valid:
+        logger.error("[" + xml.name + "] was converted without validation and failed, "
+                     "although it is valid against [" + str(xsd_path) + "]")
+    else:
+        logger.error("[" + xml.name + "] was converted without validation and failed, "
+                     "validation with [" + str(xsd_path) + "] resulted in:\n" + error)
+
+
+class _UnvalidatedConversionContext(ConversionContext):
+    """
+    Context of a file which was matched by the namespace of its root element only.
+    """
+    _incoming_file: IncomingFile
+    _validation_filepath: str
+
+    def __init__(self, strategy: ConversionStrategy, doc: ConverterDocument, incoming_file: IncomingFile,
+                 validation_filepath: str):
+        super().__init__(strategy, doc)
+        self._incoming_file = incoming_file
+        self._validation_filepath = validation_filepath
+
+    def convert(self) -> Document:
+        try:
+            return super().convert()
+        except Exception:
+            _log_diagnostic_validation(self._incoming_file, self._validation_filepath)
+            raise
 
 
 class IncomingFileHandler(ABC):
@@ -51,6 +198,10 @@ class IncomingFileHandler(ABC):
     def handle(self, request) -> Document:
         pass
 
+    @abstractmethod
+    def prepare(self, request) -> ConversionContext:
+        pass
+
     @abstractmethod
     def is_instance_of(self, filepath: str) -> bool:
         pass
@@ -63,83 +214,216 @@ class AbstractIncomingFileHandler(IncomingFileHandler):
         self._next_handler = handler
         return handler
 
-    @abstractmethod
     def handle(self, request: str) -> Document:
+        context: ConversionContext = self.prepare(request)
+        if context is None:
+            return None
+        return context.convert()
+
+    @abstractmethod
+    def prepare(self, request: str) -> ConversionContext:
+        """
+        Validates and parses the request. The conversion itself is done by calling convert() on the returned context.
+        This allows running parsing and conversion in separate steps.
+        """
         if self._next_handler:
-            return self._next_handler.handle(request)
+            return self._next_handler.prepare(request)
         else:
-            logger.error("The read file [" + request + "] did not match any of the possible files.\n"
+            logger.error("The read file [" + str(request) + "] did not match any of the possible files.\n"
                                                        "Possible options are: [" + str(list(SupportedTypes)) + "]")
 
-    @abstractmethod
+    def handle_next(self, request: str) -> Document:
+        """
+        Passes the request on to the next handler of the chain, e.g. after this handler found it invalid.
+        """
+        context: ConversionContext = AbstractIncomingFileHandler.prepare(self, request)
+        if context is None:
+            return None
+        return context.convert()
+
     def handle_with_force(self, request: str) -> Document:
-        pass
+        context: ConversionContext = self.prepare_with_force(request)
+        if context is None:
+            return None
+        return context.convert()
 
+    @abstractmethod
+    def prepare_with_force(self, request: str) -> ConversionContext:
+        pass
 
-class PageXML2019Handler(AbstractIncomingFileHandler):
-    _TYPE: SupportedTypes = SupportedTypes.PAGE_XML_2019
-    _VALIDATION_FILEPATH: str = Path(__file__).parent / "page-xml/2019-07-15.xsd"
 
-    def is_instance_of(self, filepath: str) -> bool:
-        return _validate_xsd_schema(filepath, self._VALIDATION_FILEPATH)
+class PageXMLHandler(AbstractIncomingFileHandler, ABC):
+    """
+    The PAGE versions only differ in their schema, their pyxb binding and their conversion strategy.
+    """
+    _TYPE: SupportedTypes
+    _VALIDATION_FILEPATH: str
+    _BINDING: ModuleType
+
+    def is_instance_of(self, filepath: Union[str, IncomingFile]) -> bool:
+        """
+        Validates the file against the schema, or only compares the namespace of its root element if the validation
+        policy of the file skips the validation.
+        """
+        incoming_file: IncomingFile = IncomingFile.of(filepath)
+        if self._is_validated(incoming_file):
+            return _validate_xsd_schema(incoming_file, self._VALIDATION_FILEPATH)
+        with incoming_file.source() as source:
+            return self.matches_namespace(detect_namespace(source))
+
+    # noinspection PyMethodMayBeStatic
+    def _is_validated(self, incoming_file: IncomingFile) -> bool:
+        return _validation_policies.for_file(incoming_file.name).should_validate(incoming_file.sha256)
+
+    def prepare(self, request: Union[str, IncomingFile]) -> ConversionContext:
+        request: IncomingFile = IncomingFile.of(request)
+        if not self.is_instance_of(request):
+            return super().prepare(request)
+        if self._is_validated(request):
+            logger.info("[" + request.name + "] validated successfully for [" + self._TYPE.name + "]")
+            return self._create_context(request, validated=True)
+        logger.info("[" + request.name + "] matched the namespace of [" + self._TYPE.name + "] without validation")
+        return self._create_context(request, validated=False)
+
+    def matches_namespace(self, namespace: Optional[str]) -> bool:
+        return namespace == self._BINDING.Namespace.uri()
+
+    def handle_speculatively(self, request: IncomingFile) -> Optional[Document]:
+        """
+        Parses and converts the file while it is validated in a second thread. lxml releases the GIL while validating,
+        therefore the latency is about the longer of both instead of their sum.
+        The namespace of the file has to match this handler already.
+        :return: the converted document, None if the file is invalid for this handler
+        """
+        if not self._is_validated(request):
+            logger.info("[" + request.name + "] matched the namespace of [" + self._TYPE.name + "] without validation")
+            return self._create_context(request, validated=False).convert()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="validation") as executor:
+            validation: Future = executor.submit(_validate_xsd_schema, request, self._VALIDATION_FILEPATH)
+            try:
+                document: Optional[Document] = self._create_context(request, validated=True).convert()
+            except Exception:
+                # an invalid file explains the failure, which is discarded like any other invalid conversion
+                if validation.result():
+                    raise
+                document = None
+            if not validation.result():
+                logger.info("Discarded the speculative conversion of [" + request.name + "], it is invalid for [" +
+                            self._TYPE.name + "]")
+                return None
+        logger.info("[" + request.name + "] validated successfully for [" + self._TYPE.name + "]")
+        return document
+
+    def _create_context(self, request: IncomingFile, validated: bool) -> ConversionContext:
+        """
+        :param validated: whether the file was validated against the schema. A file which was not validated is
+        validated afterwards if parsing or converting it fails.
+        """
+        try:
+            with request.open() as xml, stage(request.name, "parse"):
+                tmp_conversion_type = create_from_xml(self._BINDING, xml)
+        except Exception:
+            if not validated:
+                _log_diagnostic_validation(request, self._VALIDATION_FILEPATH)
+            raise
+        converter_document: ConverterDocument = ConverterDocument(filepath=request.name, original=None,
+                                                                  tmp_type=tmp_conversion_type)
+        if validated:
+            return ConversionContext(self._create_strategy(), converter_document)
+        return _UnvalidatedConversionContext(self._create_strategy(), converter_document, request,
+                                             self._VALIDATION_FILEPATH)
+
+    def _create_strategy(self) -> ConversionStrategy:
+        # the strategy holds the state of a single conversion, the conversions of several threads need their own
+        return type(self._TYPE.value)(_conversion_options)
+
+    def prepare_with_force(self, request: Union[str, IncomingFile]) -> ConversionContext:
+        request: IncomingFile = IncomingFile.of(request)
+        logger.info("[" + request.name + "] was forced to be processed with [ " + self._TYPE.name + "]")
+        with stage(request.name, "parse"):
+            try:
+                with request.open() as xml:
+                    tmp_conversion_type = create_from_xml(self._BINDING, xml)
+            except pyxb.UnrecognizedContentError as e:
+                logger.error("ERROR converting given document!")
+                logger.error(e.details())
+                # the first parse consumed the input, e.g. a decompressing stream, which is therefore opened again
+                # only this parse is unvalidated, other files and threads keep validating
+                with request.open() as xml, validation_when_parsing(False):
+                    tmp_conversion_type = create_from_xml(self._BINDING, xml)
+
+        converter_document: ConverterDocument = ConverterDocument(filepath=request.name, original=None,
+                                                                  tmp_type=tmp_conversion_type)
+        return ConversionContext(self._create_strategy(), converter_document)
 
-    def handle(self, request: str):
-        if self.is_instance_of(request):
-            logger.info("[" + request + "] validated successfully for [" + self._TYPE.name + "]")
-        else:
-            return super().handle(request)
 
-    def handle_with_force(self, request: str) -> Document:
-        pass
+class PageXML2019Handler(PageXMLHandler):
+    _TYPE: SupportedTypes = SupportedTypes.PAGE_XML_2019
+    _VALIDATION_FILEPATH: str = Path(__file__).parent / "page-xml/2019-07-15.xsd"
+    _BINDING: ModuleType = py_xb_2019
 
 
-class PageXML2017Handler(AbstractIncomingFileHandler):
+class PageXML2017Handler(PageXMLHandler):
     _TYPE: SupportedTypes = SupportedTypes.PAGE_XML_2017
     _VALIDATION_FILEPATH: str = Path(__file__).parent / "page-xml/2017-07-15.xsd"
-
-    def is_instance_of(self, filepath: str) -> bool:
-        return _validate_xsd_schema(filepath, self._VALIDATION_FILEPATH)
-
-    def handle(self, request) -> Document:
-        if self.is_instance_of(request):
-            logger.info("[" + request + "] validated successfully for [" + self._TYPE.name + "]")
-            xml: str = read_xml(request)
-            converter_document: ConverterDocument = ConverterDocument(filepath=request, original=xml,
-                                                                      tmp_type=py_xb_2017.CreateFromDocument(xml))
-            context = ConversionContext(self._TYPE.value, converter_document)
-            return context.convert()
-        else:
-            return super().handle(request)
-
-    def handle_with_force(self, request: str) -> Document:
-        logger.info("[" + request + "] was forced to be processed with [ " + self._TYPE.name + "]")
-        xml: str = read_xml(request)
-        try:
-            tmp_conversion_type = py_xb_2017.CreateFromDocument(xml)
-        except pyxb.UnrecognizedContentError as e:
-            logger.error("ERROR converting given document!")
-            logger.error(e.details())
-            pyxb.RequireValidWhenParsing(False)
-            tmp_conversion_type = py_xb_2017.CreateFromDocument(xml)
-
-        converter_document: ConverterDocument = ConverterDocument(filepath=request, original=xml,
-                                                                  tmp_type=tmp_conversion_type)
-        context = ConversionContext(self._TYPE.value, converter_document)
-        return context.convert()
+    _BINDING: ModuleType = py_xb_2017
 
 
-def handle_incoming_file(filepath: str) -> Document:
-    logger.info("Start processing on: [" + filepath + "]")
+def _create_handler_chain() -> IncomingFileHandler:
     page_xml_2019 = PageXML2019Handler()
     page_xml_2019.set_next(PageXML2017Handler())
-    return page_xml_2019.handle(filepath)
+    return page_xml_2019
 
 
-def handle_force_incoming_file(filepath: str, force_arg: str) -> Document:
+def _create_force_handler(force_arg: str) -> AbstractIncomingFileHandler:
     if force_arg == "page2017":
-        page_xml_2017 = PageXML2017Handler()
-        return page_xml_2017.handle_with_force(filepath)
+        return PageXML2017Handler()
+    elif force_arg == "page2019":
+        return PageXML2019Handler()
     else:
         raise ValueError(
             "The specified forced strategy does not match the available strategies. "
             "Please look at the --help output for further information.")
+
+
+def handle_incoming_file(filepath: Union[str, IncomingFile]) -> Document:
+    """
+    :param filepath: a filepath on disk or an in-memory file, e.g. an archive member
+    """
+    logger.info("Start processing on: [" + str(filepath) + "]")
+    return _create_handler_chain().handle(IncomingFile.of(filepath))
+
+
+def handle_incoming_file_speculatively(filepath: Union[str, IncomingFile]) -> Document:
+    """
+    Same as handle_incoming_file, but the handler matching the namespace of the file converts it while validating it.
+    Files which turn out to be invalid for this handler are passed on to its successors in the handler chain, the
+    handlers before it don't match the namespace and would reject the file anyway.
+    """
+    logger.info("Start processing on: [" + str(filepath) + "]")
+    incoming_file: IncomingFile = IncomingFile.of(filepath)
+    with incoming_file.source() as source:
+        namespace: Optional[str] = detect_namespace(source)
+    handler: Optional[AbstractIncomingFileHandler] = _create_handler_chain()
+    while handler is not None:
+        if handler.matches_namespace(namespace):
+            document: Optional[Document] = handler.handle_speculatively(incoming_file)
+            if document is not None:
+                return document
+            return handler.handle_next(incoming_file)
+        handler = handler._next_handler
+    return _create_handler_chain().handle(incoming_file)
+
+
+def handle_force_incoming_file(filepath: Union[str, IncomingFile], force_arg: str) -> Document:
+    return _create_force_handler(force_arg).handle_with_force(IncomingFile.of(filepath))
+
+
+def prepare_incoming_file(filepath: Union[str, IncomingFile]) -> ConversionContext:
+    logger.info("Start processing on: [" + str(filepath) + "]")
+    return _create_handler_chain().prepare(IncomingFile.of(filepath))
+
+
+def prepare_force_incoming_file(filepath: Union[str, IncomingFile], force_arg: str) -> ConversionContext:
+    return _create_force_handler(force_arg).prepare_with_force(IncomingFile.of(filepath))
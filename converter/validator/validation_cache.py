@@ -0,0 +1,85 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+
+def sha256_of_file(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """
+    Persistent cache of xsd validation results. The entries are keyed by the SHA-256 of the input file and of the xsd
+    schema, a changed input or schema therefore never uses an outdated result.
+    Entries expire after max_age seconds. The expired entries and the oldest entries above max_entries are evicted
+    when the cache is opened and every eviction_interval puts, the cache may therefore exceed max_entries by up to
+    eviction_interval entries in between.
+    """
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+    _max_entries: int
+    _max_age: float
+    _eviction_interval: int
+    _puts: int
+
+    def __init__(self, path: str, max_entries: int = 100000, max_age: float = 30 * 24 * 60 * 60,
+                 eviction_interval: int = 1000):
+        """
+        :param eviction_interval: number of puts between two evictions, the eviction walks the index of all entries
+        """
+        self._max_entries = max_entries
+        self._max_age = max_age
+        self._eviction_interval = eviction_interval
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS validation ("
+                                 "input_sha256 TEXT NOT NULL, "
+                                 "xsd_sha256 TEXT NOT NULL, "
+                                 "valid INTEGER NOT NULL, "
+                                 "error TEXT NOT NULL, "
+                                 "created REAL NOT NULL, "
+                                 "PRIMARY KEY (input_sha256, xsd_sha256))")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS validation_created ON validation (created)")
+        self._evict()
+
+    def get(self, input_sha256: str, xsd_sha256: str) -> Optional[Tuple[bool, str]]:
+        """
+        :return: (valid, error text) or None if there is no entry which is not expired
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT valid, error FROM validation "
+                                           "WHERE input_sha256 = ? AND xsd_sha256 = ? AND created >= ?",
+                                           (input_sha256, xsd_sha256, time.time() - self._max_age)).fetchone()
+        if row is None:
+            return None
+        return bool(row[0]), row[1]
+
+    def put(self, input_sha256: str, xsd_sha256: str, valid: bool, error: str):
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO validation VALUES (?, ?, ?, ?, ?)",
+                                     (input_sha256, xsd_sha256, int(valid), error, time.time()))
+            self._puts += 1
+            if self._puts % self._eviction_interval == 0:
+                self._evict()
+
+    def _evict(self):
+        self._connection.execute("DELETE FROM validation WHERE created < ?", (time.time() - self._max_age,))
+        self._connection.execute("DELETE FROM validation WHERE rowid IN "
+                                 "(SELECT rowid FROM validation ORDER BY created DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                                 (self._max_entries,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM validation").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
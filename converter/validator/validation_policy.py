@@ -0,0 +1,110 @@
+import os
+from typing import Callable, IO, List, Optional, Tuple, Union
+
+from lxml import etree
+
+
+class ValidationPolicy:
+    """
+    Decides whether a file is validated against the xsd schema before it is converted.
+    Files which are not validated are matched by the namespace of their root element only.
+    """
+    ALWAYS: str = "always"
+    NEVER: str = "never"
+    SAMPLE: str = "sample"
+
+    mode: str
+    sample_size: int
+
+    def __init__(self, mode: str, sample_size: int = 1):
+        """
+        :param sample_size: with mode sample, one out of sample_size files is validated
+        """
+        if mode not in (self.ALWAYS, self.NEVER, self.SAMPLE):
+            raise ValueError("Unknown validation policy [" + mode + "]")
+        if sample_size < 1:
+            raise ValueError("The sample size of a validation policy has to be at least 1")
+        self.mode = mode
+        self.sample_size = sample_size
+
+    @classmethod
+    def parse(cls, policy: str) -> "ValidationPolicy":
+        """
+        :param policy: always, never or sample=1/N
+        """
+        if policy.startswith(cls.SAMPLE + "="):
+            numerator, _, denominator = policy[len(cls.SAMPLE) + 1:].partition("/")
+            if numerator != "1" or not denominator.isdigit():
+                raise ValueError("A sampled validation policy has to look like sample=1/N, got [" + policy + "]")
+            return cls(cls.SAMPLE, int(denominator))
+        return cls(policy)
+
+    def should_validate(self, content_sha256: Callable[[], str]) -> bool:
+        """
+        :param content_sha256: returns the hash of the file content, it is only called by sampled policies
+        """
+        if self.mode == self.ALWAYS:
+            return True
+        if self.mode == self.NEVER:
+            return False
+        # the sample is taken by the content instead of a counter or the filepath, therefore every handler of the chain
+        # and every worker takes the same decision for a file, regardless of where it was claimed
+        return int(content_sha256()[:8], 16) % self.sample_size == 0
+
+
+class ValidationPolicies:
+    """
+    Validation policies by filepath prefix, e.g. the input directory of a trusted producer.
+    The longest matching prefix wins, files without a matching prefix are always validated.
+    Prefixes and filepaths are compared as absolute paths, a claimed file in <input_dir>/processing/ therefore still
+    matches the prefix of its input dir.
+    """
+    _policies: List[Tuple[str, ValidationPolicy]]
+
+    def __init__(self):
+        self._policies = []
+
+    @classmethod
+    def parse(cls, specs: List[str]) -> "ValidationPolicies":
+        """
+        :param specs: entries like /data/internal/=never or /data/partner/=sample=1/100
+        """
+        policies = cls()
+        for spec in specs:
+            prefix, separator, policy = spec.partition("=")
+            if not separator:
+                raise ValueError("A validation policy has to look like <prefix>=<policy>, got [" + spec + "]")
+            policies.add(prefix, ValidationPolicy.parse(policy))
+        return policies
+
+    def add(self, prefix: str, policy: ValidationPolicy):
+        self._policies.append((os.path.abspath(prefix), policy))
+        self._policies.sort(key=lambda entry: len(entry[0]), reverse=True)
+
+    def for_file(self, filepath: str) -> ValidationPolicy:
+        filepath = os.path.abspath(filepath)
+        for prefix, policy in self._policies:
+            if filepath == prefix or filepath.startswith(prefix.rstrip(os.sep) + os.sep):
+                return policy
+        return ValidationPolicy(ValidationPolicy.ALWAYS)
+
+
+def detect_namespace(source: Union[str, IO[bytes]]) -> Optional[str]:
+    """
+    :param source: filepath or file object
+    :return: namespace of the root element. Only the beginning of the file is parsed.
+    None if the file is no well-formed xml.
+    """
+    try:
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                return _detect_namespace(file)
+        return _detect_namespace(source)
+    except etree.XMLSyntaxError:
+        return None
+
+
+def _detect_namespace(file: IO[bytes]) -> Optional[str]:
+    for _, element in etree.iterparse(file, events=("start",)):
+        return etree.QName(element).namespace
+    return None
@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, List, Set, Optional
+
+
+class ProcessingJournal:
+    """
+    Keeps track of the files which are currently in-flight in convert-dir.py.
+    A file is recorded before its conversion starts and every write step is marked as soon as it is completed.
+    The entry is removed after the input file has been deleted. Entries which are still present on startup belong to
+    files which were in-flight when the previous run stopped and can be resumed with the missing steps only.
+    Each claim of a file gets a claim id and can reserve an output path, a resumed file keeps both. The sinks use them
+    to overwrite the outputs of an interrupted write instead of writing a second copy.
+    """
+    STARTED: str = "started"
+    FAILED: str = "failed"
+
+    _path: str
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        # isolation_level=None -> autocommit, each state change is persisted as soon as the statement returns
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS journal ("
+                                 "filepath TEXT PRIMARY KEY, "
+                                 "state TEXT NOT NULL, "
+                                 "completed_steps TEXT NOT NULL DEFAULT '', "
+                                 "updated REAL NOT NULL, "
+                                 "claim_id TEXT, "
+                                 "output_path TEXT, "
+                                 "source_path TEXT)")
+        columns: Set[str] = {row[1] for row in self._connection.execute("PRAGMA table_info(journal)")}
+        # journals of earlier versions
+        for column in ("claim_id", "output_path", "source_path"):
+            if column not in columns:
+                self._connection.execute("ALTER TABLE journal ADD COLUMN " + column + " TEXT")
+
+    def start(self, filepath: str, source_path: Optional[str] = None):
+        """
+        Records a freshly claimed file as in-flight. An entry left behind by an earlier file with the same path, e.g. a
+        failed file which was moved back into the input dir, is reset: its completed steps don't apply to this file.
+        :param source_path: the path of the file before it was claimed
+        """
+        with self._lock:
+            self._connection.execute("INSERT INTO journal (filepath, state, updated, claim_id, source_path) "
+                                     "VALUES (?, ?, ?, ?, ?) "
+                                     "ON CONFLICT(filepath) DO UPDATE SET state = excluded.state, "
+                                     "completed_steps = '', updated = excluded.updated, "
+                                     "claim_id = excluded.claim_id, output_path = NULL, "
+                                     "source_path = excluded.source_path",
+                                     (filepath, self.STARTED, time.time(), uuid.uuid4().hex, source_path))
+
+    def resume(self, filepath: str):
+        """
+        Records an interrupted file as in-flight again. An already present entry is kept to preserve its completed
+        steps.
+        """
+        with self._lock:
+            self._connection.execute("INSERT OR IGNORE INTO journal (filepath, state, updated, claim_id) "
+                                     "VALUES (?, ?, ?, ?)", (filepath, self.STARTED, time.time(), uuid.uuid4().hex))
+            # entries of earlier versions have no claim id yet
+            self._connection.execute("UPDATE journal SET claim_id = ? WHERE filepath = ? AND claim_id IS NULL",
+                                     (uuid.uuid4().hex, filepath))
+
+    def claim_id(self, filepath: str) -> str:
+        """
+        :return: the id of the current claim of the file, it stays the same when the file is resumed
+        """
+        with self._lock:
+            return self._connection.execute("SELECT claim_id FROM journal WHERE filepath = ?",
+                                            (filepath,)).fetchone()[0]
+
+    def source_path(self, filepath: str) -> Optional[str]:
+        """
+        :return: the path of the file before it was claimed, None if it is unknown
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT source_path FROM journal WHERE filepath = ?",
+                                           (filepath,)).fetchone()
+        return None if row is None else row[0]
+
+    def reserve_output(self, filepath: str, choose: Callable[[Set[str]], str]) -> str:
+        """
+        :param choose: receives the output paths reserved by the other journaled files and returns a new output path
+        :return: the output path reserved for the current claim of the file, it is only chosen once
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT output_path FROM journal WHERE filepath = ?",
+                                           (filepath,)).fetchone()
+            if row is not None and row[0] is not None:
+                return row[0]
+            reserved: Set[str] = {other[0] for other in self._connection.execute(
+                "SELECT output_path FROM journal WHERE output_path IS NOT NULL")}
+            output_path: str = choose(reserved)
+            self._connection.execute("UPDATE journal SET output_path = ?, updated = ? WHERE filepath = ?",
+                                     (output_path, time.time(), filepath))
+            return output_path
+
+    def complete_step(self, filepath: str, step: str):
+        with self._lock:
+            steps: Set[str] = self._completed_steps(filepath)
+            steps.add(step)
+            self._connection.execute("UPDATE journal SET completed_steps = ?, updated = ? WHERE filepath = ?",
+                                     (",".join(sorted(steps)), time.time(), filepath))
+
+    def completed_steps(self, filepath: str) -> Set[str]:
+        with self._lock:
+            return self._completed_steps(filepath)
+
+    def _completed_steps(self, filepath: str) -> Set[str]:
+        row = self._connection.execute("SELECT completed_steps FROM journal WHERE filepath = ?",
+                                       (filepath,)).fetchone()
+        if row is None or row[0] == "":
+            return set()
+        return set(row[0].split(","))
+
+    def fail(self, filepath: str):
+        """
+        Failed files are kept in the journal, but they are not resumed on the next startup.
+        """
+        with self._lock:
+            self._connection.execute("UPDATE journal SET state = ?, updated = ? WHERE filepath = ?",
+                                     (self.FAILED, time.time(), filepath))
+
+    def finish(self, filepath: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM journal WHERE filepath = ?", (filepath,))
+
+    def state(self, filepath: str) -> Optional[str]:
+        """
+        :return: the recorded state or None if the file is not journaled
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT state FROM journal WHERE filepath = ?", (filepath,)).fetchone()
+        return None if row is None else row[0]
+
+    def in_flight(self) -> List[str]:
+        """
+        :return: all files which were started but neither finished nor failed, in the order they were started
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT filepath FROM journal WHERE state = ? ORDER BY rowid",
+                                            (self.STARTED,)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+TABLES: Dict[str, List[str]] = {
+    "regions": ["document_id", "oid", "group", "region_type", "region_subtype", "xs", "ys"],
+    "lines": ["document_id", "oid", "group", "line_type", "xs", "ys"],
+    "text": ["document_id", "oid", "group", "text"],
+}
+
+
+def _split_points(points) -> Tuple[List[int], List[int]]:
+    return [int(point[0]) for point in points], [int(point[1]) for point in points]
+
+
+def flatten_document(document_id: str, dct: dict) -> Dict[str, Dict[str, list]]:
+    """
+    Splits the content of a converted document into the columns of the regions, lines and text tables.
+    The coordinates of a polygon are stored as two flat integer columns xs and ys.
+    :param dct: the result of Document.to_dict()
+    :return: the columns by table name
+    """
+    tables: Dict[str, Dict[str, list]] = {table: {column: [] for column in columns}
+                                          for table, columns in TABLES.items()}
+    for content in dct["content"]:
+        otype: str = content["otype"]
+        if otype == "region":
+            row: dict = {"region_type": content.get("region_type"), "region_subtype": content.get("region_subtype")}
+            row["xs"], row["ys"] = _split_points(content["polygon"])
+            table: str = "regions"
+        elif otype in ("linepoly", "baseline"):
+            row = {"line_type": otype}
+            row["xs"], row["ys"] = _split_points(content["polygon" if otype == "linepoly" else "points"])
+            table = "lines"
+        elif otype == "text":
+            row = {"text": content["text"]}
+            table = "text"
+        else:
+            continue
+        row.update(document_id=document_id, oid=content["oid"], group=content.get("group"))
+        for column, values in tables[table].items():
+            values.append(row[column])
+    return tables
+
+
+class ParquetExporter:
+    """
+    Writes the regions, lines and text of the converted documents into the parquet datasets <output_dir>/regions,
+    <output_dir>/lines and <output_dir>/text. The rows are buffered and flushed when row_group_size rows are pending or
+    flush_interval seconds after the first pending row. Each flush writes a new complete file per table, named
+    <run>-<n>.parquet after the start of the exporter: the files of earlier runs are never overwritten and every file
+    is readable on its own, e.g. with pyarrow.parquet.read_table(<output_dir>/regions).
+    write() returns a future which is completed once the rows of the document are written, a document whose rows are
+    not flushed yet is lost on a crash and has to be converted again.
+    Requires the optional pyarrow package.
+    """
+    _output_dir: str
+    _row_group_size: int
+    _flush_interval: float
+    _run: str
+    _flushes: int
+    _condition: threading.Condition
+    _pa: ModuleType
+    _pq: ModuleType
+    _schemas: dict
+    _buffers: Dict[str, Dict[str, list]]
+    _pending_rows: int
+    _first_pending: float
+    _futures: List[Future]
+    _closed: bool
+    _thread: threading.Thread
+
+    def __init__(self, output_dir: str, row_group_size: int = 10000, flush_interval: float = 5):
+        """
+        :param flush_interval: maximum number of seconds the rows of a document wait for a flush
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("The parquet export requires the pyarrow package") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._schemas = {
+            "regions": pyarrow.schema([("document_id", pyarrow.string()), ("oid", pyarrow.int64()),
+                                       ("group", pyarrow.int64()), ("region_type", pyarrow.string()),
+                                       ("region_subtype", pyarrow.string()),
+                                       ("xs", pyarrow.list_(pyarrow.int32())), ("ys", pyarrow.list_(pyarrow.int32()))]),
+            "lines": pyarrow.schema([("document_id", pyarrow.string()), ("oid", pyarrow.int64()),
+                                     ("group", pyarrow.int64()), ("line_type", pyarrow.string()),
+                                     ("xs", pyarrow.list_(pyarrow.int32())), ("ys", pyarrow.list_(pyarrow.int32()))]),
+            "text": pyarrow.schema([("document_id", pyarrow.string()), ("oid", pyarrow.int64()),
+                                    ("group", pyarrow.int64()), ("text", pyarrow.string())]),
+        }
+        self._output_dir = output_dir
+        self._row_group_size = row_group_size
+        self._flush_interval = flush_interval
+        # several runs, e.g. of watchers on different hosts, may export into the same dir
+        self._run = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self._flushes = 0
+        self._condition = threading.Condition()
+        self._reset_buffers()
+        self._closed = False
+        for table in TABLES:
+            os.makedirs(os.path.join(output_dir, table), exist_ok=True)
+        self._thread = threading.Thread(target=self._run_flushes, name="parquet-flush", daemon=True)
+        self._thread.start()
+
+    def _reset_buffers(self):
+        self._buffers = {table: {column: [] for column in columns} for table, columns in TABLES.items()}
+        self._pending_rows = 0
+        self._futures = []
+
+    def write(self, document_id: str, dct: dict) -> Future:
+        """
+        :param document_id: identifies the document in all tables, e.g. the path the input was submitted with
+        :return: future which is completed when the rows of the document are written
+        """
+        tables: Dict[str, Dict[str, list]] = flatten_document(document_id, dct)
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The parquet export is already closed")
+            if not self._futures:
+                self._first_pending = time.monotonic()
+            for table, columns in tables.items():
+                buffer: Dict[str, list] = self._buffers[table]
+                for column, values in columns.items():
+                    buffer[column].extend(values)
+                self._pending_rows = max(self._pending_rows, len(buffer["document_id"]))
+            self._futures.append(future)
+            self._condition.notify()
+        return future
+
+    def _run_flushes(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._futures or self._closed)
+                if not self._futures:
+                    return
+                self._condition.wait_for(lambda: self._closed or self._pending_rows >= self._row_group_size,
+                                         max(self._first_pending + self._flush_interval - time.monotonic(), 0))
+                buffers: Dict[str, Dict[str, list]] = self._buffers
+                futures: List[Future] = self._futures
+                self._reset_buffers()
+            # the next rows are buffered while the files are written
+            try:
+                self._write_files(buffers)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future in futures:
+                    future.set_result(None)
+
+    def _write_files(self, buffers: Dict[str, Dict[str, list]]):
+        self._flushes += 1
+        for table, buffer in buffers.items():
+            if not buffer["document_id"]:
+                continue
+            path: str = os.path.join(self._output_dir, table, self._run + "-" + format(self._flushes, "06d") +
+                                     ".parquet")
+            # pyarrow skips files starting with a dot when it reads the dataset, e.g. those left behind by a crash
+            tmp_path: str = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+            self._pq.write_table(self._pa.Table.from_pydict(buffer, schema=self._schemas[table]), tmp_path,
+                                 row_group_size=len(buffer["document_id"]))
+            os.replace(tmp_path, path)
+
+    def close(self):
+        """
+        Writes the pending rows.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
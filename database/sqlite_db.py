@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import List, Optional, Tuple, Union
+
+JSON: str = "json"
+JSON_ZLIB: str = "json+zlib"
+
+
+def encode_document(dct: dict, compress: bool) -> Tuple[str, bytes]:
+    """
+    :return: the encoding and the encoded document
+    """
+    content: bytes = json.dumps(dct, separators=(",", ":")).encode("utf-8")
+    if compress:
+        return JSON_ZLIB, zlib.compress(content)
+    return JSON, content
+
+
+def decode_document(encoding: str, content: Union[str, bytes]) -> dict:
+    if encoding == JSON_ZLIB:
+        content = zlib.decompress(content)
+    return json.loads(content)
+
+
+class SQLiteStorage:
+    """
+    Stores one row per converted document in a single SQLite file. Uncompressed documents are stored as json text and
+    can be queried with the json functions of SQLite.
+    The documents are committed in batches by a committer thread (group commit): while it commits a transaction, the
+    submitted documents queue up and are committed together in the next one, up to batch_size documents. The batches
+    are therefore bounded by the number of documents submitted at the same time, which the sink runner limits to
+    --max_in_flight. submit() returns a future which is completed once the document is committed, a document is
+    therefore only reported as written once it is durable.
+    """
+    _connection: sqlite3.Connection
+    _condition: threading.Condition
+    _commit_lock: threading.Lock
+    _batch_size: int
+    _compress: bool
+    _pending: List[Tuple[tuple, Future]]
+    _closed: bool
+    _thread: threading.Thread
+
+    def __init__(self, path: str, batch_size: int = 256, compress: bool = True):
+        """
+        :param batch_size: maximum number of documents committed in one transaction
+        :param compress: stores the json zlib compressed instead of as text
+        """
+        self._batch_size = batch_size
+        self._compress = compress
+        self._pending = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL is durable against crashes of the application, not of the machine
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS documents ("
+                                 "id INTEGER PRIMARY KEY, "
+                                 "source_path TEXT NOT NULL, "
+                                 "content_sha256 TEXT, "
+                                 "converter_version TEXT NOT NULL, "
+                                 "encoding TEXT NOT NULL, "
+                                 "document BLOB NOT NULL, "
+                                 "created REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS documents_source_path ON documents (source_path)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS documents_content_sha256 ON documents (content_sha256)")
+        self._thread = threading.Thread(target=self._run_commits, name="sqlite-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, source_path: str, content_sha256: Optional[str], converter_version: str, dct: dict) -> Future:
+        """
+        :param source_path: path the input was submitted with, e.g. the path in the input dir of convert-dir and not
+        the path of the claimed file
+        :param content_sha256: hash of the converted input file
+        :return: future which is completed when the document is committed
+        """
+        encoding, content = encode_document(dct, self._compress)
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The SQLite storage is already closed")
+            self._pending.append(((source_path, content_sha256, converter_version, encoding,
+                                   content.decode("utf-8") if encoding == JSON else content, time.time()), future))
+            self._condition.notify()
+        return future
+
+    def insert(self, source_path: str, content_sha256: Optional[str], converter_version: str, dct: dict):
+        """
+        Blocks until the document is committed.
+        """
+        self.submit(source_path, content_sha256, converter_version, dct).result()
+
+    def _run_commits(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending[:self._batch_size], self._pending[self._batch_size:]
+            # get() and close() share the connection
+            with self._commit_lock:
+                self._commit(pending)
+
+    def _commit(self, pending: List[Tuple[tuple, Future]]):
+        try:
+            self._connection.execute("BEGIN")
+            self._connection.executemany("INSERT INTO documents (source_path, content_sha256, converter_version, "
+                                         "encoding, document, created) VALUES (?, ?, ?, ?, ?, ?)",
+                                         [row for row, _ in pending])
+            self._connection.execute("COMMIT")
+        except Exception as e:
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        for _, future in pending:
+            future.set_result(None)
+
+    def get(self, source_path: str) -> Optional[dict]:
+        """
+        :return: the latest document converted from source_path
+        """
+        with self._commit_lock:
+            row = self._connection.execute("SELECT encoding, document FROM documents WHERE source_path = ? "
+                                           "ORDER BY id DESC LIMIT 1", (source_path,)).fetchone()
+        if row is None:
+            return None
+        return decode_document(*row)
+
+    def close(self):
+        """
+        Commits the pending documents and closes the connection.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        with self._commit_lock:
+            self._connection.close()
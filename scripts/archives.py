@@ -0,0 +1,129 @@
+import functools
+import os
+import re
+import tarfile
+import threading
+import time
+import zipfile
+from io import BytesIO
+from typing import Iterator, List, Optional
+
+from loguru import logger
+
+from converter.validator.incoming_file import IncomingFile
+
+
+def is_xml_member(name: str) -> bool:
+    """
+    Compressed members are decompressed by the reader while parsing them.
+    """
+    return name.lower().endswith((".xml", ".xml.gz", ".xml.bz2", ".xml.zst"))
+
+
+def is_safe_member(name: str) -> bool:
+    """
+    Members with an absolute name or a .. component would be written outside of the output dir (zip slip).
+    """
+    parts: List[str] = re.split(r"[/\\]", name)
+    return not (name.startswith(("/", "\\")) or re.match(r"^[A-Za-z]:", name) or ".." in parts)
+
+
+def is_converted_member(name: str) -> bool:
+    if not is_xml_member(name):
+        return False
+    if not is_safe_member(name):
+        logger.warning("skipping archive member with an unsafe name: [" + name + "]")
+        return False
+    return True
+
+
+def member_filepath(archive_path: str, member_name: str) -> str:
+    """
+    :return: the name of an archive member as seen by the converter, e.g. collection.tar/page/0001.xml
+    """
+    return os.path.join(archive_path, os.path.normpath(member_name))
+
+
+class ArchiveReader:
+    """
+    Iterates over the xml members of a zip or tar archive without extracting them to disk.
+    Zip members are read lazily by whoever accesses their content first. Zip allows random access, therefore several
+    parse workers read and decompress members in parallel.
+    Tar archives are read as a stream, each member is read while iterating because the stream can't go back.
+    """
+    _path: str
+    _zip: Optional[zipfile.ZipFile]
+
+    def __init__(self, path: str):
+        self._path = path
+        # ZipFile is safe for concurrent reads, it seeks and reads under a lock
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def __iter__(self) -> Iterator[IncomingFile]:
+        if self._zip is not None:
+            return self._iterate_zip()
+        return self._iterate_tar()
+
+    def _iterate_zip(self) -> Iterator[IncomingFile]:
+        for info in self._zip.infolist():
+            if info.is_dir() or not is_converted_member(info.filename):
+                continue
+            yield IncomingFile(member_filepath(self._path, info.filename),
+                               functools.partial(self._zip.read, info.filename))
+
+    def _iterate_tar(self) -> Iterator[IncomingFile]:
+        with tarfile.open(self._path, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile() or not is_converted_member(member.name):
+                    continue
+                content: bytes = archive.extractfile(member).read()
+                yield IncomingFile.from_bytes(member_filepath(self._path, member.name), content)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+class ArchiveWriter:
+    """
+    Writes files into a zip archive if the path ends with .zip, otherwise into a tar archive (gzip compressed for
+    .tar.gz and .tgz). The archive is written next to the path and moved into place on close(), like all other outputs
+    of this application.
+    """
+    _path: str
+    _tmp_path: str
+    _lock: threading.Lock
+    _zip: Optional[zipfile.ZipFile]
+    _tar: Optional[tarfile.TarFile]
+
+    def __init__(self, path: str):
+        self._path = path
+        self._tmp_path = path + ".tmp"
+        self._lock = threading.Lock()
+        self._zip = None
+        self._tar = None
+        if path.endswith(".zip"):
+            self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        elif path.endswith((".tar.gz", ".tgz")):
+            self._tar = tarfile.open(self._tmp_path, "w:gz")
+        else:
+            self._tar = tarfile.open(self._tmp_path, "w")
+
+    def write(self, name: str, content: bytes):
+        # both archive formats write their members one after another
+        with self._lock:
+            if self._zip is not None:
+                self._zip.writestr(name, content)
+                return
+            info: tarfile.TarInfo = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, BytesIO(content))
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+            else:
+                self._tar.close()
+            os.replace(self._tmp_path, self._path)
@@ -0,0 +1,134 @@
+import os
+import sys
+from argparse import Namespace
+from typing import Optional, Callable, List
+
+from loguru import logger
+
+from converter import serialization, stage_hooks
+from scripts import utility
+from scripts.archives import ArchiveReader
+from scripts.pipeline import Pipeline, Stage, WorkItem, parse, convert, serialize
+from scripts.sinks import AsyncSinkRunner, ArchiveSink, Sink, create_sinks, hashes_input
+from utility_argparse import *
+
+logger.remove()
+# add new custom loggers
+logger.add(sys.stdout, level='DEBUG')
+logger.add("errors.log", level='ERROR', rotation="1 MB")
+
+
+def parse_arguments() -> Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input_archive", type=str,
+                        help="The zip or tar archive (optionally compressed) containing the files to convert. "
+                             "The members are converted without extracting them to disk.",
+                        default=None)
+    parser.add_argument("-o", "--output_archive", type=str,
+                        help="Zip or tar archive the converted files are written into, e.g. output.zip or "
+                             "output.tar.gz. Each member is written as <member path>.json.",
+                        default=None)
+    parser.add_argument("--output_dir", type=str,
+                        help="If you specify this directory, the converted files will be written into this dir, "
+                             "keeping the directory structure of the archive.",
+                        default=None)
+    parser = add_pipeline_args(parser)
+    parser = add_force_args(parser)
+    parser = add_validation_args(parser)
+    parser = add_conversion_args(parser)
+    parser = add_output_format_args(parser)
+    parser = add_db_args(parser)
+    parser = add_sqlite_args(parser)
+    parser = add_parquet_args(parser)
+    parser = add_log_args(parser)
+    return parser.parse_args()
+
+
+def check_args(args: Namespace):
+    assert args.input_archive is not None
+    assert args.output_archive is not None or args.output_dir is not None or args.db_connection is not None \
+           or args.sqlite_output is not None or args.parquet_output is not None or args.log_output is True
+
+
+def main(args: Namespace) -> int:
+    """
+    :return: the exit status, 1 if any member failed
+    """
+    check_args(args)
+    utility.configure_validation(args)
+    utility.configure_conversion(args)
+    archive_reader: ArchiveReader = ArchiveReader(args.input_archive)
+    archive_sinks: List[Sink] = []
+    if args.output_archive is not None:
+        extension: str = serialization.EXTENSIONS[args.output_format]
+        archive_sinks.append(ArchiveSink(args.output_archive, lambda item: get_member_name(args, item) + extension,
+                                         args.output_format))
+    sinks: List[Sink] = create_sinks(args, get_output_filepath(args), archive_sinks)
+    runner: AsyncSinkRunner = AsyncSinkRunner(sinks, args.max_in_flight, args.io_threads)
+    # the members which failed in any stage, appended by the pipeline and the sink threads
+    failed: List[str] = []
+
+    def on_error(item: WorkItem, stage_name: str, exception: Exception):
+        logger.exception("[" + item.filepath + "] failed in stage [" + stage_name + "]: " + str(exception))
+        failed.append(item.filepath)
+        stage_hooks.finish(item.filepath)
+
+    stages = [Stage("parse", lambda item: parse(args.force_strategy, item, hashes_input(args)), args.parse_workers),
+              Stage("convert", convert, args.convert_workers),
+              Stage("serialize", serialize, args.serialize_workers),
+              Stage("sink", lambda item: sink(runner, failed, item))]
+    source = (WorkItem(incoming_file.name, incoming_file=incoming_file) for incoming_file in archive_reader)
+    pipeline: Pipeline = Pipeline(source, stages, args.queue_size, on_error)
+
+    logger.info("Started converting the archive: [" + args.input_archive + "]")
+    try:
+        pipeline.run(args.metrics_interval, stop_when_exhausted=True)
+    finally:
+        pipeline.stop()
+        # finishes the writes in flight and closes the sinks, e.g. the output archive
+        runner.close()
+        archive_reader.close()
+    if failed:
+        logger.error("Finished converting the archive: [" + args.input_archive + "], [" + str(len(failed)) +
+                     "] members failed")
+        return 1
+    logger.info("Finished converting the archive: [" + args.input_archive + "]")
+    return 0
+
+
+def get_member_name(args: Namespace, item: WorkItem) -> str:
+    return os.path.relpath(item.filepath, args.input_archive)
+
+
+def get_output_filepath(args: Namespace) -> Optional[Callable[[WorkItem], str]]:
+    if args.output_dir is None:
+        return None
+
+    output_dir: str = os.path.realpath(args.output_dir)
+
+    def get_filepath(item: WorkItem) -> str:
+        filepath: str = os.path.realpath(os.path.join(output_dir, get_member_name(args, item) +
+                                                      serialization.EXTENSIONS[args.output_format]))
+        # the archive reader skips unsafe member names, this guards against symlinks in the output dir as well
+        if os.path.commonpath([output_dir, filepath]) != output_dir:
+            raise ValueError("[" + item.filepath + "] would be written outside of the output dir: [" + filepath + "]")
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        return filepath
+
+    return get_filepath
+
+
+def sink(runner: AsyncSinkRunner, failed: List[str], item: WorkItem):
+    runner.submit(item, set(), on_finished=lambda written_item, exception: log_failed_write(failed, written_item,
+                                                                                          exception))
+
+
+def log_failed_write(failed: List[str], item: WorkItem, exception: Optional[BaseException]):
+    if exception is not None:
+        logger.opt(exception=exception).error("[" + item.filepath + "] failed in stage [sink]: " + str(exception))
+        failed.append(item.filepath)
+    stage_hooks.finish(item.filepath)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_arguments()))
@@ -1,15 +1,24 @@
 import os
+import signal
+import socket
 import sys
 import time
 from argparse import Namespace
+from typing import IO, Iterator, Optional, Callable
 
 from loguru import logger
 
-from database.db import JsonDBStorage
-from docrecjson.elements import Document
+from converter import serialization, stage_hooks
+from database.journal import ProcessingJournal
 from scripts import utility
+from scripts.pipeline import Pipeline, Stage, WorkItem, parse, convert, serialize
+from scripts.sinks import AsyncSinkRunner, create_sinks, hashes_input
+from scripts.utility_metrics import ConverterMetrics
 from utility_argparse import *
 
+# lock and journal of a worker, inside its processing dir
+WORKER_STATE_DIR: str = ".worker"
+
 logger.remove()
 # add new custom loggers
 logger.add(sys.stdout, level='DEBUG')
@@ -24,54 +33,184 @@ def parse_arguments() -> Namespace:
     parser.add_argument("-o", "--output_dir", type=str,
                         help="If you specify this directory, the converted files will be written into this dir.",
                         default=None)
+    parser.add_argument("-j", "--journal", type=str,
+                        help="SQLite file which records the files currently in-flight. "
+                             "Files which were interrupted by a crash are resumed on the next start. "
+                             "Defaults to <input_dir>/processing/<worker_id>/" + WORKER_STATE_DIR + "/journal.sqlite.",
+                        default=None)
+    parser.add_argument("-w", "--worker_id", type=str,
+                        help="Name of this watcher. Files are claimed by moving them into "
+                             "<input_dir>/processing/<worker_id>/ before they are converted. "
+                             "Each watcher sharing the input dir needs a unique and stable worker id. "
+                             "Defaults to the hostname.",
+                        default=socket.gethostname())
+    parser = add_pipeline_args(parser)
     parser = add_force_args(parser)
+    parser = add_validation_args(parser)
+    parser = add_conversion_args(parser)
+    parser = add_profile_args(parser)
+    parser = add_metrics_args(parser)
+    parser = add_diagnostics_args(parser)
+    parser = add_output_format_args(parser)
     parser = add_db_args(parser)
+    parser = add_sqlite_args(parser)
+    parser = add_parquet_args(parser)
     parser = add_log_args(parser)
     return parser.parse_args()
 
 
 def check_args(args: Namespace):
     assert args.input_dir is not None
-    assert args.output_dir is not None or args.db_connection is not None or args.log_output is True
+    assert args.output_dir is not None or args.db_connection is not None or args.sqlite_output is not None \
+           or args.parquet_output is not None or args.log_output is True
 
 
 def main(args: Namespace):
     check_args(args)
     input_dir: str = args.input_dir
-    db: JsonDBStorage = JsonDBStorage(args.db_connection, args.db_database, args.db_collection)
-
+    processing_dir: str = os.path.abspath(os.path.join(input_dir, "processing", args.worker_id))
+    state_dir: str = os.path.join(processing_dir, WORKER_STATE_DIR)
+    # held until the process exits
+    worker_lock: IO = utility.lock_worker_dir(state_dir)
+    utility.configure_validation(args)
+    utility.configure_conversion(args)
+    utility.configure_profiling(args)
+    utility.configure_diagnostics(args)
+    metrics: Optional[ConverterMetrics] = utility.configure_metrics(args)
+    journal: ProcessingJournal = ProcessingJournal(args.journal if args.journal is not None
+                                                   else os.path.join(state_dir, "journal.sqlite"))
+    # the output paths are reserved in the journal, a resumed file overwrites the output of its interrupted write
+    runner: AsyncSinkRunner = AsyncSinkRunner(create_sinks(args, get_output_filepath(args), overwrite_files=True),
+                                              args.max_in_flight,
+                                              args.io_threads, metrics.observe_write if metrics is not None else None)
+
+    pipeline: Pipeline = create_pipeline(args, runner, journal, metrics, input_dir, processing_dir)
+    if metrics is not None:
+        metrics.add_queue_depths(pipeline.queue_depths)
+    # SIGTERM shuts the watcher down like Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     try:
-        logger.info("Started watching for new file on: [" + input_dir + "]")
-        monitor_input_dir(args, db, input_dir)
+        logger.info("Started watching for new file on: [" + input_dir + "] as worker [" + args.worker_id + "]")
+        pipeline.run(args.metrics_interval)
     except KeyboardInterrupt:
-        exit(0)
-
-
-def monitor_input_dir(args, db, input_dir):
+        logger.info("Stopped watching for new files on: [" + input_dir + "]")
+    finally:
+        pipeline.stop()
+        # finishes the writes in flight and flushes the pending outputs, e.g. the parquet rows
+        runner.close()
+        journal.close()
+        worker_lock.close()
+        utility.close_profiling()
+        utility.close_metrics()
+
+
+def get_output_filepath(args) -> Optional[Callable[[WorkItem], str]]:
+    if args.output_dir is None:
+        return None
+    return lambda item: item.output_filepath
+
+
+def create_pipeline(args, runner: AsyncSinkRunner, journal: ProcessingJournal, metrics: Optional[ConverterMetrics],
+                    input_dir: str, processing_dir: str) -> Pipeline:
+    """
+    discover -> parse/validate -> convert -> serialize -> sink
+    """
+
+    def on_error(item: WorkItem, stage_name: str, exception: Exception):
+        logger.exception("[" + item.filepath + "] failed in stage [" + stage_name + "]: " + str(exception))
+        journal.fail(item.filepath)
+        stage_hooks.finish(item.filepath)
+        if metrics is not None:
+            metrics.files.labels("failed").inc()
+
+    def parse_item(item: WorkItem) -> WorkItem:
+        if metrics is not None:
+            metrics.input_bytes.inc(os.path.getsize(item.filepath))
+        return parse(args.force_strategy, item, hashes_input(args))
+
+    stages = [Stage("parse", parse_item, args.parse_workers),
+              Stage("convert", convert, args.convert_workers),
+              Stage("serialize", serialize, args.serialize_workers),
+              Stage("sink", lambda item: sink(args, runner, journal, metrics, item))]
+    return Pipeline(discover(journal, input_dir, processing_dir), stages, args.queue_size, on_error)
+
+
+def discover(journal: ProcessingJournal, input_dir: str, processing_dir: str) -> Iterator[WorkItem]:
+    yield from resume_claimed_files(journal, processing_dir)
     while True:
         for filename in os.listdir(input_dir):
-            handle_file_in_input_dir(args, db, filename, input_dir)
+            filepath = os.path.join(input_dir, filename)
+            if not os.path.isfile(filepath):
+                continue
+            claimed_filepath = utility.claim_file(filepath, processing_dir)
+            if claimed_filepath is None:
+                # another worker was faster
+                continue
+            journal.start(claimed_filepath, filepath)
+            yield WorkItem(claimed_filepath, source_path=filepath)
         time.sleep(2)
 
 
-def handle_file_in_input_dir(args, db, filename, input_dir):
-    filepath = os.path.join(input_dir, filename)
-
-    doc: Document = utility.handle_incoming_file_with_optional_force(filepath, args.force_strategy)
-
-    if doc is None:
-        raise RuntimeError("You specified a document which was not possible to convert."
-                           "The converter returned None for this document."
-                           "Please verify that you created a valid document.")
-
-    write(args, db, doc, filename)
-    remove_input_file(filepath)
-
-
-def write(args, db, doc, filename):
-    utility.write_to_log(args.log_output, doc)
-    utility.write_to_db(args, doc, db)
-    utility.write_to_file(os.path.join(args.output_dir, filename + ".json"), doc.to_dict())
+def resume_claimed_files(journal: ProcessingJournal, processing_dir: str) -> Iterator[WorkItem]:
+    """
+    Files left in the processing dir of this worker were claimed by the previous run but not finished.
+    """
+    for filepath in journal.in_flight():
+        if os.path.dirname(filepath) == processing_dir and not os.path.isfile(filepath):
+            # the input was already removed, only the journal entry was left behind
+            journal.finish(filepath)
+
+    for filename in sorted(os.listdir(processing_dir)):
+        filepath = os.path.join(processing_dir, filename)
+        if not os.path.isfile(filepath) or journal.state(filepath) == ProcessingJournal.FAILED:
+            continue
+        logger.info("resuming interrupted file: [" + filepath + "]")
+        journal.resume(filepath)
+        yield WorkItem(filepath, source_path=journal.source_path(filepath))
+
+
+def sink(args: Namespace, runner: AsyncSinkRunner, journal: ProcessingJournal, metrics: Optional[ConverterMetrics],
+         item: WorkItem):
+    """
+    Each write into a sink is recorded in the journal. A resumed file is only written into the missing sinks.
+    A write which was interrupted before it was recorded is repeated with the same claim id and output path, therefore
+    it replaces its earlier output.
+    The input file is removed after all sinks succeeded. The journal writes and the removal run in the io threads of
+    the runner, not on its event loop.
+    """
+    item.claim_id = journal.claim_id(item.filepath)
+    if args.output_dir is not None:
+        item.output_filepath = reserve_output_filepath(args, journal, item)
+    runner.submit(item, journal.completed_steps(item.filepath),
+                  lambda written_item, sink_name: journal.complete_step(written_item.filepath, sink_name),
+                  lambda written_item, exception: finish_written_item(journal, metrics, written_item, exception))
+
+
+def reserve_output_filepath(args: Namespace, journal: ProcessingJournal, item: WorkItem) -> str:
+    """
+    An existing output, or one reserved by another file in flight, gets a new name. The chosen name is kept in the
+    journal for a resumed write.
+    """
+    output_filepath: str = os.path.join(args.output_dir, os.path.basename(item.filepath) +
+                                        serialization.EXTENSIONS[args.output_format])
+    return journal.reserve_output(item.filepath,
+                                  lambda reserved: utility.file_considered_duplicates(output_filepath, reserved))
+
+
+def finish_written_item(journal: ProcessingJournal, metrics: Optional[ConverterMetrics], item: WorkItem,
+                        exception: Optional[BaseException]):
+    if exception is not None:
+        logger.opt(exception=exception).error("[" + item.filepath + "] failed in stage [sink]: " + str(exception))
+        journal.fail(item.filepath)
+        stage_hooks.finish(item.filepath)
+        if metrics is not None:
+            metrics.files.labels("failed").inc()
+        return
+    remove_input_file(item.filepath)
+    journal.finish(item.filepath)
+    stage_hooks.finish(item.filepath)
+    if metrics is not None:
+        metrics.files.labels("converted").inc()
 
 
 def remove_input_file(filepath):
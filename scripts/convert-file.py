@@ -1,11 +1,17 @@
+import asyncio
 import sys
 from argparse import Namespace
+from typing import List, Optional
 
 from loguru import logger
 
-from database.db import JsonDBStorage
+from converter.stage_hooks import stage, finish
+from converter.validator.incoming_file import IncomingFile
 from docrecjson.elements import Document
 from scripts import utility
+from scripts.pipeline import WorkItem
+from scripts.sinks import Sink, create_sinks, hashes_input, write_concurrently
+from scripts.utility_profiling import profiled
 from utility_argparse import *
 
 logger.remove()
@@ -22,33 +28,59 @@ def parse_arguments() -> Namespace:
                              "Please note that all convent of this file will be deleted. "
                              "This has to be specified if there is no mongo database connection specified.",
                         default=None)
+    parser.add_argument("--speculative", action="store_true",
+                        help="Converts the file while it is validated in a second thread, which lowers the latency "
+                             "to about the longer of both steps. The result is discarded if the file is invalid.")
     parser = add_force_args(parser)
+    parser = add_validation_args(parser)
+    parser = add_conversion_args(parser)
+    parser = add_profile_args(parser)
+    parser = add_output_format_args(parser)
     parser = add_db_args(parser)
+    parser = add_sqlite_args(parser)
+    parser = add_parquet_args(parser)
     parser = add_log_args(parser)
     return parser.parse_args()
 
 
 def check_args(args: Namespace):
     assert args.input_file is not None
-    assert args.output_file is not None or args.db_connection is not None or args.log_output is True
+    assert args.output_file is not None or args.db_connection is not None or args.sqlite_output is not None \
+           or args.parquet_output is not None or args.log_output is True
 
 
 def main(args: Namespace):
     check_args(args)
+    utility.configure_validation(args)
+    utility.configure_conversion(args)
+    utility.configure_profiling(args)
     input_filepath: str = args.input_file
     output_filepath: str = args.output_file
-    log_output: bool = args.log_output
 
-    doc: Document = utility.handle_incoming_file_with_optional_force(input_filepath, args.force_strategy)
+    # keeps the hash of the input if the validation computes it
+    incoming_file: IncomingFile = IncomingFile(input_filepath)
+    with profiled(input_filepath):
+        doc: Document = utility.handle_incoming_file_with_optional_force(incoming_file, args.force_strategy,
+                                                                       args.speculative)
 
-    if doc is None:
-        raise RuntimeError("You specified a document which was not possible to convert."
-                           "The converter returned None for this document."
-                           "Please verify that you created a valid document.")
+        if doc is None:
+            raise RuntimeError("You specified a document which was not possible to convert."
+                               "The converter returned None for this document."
+                               "Please verify that you created a valid document.")
+        with stage(input_filepath, "serialization"):
+            dct: dict = doc.to_dict()
+    finish(input_filepath)
+    utility.close_profiling()
 
-    utility.write_to_log(log_output, doc)
-    utility.write_to_db(args, doc, JsonDBStorage(args.db_connection, args.db_database, args.db_collection))
-    utility.write_to_file(output_filepath, doc.to_dict())
+    get_filepath = None if output_filepath is None else lambda item: output_filepath
+    source_sha256: Optional[str] = incoming_file.sha256() if hashes_input(args) else incoming_file.known_sha256()
+    item: WorkItem = WorkItem(input_filepath, source_sha256=source_sha256, dct=dct)
+    # the only document doesn't have to wait for others to share its parquet flush
+    args.parquet_flush_interval = 0
+    sinks: List[Sink] = create_sinks(args, get_filepath)
+    asyncio.run(write_concurrently(sinks, item))
+    for sink in sinks:
+        sink.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Dict, Any
+
+from loguru import logger
+
+from converter.elements import ConversionContext
+from converter.stage_hooks import stage
+from converter.validator.incoming_file import IncomingFile
+from docrecjson.elements import Document
+from scripts import utility
+from scripts.utility_profiling import profiled
+
+
+@dataclass
+class WorkItem:
+    """
+    A single file travelling through the pipeline. Each stage fills in its result and clears the inputs it consumed.
+    incoming_file is only set for files which are not read from filepath on disk, e.g. archive members.
+    source_path is the path the file was submitted with, e.g. before convert-dir claimed it, the sinks store it to
+    identify the document. It defaults to filepath.
+    source_sha256 is the hash of the uncompressed input, it is kept after the input was released.
+    claim_id and output_filepath are set for files journaled by convert-dir, a resumed file keeps both. The sinks
+    overwrite their earlier outputs with them instead of writing a second copy.
+    """
+    filepath: str
+    incoming_file: Optional[IncomingFile] = None
+    source_path: Optional[str] = None
+    source_sha256: Optional[str] = None
+    claim_id: Optional[str] = None
+    output_filepath: Optional[str] = None
+    context: Optional[ConversionContext] = None
+    document: Optional[Document] = None
+    dct: Optional[dict] = None
+
+    def __post_init__(self):
+        if self.source_path is None:
+            self.source_path = self.filepath
+
+
+@dataclass
+class Stage:
+    """
+    :param name: used for logging and the queue-depth metrics
+    :param function: processes an item and returns it for the next stage. Returning None drops the item.
+    :param concurrency: number of worker threads of this stage
+    """
+    name: str
+    function: Callable[[Any], Optional[Any]]
+    concurrency: int = 1
+
+
+class Pipeline:
+    """
+    Runs a source and a list of stages in separate threads, connected by bounded queues.
+    A full queue blocks the previous stage (backpressure), therefore a slow stage shows as a full queue in front of it
+    while the queues behind it run empty.
+    """
+    _source: Iterable
+    _stages: List[Stage]
+    _queues: List[queue.Queue]
+    _on_error: Callable[[Any, str, Exception], None]
+    _stop_event: threading.Event
+    _source_error: Optional[Exception]
+    _threads: List[threading.Thread]
+
+    def __init__(self, source: Iterable, stages: List[Stage], queue_size: int,
+                 on_error: Callable[[Any, str, Exception], None]):
+        """
+        :param source: yields the items for the first stage. Iterating may block, e.g. while watching a directory.
+        :param on_error: called with the item, the stage name and the exception if a stage raised an exception.
+        The item is dropped afterwards.
+        """
+        self._source = source
+        self._stages = stages
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._on_error = on_error
+        self._stop_event = threading.Event()
+        self._source_error = None
+        self._threads = []
+
+    def queue_depths(self) -> Dict[str, int]:
+        """
+        :return: number of items waiting in front of each stage
+        """
+        return {stage.name: q.qsize() for stage, q in zip(self._stages, self._queues)}
+
+    def start(self):
+        self._threads.append(threading.Thread(target=self._run_source, name="source", daemon=True))
+        for index, stage in enumerate(self._stages):
+            for worker in range(stage.concurrency):
+                self._threads.append(threading.Thread(target=self._run_stage, args=(index,),
+                                                      name=stage.name + "-" + str(worker), daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def run(self, metrics_interval: float, stop_when_exhausted: bool = False):
+        """
+        Starts the pipeline and blocks until stop() is called. The queue depths are logged every metrics_interval
+        seconds.
+        :param stop_when_exhausted: stops as soon as all items of a finite source passed all stages
+        :raises RuntimeError: if the source failed, the pipeline is stopped in this case
+        """
+        self.start()
+        if stop_when_exhausted:
+            threading.Thread(target=self._stop_when_exhausted, name="exhausted", daemon=True).start()
+        while not self._stop_event.wait(metrics_interval):
+            logger.info("queue depths: " + ", ".join(
+                name + "=" + str(depth) + "/" + str(self._queues[0].maxsize)
+                for name, depth in self.queue_depths().items()))
+        if self._source_error is not None:
+            raise RuntimeError("The source of the pipeline failed") from self._source_error
+
+    def join(self):
+        """
+        Blocks until the source is exhausted and all of its items passed all stages.
+        """
+        self._threads[0].join()
+        for q in self._queues:
+            q.join()
+
+    def _stop_when_exhausted(self):
+        self.join()
+        self.stop()
+
+    def stop(self):
+        """
+        Stops accepting new items. Items which are already in-flight are dropped together with the daemon threads on
+        exit, which is why the callers have to be able to resume them.
+        """
+        self._stop_event.set()
+
+    def _run_source(self):
+        try:
+            for item in self._source:
+                if self._stop_event.is_set():
+                    return
+                self._queues[0].put(item)
+        except Exception as e:
+            # a failed generator can't be resumed, without a source the stages would wait forever
+            logger.exception("The source of the pipeline failed: " + str(e))
+            self._source_error = e
+            self.stop()
+
+    def _run_stage(self, index: int):
+        stage: Stage = self._stages[index]
+        input_queue: queue.Queue = self._queues[index]
+        output_queue: Optional[queue.Queue] = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        while not self._stop_event.is_set():
+            item = input_queue.get()
+            try:
+                result = stage.function(item)
+                # the result is queued before the item is marked as done, which keeps join() from returning early
+                if result is not None and output_queue is not None:
+                    output_queue.put(result)
+            except Exception as e:
+                self._on_error(item, stage.name, e)
+            finally:
+                input_queue.task_done()
+
+
+def parse(force_strategy: Optional[str], item: WorkItem, hash_input: bool = False) -> WorkItem:
+    """
+    :param hash_input: sets source_sha256 even if the validation didn't need the hash, hashing reads the whole input
+    once more
+    """
+    incoming_file: IncomingFile = item.incoming_file or IncomingFile(item.filepath)
+    with profiled(item.filepath):
+        item.context = utility.prepare_incoming_file_with_optional_force(incoming_file, force_strategy)
+        item.source_sha256 = incoming_file.sha256() if hash_input else incoming_file.known_sha256()
+    item.incoming_file = None
+    if item.context is None:
+        raise RuntimeError("You specified a document which was not possible to convert."
+                           "The converter returned None for this document."
+                           "Please verify that you created a valid document.")
+    return item
+
+
+def convert(item: WorkItem) -> WorkItem:
+    with profiled(item.filepath):
+        item.document = item.context.convert()
+    item.context = None
+    return item
+
+
+def serialize(item: WorkItem) -> WorkItem:
+    with profiled(item.filepath), stage(item.filepath, "serialization"):
+        item.dct = item.document.to_dict()
+    item.document = None
+    return item
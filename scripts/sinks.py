@@ -0,0 +1,314 @@
+import asyncio
+import functools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Callable, Optional, Set, Dict
+
+from loguru import logger
+from pymongo.collection import Collection
+
+from converter import serialization
+from database.db import JsonDBStorage
+from database.parquet_export import ParquetExporter
+from database.sqlite_db import SQLiteStorage
+from scripts import utility
+from scripts.archives import ArchiveWriter
+from scripts.pipeline import WorkItem
+
+# sink name, duration of the write in seconds, written bytes or None
+WriteObserver = Callable[[str, float, Optional[int]], None]
+
+
+class Sink(ABC):
+    """
+    Destination of a serialized document. The blocking writes are offloaded into the executor of the running event
+    loop, therefore the sinks of a document and the writes of several documents run concurrently.
+    geometry_profile selects how the coordinates are written, see serialization.encode_geometry.
+    """
+    name: str
+    geometry_profile: str = serialization.NESTED
+
+    @abstractmethod
+    async def write(self, item: WorkItem) -> Optional[int]:
+        """
+        :return: the number of written bytes if the sink writes a file, otherwise None
+        """
+        pass
+
+    def close(self):
+        """
+        Called once after all writes finished.
+        """
+        pass
+
+    def _document(self, item: WorkItem) -> dict:
+        return serialization.encode_geometry(item.dct, self.geometry_profile)
+
+    # noinspection PyMethodMayBeStatic
+    async def _run_blocking(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+class LogSink(Sink):
+    name = "log"
+
+    async def write(self, item: WorkItem):
+        content: str = await self._run_blocking(json.dumps, self._document(item), indent=4)
+        logger.info(content)
+
+
+class MongoSink(Sink):
+    name = "db"
+    _collection: Collection
+
+    def __init__(self, db: JsonDBStorage):
+        # MongoClient is thread-safe and pools its connections, therefore one collection object is shared by all writes
+        self._collection = db.get_collection()
+
+    async def write(self, item: WorkItem):
+        if item.claim_id is not None:
+            # a resumed write replaces the document of the interrupted one
+            await self._run_blocking(self._collection.replace_one, {"_id": item.claim_id}, dict(self._document(item)),
+                                     upsert=True)
+            return
+        # insert_one adds the generated _id to the given dict, which would break the other sinks
+        await self._run_blocking(self._collection.insert_one, dict(self._document(item)))
+
+
+class FileSink(Sink):
+    name = "file"
+    _get_filepath: Callable[[WorkItem], str]
+    _output_format: str
+    _overwrite: bool
+
+    def __init__(self, get_filepath: Callable[[WorkItem], str], output_format: str = serialization.JSON,
+                 overwrite: bool = False):
+        """
+        :param get_filepath: returns the output filepath for the given item
+        :param output_format: one of serialization.FORMATS
+        :param overwrite: replaces existing files, otherwise the output is written next to them with a new name
+        """
+        self._get_filepath = get_filepath
+        self._output_format = output_format
+        self._overwrite = overwrite
+
+    async def write(self, item: WorkItem) -> Optional[int]:
+        return await self._run_blocking(utility.write_to_file, self._get_filepath(item), self._document(item),
+                                        self._output_format, self._overwrite)
+
+
+class SQLiteSink(Sink):
+    name = "sqlite"
+    _storage: SQLiteStorage
+
+    def __init__(self, storage: SQLiteStorage):
+        self._storage = storage
+
+    async def write(self, item: WorkItem):
+        committed: Future = await self._run_blocking(self._storage.submit, item.source_path, item.source_sha256,
+                                                     utility.get_converter_version(), self._document(item))
+        # waiting for the commit doesn't occupy an io thread, the batches can grow up to max_in_flight documents
+        await asyncio.wrap_future(committed)
+
+    def close(self):
+        self._storage.close()
+
+
+class ParquetSink(Sink):
+    """
+    The parquet tables have their own flat coordinate columns, the geometry profile doesn't apply.
+    """
+    name = "parquet"
+    _exporter: ParquetExporter
+
+    def __init__(self, exporter: ParquetExporter):
+        self._exporter = exporter
+
+    async def write(self, item: WorkItem):
+        flushed: Future = await self._run_blocking(self._exporter.write, item.source_path, item.dct)
+        # the write only counts as done once the rows are in a complete file, the journal marks the step afterwards
+        await asyncio.wrap_future(flushed)
+
+    def close(self):
+        self._exporter.close()
+
+
+class ArchiveSink(Sink):
+    """
+    Writes the documents as members into a zip or tar archive.
+    """
+    name = "archive"
+    _writer: ArchiveWriter
+    _get_member_name: Callable[[WorkItem], str]
+    _output_format: str
+
+    def __init__(self, path: str, get_member_name: Callable[[WorkItem], str],
+                 output_format: str = serialization.JSON):
+        """
+        :param get_member_name: returns the name of the archive member for the given item
+        :param output_format: one of serialization.FORMATS
+        """
+        self._writer = ArchiveWriter(path)
+        self._get_member_name = get_member_name
+        self._output_format = output_format
+
+    async def write(self, item: WorkItem) -> Optional[int]:
+        content: bytes = await self._run_blocking(serialization.dumps, self._document(item), self._output_format)
+        await self._run_blocking(self._writer.write, self._get_member_name(item), content)
+        return len(content)
+
+    def close(self):
+        self._writer.close()
+
+
+def create_sinks(args: Namespace, get_filepath: Optional[Callable[[WorkItem], str]],
+                 additional_sinks: Optional[List[Sink]] = None, overwrite_files: bool = False) -> List[Sink]:
+    """
+    :param additional_sinks: sinks of a single script, e.g. the archive sink. The geometry profiles apply to them too.
+    :param overwrite_files: the file sink replaces existing files, see FileSink
+    :return: the sinks which are enabled by the given arguments
+    """
+    sinks: List[Sink] = list(additional_sinks or [])
+    if args.log_output:
+        sinks.append(LogSink())
+    if args.db_connection is not None:
+        sinks.append(MongoSink(JsonDBStorage(args.db_connection, args.db_database, args.db_collection)))
+    if args.sqlite_output is not None:
+        sinks.append(SQLiteSink(SQLiteStorage(args.sqlite_output, args.sqlite_batch_size, not args.sqlite_json_text)))
+    if args.parquet_output is not None:
+        sinks.append(ParquetSink(ParquetExporter(args.parquet_output, args.parquet_row_group_size,
+                                                 args.parquet_flush_interval)))
+    if get_filepath is not None:
+        sinks.append(FileSink(get_filepath, args.output_format, overwrite_files))
+    set_geometry_profiles(sinks, args.geometry_profile)
+    return sinks
+
+
+def hashes_input(args: Namespace) -> bool:
+    """
+    :return: whether an enabled sink stores the hash of the input, see WorkItem.source_sha256
+    """
+    return args.sqlite_output is not None
+
+
+def set_geometry_profiles(sinks: List[Sink], specs: List[str]):
+    """
+    :param specs: entries like file=flat or db=delta
+    """
+    sinks_by_name: Dict[str, Sink] = {sink.name: sink for sink in sinks}
+    for spec in specs:
+        name, separator, profile = spec.partition("=")
+        if not separator or profile not in serialization.GEOMETRY_PROFILES:
+            raise ValueError("A geometry profile has to look like <sink>=<profile> with one of the profiles " +
+                             str(serialization.GEOMETRY_PROFILES) + ", got [" + spec + "]")
+        if name not in sinks_by_name or isinstance(sinks_by_name[name], ParquetSink):
+            raise ValueError("The sink [" + name + "] is not enabled or has no geometry profile")
+        sinks_by_name[name].geometry_profile = profile
+
+
+async def write_concurrently(sinks: List[Sink], item: WorkItem,
+                             on_sink_done: Optional[Callable[[WorkItem, str], None]] = None,
+                             on_write: Optional[WriteObserver] = None):
+    """
+    Writes the item into all sinks at the same time. All sinks are executed even if one of them fails, afterwards the
+    first exception is raised.
+    :param on_sink_done: called in the executor with the item and the sink name after each successful write, it may
+    block, e.g. to record the write in a journal
+    :param on_write: called with the sink name, the duration in seconds and the written bytes of each successful write
+    """
+
+    async def write(sink: Sink):
+        start: float = time.perf_counter()
+        written_bytes: Optional[int] = await sink.write(item)
+        if on_write is not None:
+            on_write(sink.name, time.perf_counter() - start, written_bytes)
+        if on_sink_done is not None:
+            await asyncio.get_running_loop().run_in_executor(None, on_sink_done, item, sink.name)
+
+    results = await asyncio.gather(*(write(sink) for sink in sinks), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+class AsyncSinkRunner:
+    """
+    Runs the sink writes on an asyncio event loop in a background thread. The loop thread never blocks, all blocking
+    calls including the callbacks of submit() run in the io threads.
+    submit() blocks while max_in_flight documents are being written, which passes the backpressure on to the pipeline.
+    """
+    _sinks: List[Sink]
+    _on_write: Optional[WriteObserver]
+    _loop: asyncio.AbstractEventLoop
+    _max_in_flight: int
+    _in_flight: threading.BoundedSemaphore
+    _thread: threading.Thread
+
+    def __init__(self, sinks: List[Sink], max_in_flight: int, io_threads: int,
+                 on_write: Optional[WriteObserver] = None):
+        """
+        :param on_write: observes each write, see write_concurrently
+        """
+        self._sinks = sinks
+        self._on_write = on_write
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="sink-io"))
+        self._max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sink-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: WorkItem, completed_sinks: Set[str],
+               on_sink_done: Optional[Callable[[WorkItem, str], None]] = None,
+               on_finished: Optional[Callable[[WorkItem, Optional[BaseException]], None]] = None) -> Future:
+        """
+        :param completed_sinks: names of the sinks which already contain this item, they are skipped
+        :param on_sink_done: see write_concurrently
+        :param on_finished: called in the executor with the item and the exception of the first failed sink or None
+        after all sinks finished. The item counts as in flight until it returned.
+        :return: future of the write, it holds the exception if any of the sinks failed
+        """
+        sinks: List[Sink] = [sink for sink in self._sinks if sink.name not in completed_sinks]
+        self._in_flight.acquire()
+        future: Future = asyncio.run_coroutine_threadsafe(self._write(sinks, item, on_sink_done, on_finished),
+                                                          self._loop)
+        future.add_done_callback(lambda _: self._in_flight.release())
+        return future
+
+    async def _write(self, sinks: List[Sink], item: WorkItem,
+                     on_sink_done: Optional[Callable[[WorkItem, str], None]],
+                     on_finished: Optional[Callable[[WorkItem, Optional[BaseException]], None]]):
+        exception: Optional[BaseException] = None
+        try:
+            await write_concurrently(sinks, item, on_sink_done, self._on_write)
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            if on_finished is not None:
+                await self._loop.run_in_executor(None, on_finished, item, exception)
+
+    def drain(self):
+        """
+        Blocks until all submitted writes finished.
+        """
+        for _ in range(self._max_in_flight):
+            self._in_flight.acquire()
+        for _ in range(self._max_in_flight):
+            self._in_flight.release()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def close(self):
+        """
+        Waits for the submitted writes, stops the event loop and closes the sinks.
+        """
+        self.drain()
+        self.stop()
+        for sink in self._sinks:
+            sink.close()
@@ -1,55 +1,238 @@
+import functools
+import importlib.metadata
 import json
 import os
+import uuid
 from argparse import Namespace
-from typing import Union
+from typing import Union, Callable, Collection, IO, Optional
 
 from loguru import logger
 
-from converter.validator.reader import handle_incoming_file, handle_force_incoming_file
-from database.db import JsonDBStorage
-from docrecjson.elements import Document
-
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
-def write_to_db(args: Namespace, doc: Document, db: JsonDBStorage):
-    if args.db_connection is not None:
-        db.get_collection().insert_one(doc.to_dict())
+from converter import serialization
+from converter.elements import ConversionContext, ConversionOptions
+from converter.validator.reader import handle_incoming_file, handle_force_incoming_file, prepare_incoming_file, \
+    prepare_force_incoming_file, set_validation_cache, set_validation_policies, \
+    handle_incoming_file_speculatively, set_conversion_options
+from converter.validator.incoming_file import IncomingFile
+from converter.validator.validation_cache import ValidationCache
+from converter.validator.validation_policy import ValidationPolicies
+from docrecjson.elements import Document
+from scripts.utility_diagnostics import SamplingProfiler, install_signal_handlers
+from scripts.utility_memory import MemoryAccounting, set_memory_accounting
+from scripts.utility_profiling import Profiler, set_profiler, close_profiler
+from scripts import utility_metrics
+from scripts.utility_metrics import ConverterMetrics, set_metrics
 
 
-def write_to_log(log_output: bool, doc: Document):
-    if log_output:
-        logger.info(json.dumps(doc.to_dict(), indent=4))
+def write_to_file(filepath: str, dct: dict, output_format: str = serialization.JSON,
+                  overwrite: bool = False) -> Optional[int]:
+    """
+    :param output_format: one of serialization.FORMATS
+    :param overwrite: replaces an existing file instead of writing next to it with a new name
+    :return: the size of the written file, None if no filepath is given
+    """
+    if filepath is not None:
+        path_considered_duplicates: str = filepath if overwrite else file_considered_duplicates(filepath)
+        if output_format == serialization.JSON:
+            write_atomically(path_considered_duplicates, lambda file: json.dump(dct, file, indent=2))
+        else:
+            content: bytes = serialization.dumps(dct, output_format)
+            write_atomically(path_considered_duplicates, lambda file: file.write(content), mode="wb")
+        logger.info("wrote processed contents into: [" + filepath + "]")
+        return os.path.getsize(path_considered_duplicates)
+    return None
 
 
-def write_to_file(filepath: str, dct: dict):
-    if filepath is not None:
-        path_considered_duplicates: str = file_considered_duplicates(filepath)
-        with open(path_considered_duplicates, "w") as file:
-            json.dump(dct, file, indent=2)
-            logger.info("wrote processed contents into: [" + filepath + "]")
+def write_atomically(filepath: str, write_content: Callable[[IO], None], mode: str = "w"):
+    """
+    Writes into a temporary file next to filepath and moves it into place with os.replace afterwards.
+    Readers (and a crashed converter) will therefore either see the complete file or no file at all.
+    :param filepath: the final filepath
+    :param write_content: receives the opened temporary file and writes the contents into it
+    :param mode: the mode the temporary file is opened with
+    """
+    tmp_filepath: str = filepath + "." + uuid.uuid4().hex + ".tmp"
+    try:
+        with open(tmp_filepath, "x" + mode.replace("w", "")) as file:
+            write_content(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_filepath, filepath)
+    finally:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
 
 
-def file_considered_duplicates(filepath: str) -> str:
+def file_considered_duplicates(filepath: str, reserved: Collection[str] = ()) -> str:
     """
     :param filepath: a full filepath
+    :param reserved: filepaths which count as existing, e.g. outputs which are about to be written
     :return: a new filepath if the specified filepath already exists, else the given filepath
     """
     counter: int = 1
     filepath, file_extension = os.path.splitext(filepath)
-    if file_extension != ".json":
+    if file_extension not in serialization.EXTENSIONS.values():
         raise RuntimeError(
             "The specified file doesn't have the correct extension for this application. "
-            "The file extension should be [.json], but it is: [" + file_extension + "]")
+            "The file extension should be one of " + str(list(serialization.EXTENSIONS.values())) +
+            ", but it is: [" + file_extension + "]")
     base_filepath: str = filepath
-    while os.path.isfile(filepath + file_extension):
+    while os.path.isfile(filepath + file_extension) or filepath + file_extension in reserved:
         filepath = os.path.join(base_filepath + " (" + str(counter) + ")")
         counter += 1
     return filepath + file_extension
 
 
-def handle_incoming_file_with_optional_force(input_filepath: str, force_strategy: Union[str, None]) -> Document:
+def claim_file(filepath: str, processing_dir: str) -> Optional[str]:
+    """
+    Claims the file for this worker by moving it into the worker's processing directory.
+    The rename is atomic, therefore exactly one of several workers sharing the input directory succeeds.
+    :param filepath: file in the shared input directory
+    :param processing_dir: the processing directory of this worker, it has to be on the same filesystem
+    :return: the new filepath or None if another worker already claimed this file
+    """
+    filename: str = os.path.basename(filepath)
+    claimed_filepath: str = os.path.join(processing_dir, filename)
+    counter: int = 1
+    # os.rename silently replaces existing files, e.g. a previously failed file with the same name
+    while os.path.exists(claimed_filepath):
+        claimed_filepath = os.path.join(processing_dir, str(counter) + "-" + filename)
+        counter += 1
+    try:
+        os.rename(filepath, claimed_filepath)
+    except FileNotFoundError:
+        return None
+    return claimed_filepath
+
+
+def lock_worker_dir(state_dir: str) -> IO:
+    """
+    Takes an exclusive lock on the state dir of a worker, two watchers with the same worker id would resume and
+    convert the files of each other.
+    :return: the open lock file, the lock is held until it is closed or the process exits
+    :raises RuntimeError: if another watcher holds the lock
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    lock_file: IO = open(os.path.join(state_dir, "lock"), "w")
+    if fcntl is None:
+        logger.warning("fcntl is not available on this platform, the worker dir is not locked")
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError as e:
+        lock_file.close()
+        raise RuntimeError("Another watcher is running with the same worker dir [" + state_dir + "], "
+                           "each watcher needs its own --worker_id") from e
+    return lock_file
+
+
+def handle_incoming_file_with_optional_force(input_filepath: Union[str, IncomingFile],
+                                             force_strategy: Union[str, None],
+                                             speculative: bool = False) -> Document:
+    """
+    :param speculative: converts the file while validating it, see reader.handle_incoming_file_speculatively
+    """
     if force_strategy is None:
+        if speculative:
+            return handle_incoming_file_speculatively(input_filepath)
         return handle_incoming_file(input_filepath)
     elif isinstance(force_strategy, str):
         return handle_force_incoming_file(input_filepath, force_strategy)
     else:
         raise ValueError("The specified strategy has to be either str or None for no forced strategy.")
+
+
+def prepare_incoming_file_with_optional_force(input_filepath: Union[str, IncomingFile],
+                                              force_strategy: Union[str, None]) -> ConversionContext:
+    if force_strategy is None:
+        return prepare_incoming_file(input_filepath)
+    elif isinstance(force_strategy, str):
+        return prepare_force_incoming_file(input_filepath, force_strategy)
+    else:
+        raise ValueError("The specified strategy has to be either str or None for no forced strategy.")
+
+
+def configure_validation(args: Namespace):
+    """
+    Applies the arguments of utility_argparse.add_validation_args to the reader.
+    """
+    if args.validation_cache is not None:
+        set_validation_cache(ValidationCache(args.validation_cache, args.validation_cache_size,
+                                             args.validation_cache_max_age * 24 * 60 * 60))
+    set_validation_policies(ValidationPolicies.parse(args.validation_policy))
+
+
+def configure_conversion(args: Namespace):
+    """
+    Applies the arguments of utility_argparse.add_conversion_args to the reader.
+    """
+    set_conversion_options(ConversionOptions(simplify_tolerance=args.simplify_tolerance,
+                                             geometry_features=args.geometry_features,
+                                             convert_words=args.convert_words))
+
+
+def configure_profiling(args: Namespace):
+    """
+    Applies the arguments of utility_argparse.add_profile_args.
+    """
+    if args.profile is not None:
+        set_profiler(Profiler(args.profile_dir, args.profile, args.profile_top))
+    if args.memory_accounting:
+        set_memory_accounting(MemoryAccounting(args.memory_top))
+
+
+def configure_diagnostics(args: Namespace):
+    """
+    Applies the arguments of utility_argparse.add_diagnostics_args, the reports are written like the profiles of
+    utility_argparse.add_profile_args.
+    """
+    install_signal_handlers(SamplingProfiler(args.profile_dir, args.sampling_interval, args.profile_top),
+                            args.sampling_seconds)
+
+
+def close_profiling():
+    """
+    Writes the profiles which are only written at the end, e.g. the profile of the whole run.
+    """
+    close_profiler()
+    set_memory_accounting(None)
+
+
+def configure_metrics(args: Namespace) -> Optional[ConverterMetrics]:
+    """
+    Applies the arguments of utility_argparse.add_metrics_args.
+    :return: the metrics, which measure the conversion stages, or None if they are not exposed. Without the
+    prometheus_client package, the metrics are not collected at all.
+    """
+    if args.metrics_port is None and args.metrics_textfile is None:
+        return None
+    if utility_metrics.prometheus_client is None:
+        logger.warning("the metrics require the prometheus_client package, they are disabled")
+        return None
+    metrics: ConverterMetrics = ConverterMetrics()
+    if args.metrics_port is not None:
+        metrics.serve(args.metrics_port, args.metrics_host)
+    if args.metrics_textfile is not None:
+        metrics.write_textfile(args.metrics_textfile, args.metrics_textfile_interval)
+    set_metrics(metrics)
+    return metrics
+
+
+def close_metrics():
+    """
+    Stops exposing the metrics, the textfile is written a last time.
+    """
+    set_metrics(None)
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter_version() -> str:
+    try:
+        return importlib.metadata.version("converter")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
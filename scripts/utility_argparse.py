@@ -20,6 +20,45 @@ def add_db_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     return parser
 
 
+def add_output_format_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--output_format", type=str, choices=["json", "msgpack"], default="json",
+                        help="Format of the written files. msgpack is a binary format which stores the coordinates as "
+                             "int32 arrays, converter/serialization.py loads it back into the same dict as the json "
+                             "output. msgpack requires the msgpack package.")
+    parser.add_argument("--geometry_profile", type=str, action="append", default=[],
+                        help="Coordinate encoding of a sink, as <sink>=<profile> with the sinks file, archive, db, "
+                             "sqlite and log. The profiles are nested ([[x0, y0], ...], the default), flat "
+                             "([x0, y0, x1, y1, ...]) and delta (like flat, but each value is the difference to the "
+                             "previous point). converter/serialization.py decode_geometry() restores the nested lists.")
+    return parser
+
+
+def add_sqlite_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--sqlite_output", type=str, default=None,
+                        help="SQLite file the converted documents are written into, one row per document.")
+    parser.add_argument("--sqlite_batch_size", type=int, default=256,
+                        help="Maximum number of documents committed to SQLite in one transaction. Documents written "
+                             "at the same time are committed together, up to --max_in_flight documents.")
+    parser.add_argument("--sqlite_json_text", action="store_true",
+                        help="Stores the documents as json text, which can be queried with the json functions of "
+                             "SQLite, instead of zlib compressed json.")
+    return parser
+
+
+def add_parquet_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--parquet_output", type=str, default=None,
+                        help="Directory the regions, lines and text of the converted documents are exported into as "
+                             "the parquet datasets regions/, lines/ and text/. Each flush writes a new file per "
+                             "dataset, files of earlier runs are kept. Requires pyarrow.")
+    parser.add_argument("--parquet_row_group_size", type=int, default=10000,
+                        help="Number of rows which are flushed into a new parquet file at the latest.")
+    parser.add_argument("--parquet_flush_interval", type=float, default=5,
+                        help="Seconds after which pending rows are flushed at the latest. A document only counts as "
+                             "written when its rows are flushed, raise --max_in_flight to let more documents share a "
+                             "flush.")
+    return parser
+
+
 def add_log_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     parser.add_argument("-log", "--log_output", type=bool, default=False,
                         help="Info-logs the computed json-dict file.")
@@ -30,7 +69,101 @@ def add_force_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     parser.add_argument("-f", "--force_strategy", type=str,
                         help="This argument overrides the file matcher and validator to a already specified strategy."
                              "Please be aware that skipping those steps in the conversion process may lead to "
-                             "unintended errors. Available options are:"
-                             "page2017",
+                             "unintended errors. Available options are: "
+                             "page2017, page2019",
                         default=None)
     return parser
+
+
+def add_validation_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--validation_cache", type=str, default=None,
+                        help="SQLite file which stores the xsd validation results by the SHA-256 of the input file and "
+                             "of the schema. Files which were already validated are not validated again.")
+    parser.add_argument("--validation_cache_size", type=int, default=100000,
+                        help="Maximum number of cached validation results, the oldest ones are evicted first.")
+    parser.add_argument("--validation_cache_max_age", type=float, default=30,
+                        help="Number of days after which a cached validation result expires.")
+    parser.add_argument("--validation_policy", type=str, action="append", default=[],
+                        help="Validation policy for the files below a path prefix, as <prefix>=<policy>. "
+                             "Policies are always, never or sample=1/N. Files with policy never are matched by the "
+                             "namespace of their root element only, a failed conversion validates them afterwards. "
+                             "Can be given multiple times, the longest matching prefix wins. Default: always.")
+    return parser
+
+
+def add_conversion_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--simplify_tolerance", type=float, default=None,
+                        help="Simplifies all coordinates with the Douglas-Peucker algorithm: points closer than this "
+                             "number of pixels to the simplified polygon are removed. The number of removed points is "
+                             "logged and added to the metadata. Requires the numpy package. Default: no "
+                             "simplification.")
+    parser.add_argument("--geometry_features", action="store_true",
+                        help="Adds the bounding box, area and centroid of each region and line polygon as content "
+                             "metadata. Requires the numpy package.")
+    parser.add_argument("--convert_words", action="store_true",
+                        help="Converts the Word and Glyph elements of the text lines. The words of a line are stored "
+                             "as parallel lists (id, text, confidence, coordinates) in one content metadata entry.")
+    return parser
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--profile", type=str, choices=["file", "run"], default=None,
+                        help="Profiles the conversion with cProfile: file writes a profile per converted file, run one "
+                             "profile of all files which is written on shutdown. Default: no profiling.")
+    parser.add_argument("--profile_dir", type=str, default="profiles",
+                        help="Directory of the .pstats profiles and their .txt summaries.")
+    parser.add_argument("--profile_top", type=int, default=30,
+                        help="Number of functions listed in the .txt summaries, sorted by cumulative time.")
+    parser.add_argument("--memory_accounting", action="store_true",
+                        help="Logs the peak memory allocated by Python in each conversion stage of each document "
+                             "(validation, parse, initialize, add_metadata, add_regions, serialization) with "
+                             "tracemalloc, together with the top allocation sites. This turns the pipeline "
+                             "single-threaded: the stages of all worker threads, including the speculative "
+                             "validation, run one at a time and considerably slower while enabled.")
+    parser.add_argument("--memory_top", type=int, default=10,
+                        help="Number of allocation sites logged per stage.")
+    return parser
+
+
+def add_pipeline_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--queue_size", type=int, default=16,
+                        help="Maximum number of files waiting in front of each stage.")
+    parser.add_argument("--parse_workers", type=int, default=1,
+                        help="Number of threads validating and parsing the input files.")
+    parser.add_argument("--convert_workers", type=int, default=1,
+                        help="Number of threads converting the parsed files.")
+    parser.add_argument("--serialize_workers", type=int, default=1,
+                        help="Number of threads serializing the converted documents.")
+    parser.add_argument("--max_in_flight", type=int, default=16,
+                        help="Maximum number of documents which are written into the sinks at the same time.")
+    parser.add_argument("--io_threads", type=int, default=8,
+                        help="Number of threads executing the blocking file and database writes.")
+    parser.add_argument("--metrics_interval", type=float, default=30,
+                        help="Seconds between two log entries of the queue depths. A queue which is constantly full "
+                             "is in front of the bottleneck stage.")
+    return parser
+
+
+def add_metrics_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--metrics_port", type=int, default=None,
+                        help="Serves metrics in the Prometheus text format on http://<metrics_host>:<port>/metrics: "
+                             "converted and failed files, input and output bytes, p50/p95/p99 duration of each "
+                             "conversion stage, queue depths and the duration of the writes into the sinks.")
+    parser.add_argument("--metrics_host", type=str, default="127.0.0.1",
+                        help="Address the metrics endpoint listens on. Default: localhost only.")
+    parser.add_argument("--metrics_textfile", type=str, default=None,
+                        help="Writes the metrics into this file for the textfile collector of the Prometheus node "
+                             "exporter. The file name has to end with .prom.")
+    parser.add_argument("--metrics_textfile_interval", type=float, default=15,
+                        help="Seconds between two writes of the metrics textfile.")
+    return parser
+
+
+def add_diagnostics_args(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--sampling_seconds", type=float, default=30,
+                        help="kill -USR2 <pid> samples the stacks of all threads for this number of seconds and writes "
+                             "a report into --profile_dir, a second kill -USR2 stops it early. kill -USR1 <pid> logs "
+                             "the stacks of all threads with the file and stage they are converting.")
+    parser.add_argument("--sampling_interval", type=float, default=0.005,
+                        help="Seconds between two samples of the sampling profiler.")
+    return parser
@@ -0,0 +1,167 @@
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from converter import stage_hooks
+
+# (filename, first line, name) of a function
+Function = Tuple[str, int, str]
+
+
+def _function(frame: FrameType) -> Function:
+    return frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name
+
+
+def _format_function(function: Function) -> str:
+    filename, line, name = function
+    return name + " (" + filename + ":" + str(line) + ")"
+
+
+def _thread_names() -> Dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+
+def dump_threads() -> str:
+    """
+    :return: the stack of each thread, together with the file and the conversion stage the thread is in
+    """
+    names: Dict[int, str] = _thread_names()
+    stages: Dict[int, Tuple[str, str]] = stage_hooks.current_stages()
+    sections: List[str] = []
+    for thread_id, frame in sys._current_frames().items():
+        header: str = "thread [" + names.get(thread_id, str(thread_id)) + "]"
+        if thread_id in stages:
+            filepath, stage_name = stages[thread_id]
+            header += " in stage [" + stage_name + "] of [" + filepath + "]"
+        sections.append(header + ":\n" + "".join(traceback.format_stack(frame)))
+    return "\n".join(sections)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every interval seconds. Unlike cProfile, it can be started in a running process
+    and profiles all threads, at the cost of only seeing where the threads are at the sampled moments.
+    stop() writes two files into output_dir: sampling-<time>.txt lists the functions by the share of samples in which
+    they are on the stack (cumulative) or on top of it (self), sampling-<time>.folded contains the sampled stacks in
+    the folded format of flamegraph.pl and speedscope, with the thread name and the conversion stage as root frames.
+    """
+    _output_dir: str
+    _interval: float
+    _top: int
+    _lock: threading.Lock
+    _stop_event: Optional[threading.Event]
+    _thread: Optional[threading.Thread]
+
+    def __init__(self, output_dir: str, interval: float = 0.005, top: int = 30):
+        """
+        :param interval: seconds between two samples
+        :param top: number of functions in the report
+        """
+        self._output_dir = output_dir
+        self._interval = interval
+        self._top = top
+        self._lock = threading.Lock()
+        self._stop_event = None
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def toggle(self, seconds: float):
+        """
+        Starts sampling for the given number of seconds, or stops a running sampling early.
+        """
+        with self._lock:
+            if self.running:
+                self._stop_event.set()
+                return
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(seconds, self._stop_event), name="sampler",
+                                            daemon=True)
+            self._thread.start()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, seconds: float, stop_event: threading.Event):
+        logger.info("sampling the stacks of all threads for " + str(seconds) + " seconds")
+        start: float = time.perf_counter()
+        stacks: Counter = Counter()
+        samples: int = 0
+        while not stop_event.wait(self._interval) and time.perf_counter() - start < seconds:
+            self._sample(stacks)
+            samples += 1
+        self._write_report(stacks, samples, time.perf_counter() - start)
+
+    def _sample(self, stacks: Counter):
+        names: Dict[int, str] = _thread_names()
+        stages: Dict[int, Tuple[str, str]] = stage_hooks.current_stages()
+        own_thread_id: int = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            functions: List[Function] = []
+            while frame is not None:
+                functions.append(_function(frame))
+                frame = frame.f_back
+            functions.reverse()
+            stage_name: Optional[str] = stages[thread_id][1] if thread_id in stages else None
+            stacks[(names.get(thread_id, str(thread_id)), stage_name, tuple(functions))] += 1
+
+    def _write_report(self, stacks: Counter, samples: int, duration: float):
+        cumulative: Counter = Counter()
+        own: Counter = Counter()
+        for (_, _, functions), count in stacks.items():
+            # recursive functions count once per sample
+            for function in set(functions):
+                cumulative[function] += count
+            if functions:
+                own[functions[-1]] += count
+        thread_samples: int = max(sum(stacks.values()), 1)
+
+        os.makedirs(self._output_dir, exist_ok=True)
+        path: str = os.path.join(self._output_dir, "sampling-" + time.strftime("%Y%m%d-%H%M%S"))
+        with open(path + ".txt", "w") as file:
+            file.write(str(samples) + " samples of all threads in " + format(duration, ".1f") + " seconds\n")
+            file.write("cumulative      self  function\n")
+            for function, count in cumulative.most_common(self._top):
+                file.write(format(100 * count / thread_samples, "9.1f") + "% " +
+                           format(100 * own[function] / thread_samples, "8.1f") + "%  " +
+                           _format_function(function) + "\n")
+        with open(path + ".folded", "w") as file:
+            for (thread_name, stage_name, functions), count in stacks.items():
+                frames: List[str] = [thread_name] + ([stage_name] if stage_name is not None else []) + \
+                                    [_format_function(function) for function in functions]
+                file.write(";".join(frame.replace(";", ":") for frame in frames) + " " + str(count) + "\n")
+        logger.info("wrote sampling profile into: [" + path + ".txt]")
+
+
+def install_signal_handlers(profiler: SamplingProfiler, sampling_seconds: float):
+    """
+    SIGUSR1 logs the stacks of all threads, SIGUSR2 starts or stops the sampling profiler.
+    The handlers only start a thread: they run in the main thread in between two bytecodes, logging directly could
+    deadlock on a lock held by the interrupted code.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        logger.warning("SIGUSR1 and SIGUSR2 are not available on this platform, the diagnostics are disabled")
+        return
+
+    def log_threads():
+        logger.info("stacks of all threads:\n" + dump_threads())
+
+    signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=log_threads, daemon=True).start())
+    signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=profiler.toggle,
+                                                                         args=(sampling_seconds,),
+                                                                         daemon=True).start())
+    logger.info("kill -USR1 " + str(os.getpid()) + " logs the stacks of all threads, kill -USR2 " + str(os.getpid()) +
+                " samples them for " + str(sampling_seconds) + " seconds")
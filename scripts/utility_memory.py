@@ -0,0 +1,84 @@
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from converter import stage_hooks
+from converter.stage_hooks import StageHook
+
+_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"))
+
+
+def _format_size(size: int) -> str:
+    return format(size / 1024, ".1f") + " KiB"
+
+
+class MemoryAccounting(StageHook):
+    """
+    Records the peak of the memory allocated by Python during each stage of a document with tracemalloc, and logs it
+    with the top allocation sites which are still allocated at the end of the stage. The peaks of all stages of a
+    document are summarized when the conversion of the document finishes or fails.
+    The traces are cleared when a stage starts. tracemalloc traces the whole process, therefore the stages run one at
+    a time while the accounting is enabled and the numbers of each stage belong to that stage only.
+    tracemalloc slows the conversion down considerably, it is meant for diagnosing single documents.
+    """
+    _top: int
+    _lock: threading.RLock
+    _peaks: Dict[str, Dict[str, int]]
+
+    def __init__(self, top: int = 10):
+        """
+        :param top: number of allocation sites logged per stage
+        """
+        self._top = top
+        self._lock = threading.RLock()
+        self._peaks = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def enter(self, filepath: str, stage_name: str):
+        self._lock.acquire()
+        tracemalloc.clear_traces()
+
+    def exit(self, filepath: str, stage_name: str):
+        try:
+            peak: int = tracemalloc.get_traced_memory()[1]
+            peaks: Dict[str, int] = self._peaks.setdefault(filepath, {})
+            # a stage may run more than once per document, e.g. the validation against several schemas
+            peaks[stage_name] = max(peak, peaks.get(stage_name, 0))
+            statistics: List[tracemalloc.Statistic] = \
+                tracemalloc.take_snapshot().filter_traces(_FILTERS).statistics("lineno")[:self._top]
+            logger.info("memory [" + filepath + "] stage [" + stage_name + "]: peak " + _format_size(peak) +
+                        ", top allocations: " + ", ".join(str(statistic.traceback[0]) + " " +
+                                                          _format_size(statistic.size) for statistic in statistics))
+        finally:
+            self._lock.release()
+
+    def finish(self, filepath: str):
+        with self._lock:
+            peaks: Optional[Dict[str, int]] = self._peaks.pop(filepath, None)
+        if peaks is not None:
+            logger.info("memory [" + filepath + "] peaks: " +
+                        ", ".join(name + "=" + _format_size(size) for name, size in peaks.items()))
+
+    def close(self):
+        tracemalloc.stop()
+
+
+_memory_accounting: Optional[MemoryAccounting] = None
+
+
+def set_memory_accounting(memory_accounting: Optional[MemoryAccounting]):
+    """
+    Enables the memory accounting of all stages. None disables it again.
+    """
+    global _memory_accounting
+    if _memory_accounting is not None:
+        stage_hooks.remove_hook(_memory_accounting)
+        _memory_accounting.close()
+    _memory_accounting = memory_accounting
+    if memory_accounting is not None:
+        stage_hooks.add_hook(memory_accounting)
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from loguru import logger
+
+from converter import stage_hooks
+from converter.stage_hooks import StageHook
+
+try:
+    import prometheus_client
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+
+def _require_prometheus_client():
+    if prometheus_client is None:
+        raise RuntimeError("The metrics require the prometheus_client package")
+
+
+class QueueDepthCollector:
+    """
+    Reads the queue depths of the pipeline whenever the metrics are collected.
+    """
+    _queue_depths: Callable[[], Dict[str, int]]
+
+    def __init__(self, queue_depths: Callable[[], Dict[str, int]]):
+        self._queue_depths = queue_depths
+
+    def collect(self) -> Iterator["GaugeMetricFamily"]:
+        gauge: GaugeMetricFamily = GaugeMetricFamily("converter_queue_depth",
+                                                     "Items waiting in front of a pipeline stage.", labels=["stage"])
+        for name, depth in self._queue_depths().items():
+            gauge.add_metric([name], depth)
+        yield gauge
+
+
+class ConverterMetrics(StageHook):
+    """
+    The metrics of convert-dir, kept in a prometheus_client registry of their own. As a stage hook, it measures the
+    duration of each conversion stage.
+    The metrics are exposed by serve() on a local http endpoint and / or by write_textfile() for the textfile collector
+    of the node exporter.
+    """
+    registry: "prometheus_client.CollectorRegistry"
+    files: "prometheus_client.Counter"
+    input_bytes: "prometheus_client.Counter"
+    output_bytes: "prometheus_client.Counter"
+    stage_duration: "prometheus_client.Histogram"
+    sink_write_duration: "prometheus_client.Histogram"
+    _starts: threading.local
+    _server: Optional[object]
+    _textfile_writer: Optional["TextfileWriter"]
+
+    def __init__(self):
+        _require_prometheus_client()
+        self.registry = prometheus_client.CollectorRegistry()
+        self.files = prometheus_client.Counter("converter_files", "Files by result of their conversion.", ["result"],
+                                               registry=self.registry)
+        self.input_bytes = prometheus_client.Counter("converter_input_bytes",
+                                                     "Size of the input files taken for conversion.",
+                                                     registry=self.registry)
+        self.output_bytes = prometheus_client.Counter("converter_output_bytes", "Size of the written output files.",
+                                                      ["sink"], registry=self.registry)
+        self.stage_duration = prometheus_client.Histogram("converter_stage_duration_seconds",
+                                                          "Duration of the conversion stages of a file.", ["stage"],
+                                                          registry=self.registry)
+        self.sink_write_duration = prometheus_client.Histogram("converter_sink_write_duration_seconds",
+                                                               "Duration of the write of a document into a sink, e.g. "
+                                                               "the database.", ["sink"], registry=self.registry)
+        self._starts = threading.local()
+        self._server = None
+        self._textfile_writer = None
+
+    def add_queue_depths(self, queue_depths: Callable[[], Dict[str, int]]):
+        """
+        :param queue_depths: returns the number of items waiting in front of each stage of the pipeline
+        """
+        self.registry.register(QueueDepthCollector(queue_depths))
+
+    def enter(self, filepath: str, stage_name: str):
+        if not hasattr(self._starts, "stack"):
+            self._starts.stack = []
+        self._starts.stack.append(time.perf_counter())
+
+    def exit(self, filepath: str, stage_name: str):
+        self.stage_duration.labels(stage_name).observe(time.perf_counter() - self._starts.stack.pop())
+
+    def observe_write(self, sink_name: str, seconds: float, written_bytes: Optional[int]):
+        """
+        A sinks.WriteObserver.
+        """
+        self.sink_write_duration.labels(sink_name).observe(seconds)
+        if written_bytes is not None:
+            self.output_bytes.labels(sink_name).inc(written_bytes)
+
+    def render(self) -> str:
+        """
+        :return: all metrics in the Prometheus text exposition format
+        """
+        return prometheus_client.generate_latest(self.registry).decode("utf-8")
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        self._server, _ = prometheus_client.start_http_server(port, host, self.registry)
+        logger.info("serving metrics on: [http://" + host + ":" + str(self.port) + "/metrics]")
+
+    @property
+    def port(self) -> Optional[int]:
+        """
+        :return: the port of the http endpoint, None if it is not served
+        """
+        return self._server.server_address[1] if self._server is not None else None
+
+    def write_textfile(self, path: str, interval: float):
+        self._textfile_writer = TextfileWriter(self.registry, path, interval)
+
+    def close(self):
+        """
+        Stops the http endpoint and writes the textfile a last time.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._textfile_writer is not None:
+            self._textfile_writer.close()
+
+
+class TextfileWriter:
+    """
+    Writes the metrics every interval seconds into a file for the textfile collector of the node exporter.
+    prometheus_client replaces the file atomically, the collector never reads a partial file.
+    """
+    _registry: "prometheus_client.CollectorRegistry"
+    _path: str
+    _stop_event: threading.Event
+    _thread: threading.Thread
+
+    def __init__(self, registry: "prometheus_client.CollectorRegistry", path: str, interval: float):
+        self._registry = registry
+        self._path = os.path.abspath(path)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="metrics-textfile", daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop_event.wait(interval):
+            self.write()
+
+    def write(self):
+        prometheus_client.write_to_textfile(self._path, self._registry)
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.write()
+
+
+_metrics: Optional[ConverterMetrics] = None
+
+
+def set_metrics(metrics: Optional[ConverterMetrics]):
+    """
+    Measures the conversion stages with the given metrics. None closes the current metrics.
+    """
+    global _metrics
+    if _metrics is not None:
+        stage_hooks.remove_hook(_metrics)
+        _metrics.close()
+    _metrics = metrics
+    if metrics is not None:
+        stage_hooks.add_hook(metrics)
@@ -0,0 +1,145 @@
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Optional
+
+from converter import stage_hooks
+from converter.stage_hooks import StageHook
+
+PER_FILE: str = "file"
+RUN: str = "run"
+MODES: List[str] = [PER_FILE, RUN]
+
+
+class Profiler(StageHook):
+    """
+    Profiles the conversion with cProfile. cProfile only profiles the thread which enabled it, therefore every
+    profiled block enables a profile of its own thread:
+    In PER_FILE mode, each block gets a new profile, the blocks of a file are added up in memory until the conversion
+    of the file finishes and are then written into <output_dir>/<filename>-<time>-<counter>.pstats, every conversion
+    therefore gets a profile of its own, even of files with the same name. In RUN mode, each thread keeps one profile
+    for all of its blocks, close() merges them into <output_dir>/run.pstats.
+    Next to each .pstats file, a .txt file lists the top functions by cumulative time.
+    """
+    _output_dir: str
+    _mode: str
+    _top: int
+    _lock: threading.Lock
+    _thread_profiles: Dict[int, cProfile.Profile]
+    _file_stats: Dict[str, pstats.Stats]
+    _counter: Iterator[int]
+
+    def __init__(self, output_dir: str, mode: str = PER_FILE, top: int = 30):
+        """
+        :param mode: PER_FILE or RUN
+        :param top: number of functions in the text summaries
+        """
+        if mode not in MODES:
+            raise ValueError("Unknown profile mode [" + mode + "], available modes are: " + str(MODES))
+        self._output_dir = output_dir
+        self._mode = mode
+        self._top = top
+        self._lock = threading.Lock()
+        self._thread_profiles = {}
+        self._file_stats = {}
+        self._counter = itertools.count(1)
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def profile(self, filepath: str) -> Iterator[None]:
+        """
+        :param filepath: the converted file, in PER_FILE mode the profile is written once finish(filepath) is called
+        """
+        profile: cProfile.Profile = self._get_profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if self._mode == PER_FILE:
+                self._add_to_file_profile(filepath, profile)
+
+    def _get_profile(self) -> cProfile.Profile:
+        if self._mode == PER_FILE:
+            return cProfile.Profile()
+        with self._lock:
+            return self._thread_profiles.setdefault(threading.get_ident(), cProfile.Profile())
+
+    def _add_to_file_profile(self, filepath: str, profile: cProfile.Profile):
+        with self._lock:
+            stats: Optional[pstats.Stats] = self._file_stats.get(filepath)
+            if stats is None:
+                self._file_stats[filepath] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+    def finish(self, filepath: str):
+        """
+        Writes the profile of the conversion of filepath in PER_FILE mode.
+        """
+        with self._lock:
+            stats: Optional[pstats.Stats] = self._file_stats.pop(filepath, None)
+            if stats is None:
+                return
+            name: str = os.path.basename(filepath) + "-" + time.strftime("%Y%m%d-%H%M%S") + "-" + \
+                str(next(self._counter))
+            self._write(stats, name)
+
+    def _path(self, name: str, extension: str) -> str:
+        return os.path.join(self._output_dir, name + extension)
+
+    def _write(self, stats: pstats.Stats, name: str):
+        stats.dump_stats(self._path(name, ".pstats"))
+        summary: io.StringIO = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+        with open(self._path(name, ".txt"), "w") as file:
+            file.write(summary.getvalue())
+
+    def close(self):
+        """
+        Writes the profile of the whole run in RUN mode. The profiled blocks have to be finished.
+        """
+        with self._lock:
+            profiles: List[cProfile.Profile] = list(self._thread_profiles.values())
+            self._thread_profiles = {}
+        if self._mode == RUN and profiles:
+            stats: pstats.Stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            with self._lock:
+                self._write(stats, "run")
+
+
+_profiler: Optional[Profiler] = None
+
+
+def set_profiler(profiler: Optional[Profiler]):
+    """
+    Enables the profiling of all profiled() blocks. None disables it again.
+    """
+    global _profiler
+    if _profiler is not None:
+        stage_hooks.remove_hook(_profiler)
+    _profiler = profiler
+    if profiler is not None:
+        stage_hooks.add_hook(profiler)
+
+
+def profiled(filepath: str) -> ContextManager:
+    """
+    Profiles the block if a profiler is set, otherwise it costs a single check.
+    """
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.profile(filepath)
+
+
+def close_profiler():
+    if _profiler is not None:
+        _profiler.close()
@@ -0,0 +1,75 @@
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from converter.validator import reader
+from scripts.archives import ArchiveReader, ArchiveWriter
+
+script_dir = os.path.dirname(__file__)
+fixture_path: str = script_dir + "/fixtures/page-xml/2017-07-15/type/border-type.xml"
+
+
+class TestArchives(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(fixture_path, "rb") as file:
+            self.content: bytes = file.read()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_zip_members_are_converted(self):
+        with zipfile.ZipFile(self.path("in.zip"), "w") as archive:
+            archive.writestr("pages/0001.xml", self.content)
+            archive.writestr("pages/0001.jpg", b"")
+        self.assert_members_are_converted(self.path("in.zip"))
+
+    def test_tar_members_are_converted(self):
+        with tarfile.open(self.path("in.tar.gz"), "w:gz") as archive:
+            info = tarfile.TarInfo("pages/0001.xml")
+            info.size = len(self.content)
+            archive.addfile(info, io.BytesIO(self.content))
+        self.assert_members_are_converted(self.path("in.tar.gz"))
+
+    def test_zip_members_with_unsafe_names_are_skipped(self):
+        with zipfile.ZipFile(self.path("in.zip"), "w") as archive:
+            archive.writestr("pages/0001.xml", self.content)
+            archive.writestr("../../evil.xml", self.content)
+            archive.writestr("pages/../../evil.xml", self.content)
+            archive.writestr(zipfile.ZipInfo("/tmp/evil.xml"), self.content)
+        self.assert_members_are_converted(self.path("in.zip"))
+
+    def test_tar_members_with_unsafe_names_are_skipped(self):
+        with tarfile.open(self.path("in.tar"), "w") as archive:
+            for name in ["../../evil.xml", "pages/0001.xml", "/tmp/evil.xml", "pages\\..\\..\\evil.xml"]:
+                info = tarfile.TarInfo(name)
+                info.size = len(self.content)
+                archive.addfile(info, io.BytesIO(self.content))
+        self.assert_members_are_converted(self.path("in.tar"))
+
+    def assert_members_are_converted(self, archive_path: str):
+        archive_reader = ArchiveReader(archive_path)
+        incoming_files = list(archive_reader)
+        assert [incoming_file.name for incoming_file in incoming_files] == [archive_path + "/pages/0001.xml"]
+        document = reader.handle_incoming_file(incoming_files[0])
+        archive_reader.close()
+        assert document is not None
+
+    def test_writer(self):
+        for filename in ["out.zip", "out.tar"]:
+            writer = ArchiveWriter(self.path(filename))
+            writer.write("pages/0001.xml.json", b"{}")
+            writer.close()
+            if filename.endswith(".zip"):
+                with zipfile.ZipFile(self.path(filename)) as archive:
+                    assert archive.read("pages/0001.xml.json") == b"{}"
+            else:
+                with tarfile.open(self.path(filename)) as archive:
+                    assert archive.extractfile("pages/0001.xml.json").read() == b"{}"
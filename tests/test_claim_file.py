@@ -0,0 +1,74 @@
+import os
+import tempfile
+import threading
+from typing import List, Optional
+from unittest import TestCase
+
+from scripts.utility import claim_file, lock_worker_dir
+
+
+class TestClaimFile(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir: str = self.tmp_dir.name
+        self.processing_dirs: List[str] = [os.path.join(self.input_dir, "processing", worker_id)
+                                           for worker_id in ("worker-a", "worker-b")]
+        for processing_dir in self.processing_dirs:
+            os.makedirs(processing_dir)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_input(self, filename: str, content: str) -> str:
+        filepath: str = os.path.join(self.input_dir, filename)
+        with open(filepath, "w") as file:
+            file.write(content)
+        return filepath
+
+    def test_exactly_one_concurrent_claimer_wins(self):
+        for index in range(50):
+            filepath: str = self.write_input(str(index) + ".xml", "page")
+            barrier = threading.Barrier(len(self.processing_dirs))
+            claimed: List[Optional[str]] = [None] * len(self.processing_dirs)
+
+            def claim(worker: int):
+                barrier.wait()
+                claimed[worker] = claim_file(filepath, self.processing_dirs[worker])
+
+            claimers = [threading.Thread(target=claim, args=(worker,)) for worker in range(len(self.processing_dirs))]
+            for claimer in claimers:
+                claimer.start()
+            for claimer in claimers:
+                claimer.join()
+
+            winners: List[str] = [claimed_filepath for claimed_filepath in claimed if claimed_filepath is not None]
+            assert len(winners) == 1
+            assert not os.path.exists(filepath)
+            with open(winners[0]) as file:
+                assert file.read() == "page"
+
+    def test_name_collision_is_renamed(self):
+        processing_dir: str = self.processing_dirs[0]
+        # e.g. a failed file which is kept in the processing dir
+        with open(os.path.join(processing_dir, "page.xml"), "w") as file:
+            file.write("failed")
+
+        first: str = claim_file(self.write_input("page.xml", "first"), processing_dir)
+        second: str = claim_file(self.write_input("page.xml", "second"), processing_dir)
+        assert first == os.path.join(processing_dir, "1-page.xml")
+        assert second == os.path.join(processing_dir, "2-page.xml")
+        for filename, content in [("page.xml", "failed"), ("1-page.xml", "first"), ("2-page.xml", "second")]:
+            with open(os.path.join(processing_dir, filename)) as file:
+                assert file.read() == content
+
+    def test_claimed_file_is_gone(self):
+        assert claim_file(os.path.join(self.input_dir, "missing.xml"), self.processing_dirs[0]) is None
+
+    def test_second_watcher_is_refused(self):
+        state_dir: str = os.path.join(self.processing_dirs[0], ".worker")
+        lock = lock_worker_dir(state_dir)
+        with self.assertRaises(RuntimeError):
+            lock_worker_dir(state_dir)
+        lock.close()
+        lock_worker_dir(state_dir).close()
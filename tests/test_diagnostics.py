@@ -0,0 +1,52 @@
+import glob
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from converter.stage_hooks import stage
+
+from scripts.utility_diagnostics import SamplingProfiler, dump_threads
+
+
+def busy_converting(started: threading.Event, stop: threading.Event):
+    with stage("busy.xml", "add_regions"):
+        started.set()
+        while not stop.is_set():
+            sum(range(1000))
+
+
+class TestDiagnostics(TestCase):
+
+    def setUp(self):
+        self.started = threading.Event()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=busy_converting, args=(self.started, self.stop), name="convert-0")
+        self.thread.start()
+        self.started.wait()
+
+    def tearDown(self):
+        self.stop.set()
+        self.thread.join()
+
+    def test_dump_threads_with_stage(self):
+        dump: str = dump_threads()
+        self.assertIn("thread [convert-0] in stage [add_regions] of [busy.xml]:", dump)
+        self.assertIn("in busy_converting", dump)
+
+    def test_sampling_profiler_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler: SamplingProfiler = SamplingProfiler(tmp_dir, interval=0.001)
+            profiler.toggle(60)
+            self.assertTrue(profiler.running)
+            time.sleep(0.2)
+            # a second toggle stops the sampling early
+            profiler.toggle(60)
+            profiler.join()
+            self.assertFalse(profiler.running)
+
+            with open(glob.glob(os.path.join(tmp_dir, "sampling-*.txt"))[0]) as file:
+                self.assertIn("busy_converting", file.read())
+            with open(glob.glob(os.path.join(tmp_dir, "sampling-*.folded"))[0]) as file:
+                self.assertTrue(any(line.startswith("convert-0;add_regions;") for line in file))
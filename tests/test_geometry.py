@@ -0,0 +1,92 @@
+import json
+import math
+import os
+import tempfile
+from unittest import TestCase, skipIf
+
+from converter import geometry
+from converter.elements import ConversionOptions
+from converter.validator.reader import handle_incoming_file, set_conversion_options
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+script_dir = os.path.dirname(__file__)
+
+
+def convert_simplified(fixture: str, original: str, replacement: str, tolerance: float) -> dict:
+    """
+    Converts the fixture with the given part replaced, e.g. with other points.
+    """
+    with open(script_dir + "/fixtures/page-xml/" + fixture) as file:
+        content: str = file.read()
+    assert original in content
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath: str = os.path.join(tmp_dir, os.path.basename(fixture))
+        with open(filepath, "w") as file:
+            file.write(content.replace(original, replacement))
+        set_conversion_options(ConversionOptions(simplify_tolerance=tolerance))
+        try:
+            return json.loads(json.dumps(handle_incoming_file(filepath).to_dict()))
+        finally:
+            set_conversion_options(ConversionOptions())
+
+
+@skipIf(numpy is None, "numpy is not installed")
+class TestSimplify(TestCase):
+
+    def test_polyline_keeps_corners(self):
+        points = [(x, 0) for x in range(0, 100)] + [(100, y) for y in range(0, 100)]
+        assert geometry.simplify(points, 1, closed=False) == [(0, 0), (100, 0), (100, 99)]
+
+    def test_polygon_stays_within_tolerance(self):
+        circle = [(int(500 + 400 * math.cos(angle / 100)), int(500 + 400 * math.sin(angle / 100)))
+                  for angle in range(0, 628)]
+        simplified = geometry.simplify(circle, 2)
+        assert 3 <= len(simplified) < len(circle) / 5
+        assert simplified[0] == circle[0]
+        assert all(point in circle for point in simplified)
+
+    def test_short_lists_are_unchanged(self):
+        assert geometry.simplify([(0, 0), (1, 0), (1, 1)], 10) == [(0, 0), (1, 0), (1, 1)]
+
+    def test_conversion_reports_reduction(self):
+        filepath: str = script_dir + "/fixtures/page-xml/2017-07-15/region/text-region/text-region-with-text-line.xml"
+        unchanged: dict = handle_incoming_file(filepath).to_dict()
+        set_conversion_options(ConversionOptions(simplify_tolerance=0))
+        try:
+            simplified: dict = handle_incoming_file(filepath).to_dict()
+        finally:
+            set_conversion_options(ConversionOptions())
+        assert simplified["meta"][:-1] == unchanged["meta"]
+        assert simplified["meta"][-1]["data"]["simplification"]["points"] > 0
+        assert simplified["content"] == unchanged["content"]
+
+    def test_collinear_baseline_is_simplified(self):
+        dct: dict = convert_simplified("2017-07-15/region/text-region/text-region-with-text-line.xml",
+                                       "<pc:Baseline points=\"123,456 123,456\"/>",
+                                       "<pc:Baseline points=\"0,10 10,10 20,10 30,10 40,10\"/>", 1)
+        baselines = [content["points"] for content in dct["content"] if content["otype"] == "baseline"]
+        assert baselines == [[[0, 10], [40, 10]]]
+
+    def test_grid_points_are_not_simplified(self):
+        dct: dict = convert_simplified("2019-07-15/region/map-custom-table-region.xml",
+                                       "<pc:GridPoints index=\"0\" points=\"0,0 100,0\"/>",
+                                       "<pc:GridPoints index=\"0\" points=\"0,0 50,0 100,0\"/>", 1)
+        grids = [content["data"]["grid"] for content in dct["content"]
+                 if content["otype"] == "meta" and "grid" in content["data"]]
+        assert grids == [[[[0, 0], [50, 0], [100, 0]], [[0, 100], [100, 100]]]]
+        # only the region polygons are counted
+        simplification: dict = dct["meta"][-1]["data"]["simplification"]
+        polygons = [content["polygon"] for content in dct["content"] if content["otype"] == "region"]
+        assert simplification["points"] == sum(len(polygon) for polygon in polygons)
+
+    def test_polygon_features(self):
+        bounding_boxes, areas, centroids = geometry.polygon_features([[(0, 0), (4, 0), (4, 2), (0, 2)],
+                                                                      [(1, 1), (3, 3)],
+                                                                      [(0, 0), (6, 0), (0, 6)]])
+        assert bounding_boxes == [[0, 0, 4, 2], [1, 1, 3, 3], [0, 0, 6, 6]]
+        assert areas == [8, 0, 18]
+        assert centroids == [[2, 1], [2, 2], [2, 2]]
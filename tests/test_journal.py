@@ -0,0 +1,77 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from database.journal import ProcessingJournal
+
+
+class TestProcessingJournal(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal_path: str = os.path.join(self.tmp_dir.name, "journal.sqlite")
+        self.journal = ProcessingJournal(self.journal_path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp_dir.cleanup()
+
+    def test_in_flight_survives_restart(self):
+        self.journal.start("a.xml")
+        self.journal.start("b.xml")
+        self.journal.complete_step("a.xml", "db")
+        self.journal.finish("b.xml")
+        self.journal.close()
+
+        self.journal = ProcessingJournal(self.journal_path)
+        assert self.journal.in_flight() == ["a.xml"]
+        assert self.journal.completed_steps("a.xml") == {"db"}
+
+    def test_resume_keeps_completed_steps(self):
+        self.journal.start("a.xml")
+        self.journal.complete_step("a.xml", "log")
+        self.journal.resume("a.xml")
+        assert self.journal.completed_steps("a.xml") == {"log"}
+
+    def test_reclaimed_failed_file_starts_over(self):
+        self.journal.start("a.xml")
+        self.journal.complete_step("a.xml", "log")
+        self.journal.fail("a.xml")
+        # e.g. the failed file was moved back into the input dir and claimed again
+        self.journal.start("a.xml")
+        assert self.journal.state("a.xml") == ProcessingJournal.STARTED
+        assert self.journal.completed_steps("a.xml") == set()
+        assert self.journal.in_flight() == ["a.xml"]
+
+    def test_failed_files_are_not_resumed(self):
+        self.journal.start("a.xml")
+        self.journal.fail("a.xml")
+        assert self.journal.in_flight() == []
+
+    def test_resume_keeps_claim_and_output(self):
+        self.journal.start("a.xml")
+        claim_id: str = self.journal.claim_id("a.xml")
+        assert self.journal.reserve_output("a.xml", lambda reserved: "a.json") == "a.json"
+        self.journal.close()
+
+        self.journal = ProcessingJournal(self.journal_path)
+        self.journal.resume("a.xml")
+        assert self.journal.claim_id("a.xml") == claim_id
+        assert self.journal.reserve_output("a.xml", lambda reserved: "other.json") == "a.json"
+
+        # a new claim of the same path is a new document
+        self.journal.start("a.xml")
+        assert self.journal.claim_id("a.xml") != claim_id
+        assert self.journal.reserve_output("a.xml", lambda reserved: "b.json") == "b.json"
+
+    def test_source_path_is_kept_on_resume(self):
+        self.journal.start("processing/worker/1-a.xml", "input/a.xml")
+        self.journal.resume("processing/worker/1-a.xml")
+        assert self.journal.source_path("processing/worker/1-a.xml") == "input/a.xml"
+        assert self.journal.source_path("unknown.xml") is None
+
+    def test_reserved_outputs_are_passed_on(self):
+        self.journal.start("a.xml")
+        self.journal.start("b.xml")
+        self.journal.reserve_output("a.xml", lambda reserved: "page.json")
+        assert self.journal.reserve_output("b.xml", lambda reserved: str(sorted(reserved))) == "['page.json']"
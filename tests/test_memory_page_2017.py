@@ -0,0 +1,43 @@
+import gc
+import os
+import tracemalloc
+import weakref
+from unittest import TestCase
+
+from converter.elements import ConversionContext
+from converter.validator import reader
+
+script_dir = os.path.dirname(__file__)
+local_fixture_path: str = "/fixtures/page-xml/2017-07-15/region"
+
+# generous upper bound for the small fixtures, a file which keeps its input alive or copies it several times exceeds it
+MAX_PEAK_ALLOCATION_PER_FILE: int = 1024 * 1024
+
+
+def measure_peak_allocation(xml_path: str) -> int:
+    # the first conversion warms up the lazily loaded pyxb and loguru state which is not allocated per file
+    reader.handle_incoming_file(xml_path)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        reader.handle_incoming_file(xml_path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestMemory(TestCase):
+
+    def test_input_is_released_after_conversion(self):
+        context: ConversionContext = reader.prepare_incoming_file(
+            script_dir + local_fixture_path + "/text-region/text-region-with-text-line.xml")
+        tmp_type = weakref.ref(context.converter_document.tmp_type)
+        context.convert()
+        gc.collect()
+        assert context.converter_document.original is None
+        assert tmp_type() is None
+
+    def test_peak_allocation_per_file(self):
+        for xml_path in ["/text-region/text-region-with-text-line.xml", "/image-region/nested-image-region.xml"]:
+            peak: int = measure_peak_allocation(script_dir + local_fixture_path + xml_path)
+            assert peak < MAX_PEAK_ALLOCATION_PER_FILE, xml_path + " allocated " + str(peak) + " bytes"
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import urllib.request
+from argparse import Namespace
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from converter.stage_hooks import stage
+
+from scripts import utility, utility_metrics
+from scripts.utility_metrics import ConverterMetrics, set_metrics
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+
+class TestMetrics(TestCase):
+
+    @skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_exposed_metrics_measure_stages(self):
+        metrics: ConverterMetrics = ConverterMetrics()
+        metrics.add_queue_depths(lambda: {"parse": 3})
+        metrics.serve(0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            textfile: str = os.path.join(tmp_dir, "converter.prom")
+            metrics.write_textfile(textfile, 60)
+            set_metrics(metrics)
+            try:
+                with stage("file.xml", "add_regions"):
+                    pass
+                metrics.files.labels("converted").inc()
+                metrics.observe_write("file", 0.01, 1024)
+                url: str = "http://127.0.0.1:" + str(metrics.port) + "/metrics"
+                with urllib.request.urlopen(url) as response:
+                    content: str = response.read().decode("utf-8")
+            finally:
+                set_metrics(None)
+            self.assertIn("converter_stage_duration_seconds_count{stage=\"add_regions\"} 1.0", content)
+            self.assertIn("converter_files_total{result=\"converted\"} 1.0", content)
+            self.assertIn("converter_output_bytes_total{sink=\"file\"} 1024.0", content)
+            self.assertIn("converter_sink_write_duration_seconds_bucket{le=\"0.01\",sink=\"file\"} 1.0", content)
+            self.assertIn("converter_queue_depth{stage=\"parse\"} 3.0", content)
+            # the textfile is written a last time on close
+            with open(textfile) as file:
+                self.assertEqual(metrics.render(), file.read())
+
+    @skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_metrics_are_only_collected_when_exposed(self):
+        args: Namespace = Namespace(metrics_port=None, metrics_host="127.0.0.1", metrics_textfile=None,
+                                    metrics_textfile_interval=60)
+        self.assertIsNone(utility.configure_metrics(args))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            args.metrics_textfile = os.path.join(tmp_dir, "converter.prom")
+            metrics: ConverterMetrics = utility.configure_metrics(args)
+            try:
+                with stage("file.xml", "parse"):
+                    pass
+            finally:
+                utility.close_metrics()
+            with open(args.metrics_textfile) as file:
+                self.assertIn("converter_stage_duration_seconds_count{stage=\"parse\"} 1.0", file.read())
+            # the closed metrics no longer measure the stages
+            with stage("file.xml", "parse"):
+                pass
+            self.assertIn("converter_stage_duration_seconds_count{stage=\"parse\"} 1.0", metrics.render())
+
+    def test_metrics_are_disabled_without_prometheus_client(self):
+        args: Namespace = Namespace(metrics_port=0, metrics_host="127.0.0.1", metrics_textfile=None,
+                                    metrics_textfile_interval=60)
+        with patch.object(utility_metrics, "prometheus_client", None):
+            self.assertIsNone(utility.configure_metrics(args))
+            with self.assertRaises(RuntimeError):
+                ConverterMetrics()
@@ -0,0 +1,63 @@
+import json
+import os
+from unittest import TestCase
+
+from converter.validator import reader
+from docrecjson.elements import Document
+
+script_dir = os.path.dirname(__file__)
+local_fixture_path: str = "/fixtures/page-xml/2019-07-15"
+
+
+def convert(xml_path: str) -> dict:
+    document: Document = reader.handle_incoming_file(script_dir + local_fixture_path + xml_path)
+    assert document is not None
+    return document.to_dict()
+
+
+class TestPage2019(TestCase):
+
+    def test_map_custom_and_table_region(self):
+        dct: dict = convert("/region/map-custom-table-region.xml")
+        assert dct["creators"][0]["version"] == "2019-07-15"
+
+        regions = [content for content in dct["content"] if content["otype"] == "region"]
+        assert [region["region_type"] for region in regions] == ["table", "map", "custom"]
+        assert regions[2]["region_subtype"] == "stamp"
+
+        grids = [content["data"]["grid"] for content in dct["content"]
+                 if content["otype"] == "meta" and "grid" in content["data"]]
+        # the grid rows are sorted by their index
+        assert json.loads(json.dumps(grids)) == [[[[0, 0], [100, 0]], [[0, 100], [100, 100]]]]
+
+        # the last point of a points string has no trailing space
+        polygons = json.loads(json.dumps([region["polygon"] for region in regions]))
+        assert polygons == [[[0, 0], [100, 0], [100, 100], [0, 100]],
+                            [[200, 200], [300, 200], [300, 300]],
+                            [[400, 400], [500, 400], [500, 500]]]
+
+    def test_metadata_item_and_labels(self):
+        dct: dict = convert("/type/metadata-item-labels-type.xml")
+        metadata = [meta["data"] for meta in dct["meta"]]
+
+        metadata_items = [data["metadataItem"] for data in metadata if "metadataItem" in data]
+        assert metadata_items[0]["name"] == "ocr"
+        assert metadata_items[0]["labels"] == [{"externalModel": "model",
+                                                "labels": [{"value": "label-value", "type": "label-type"}]}]
+        assert {"textStyle": {"fontFamily": "font"}} in metadata
+        assert {"labels": [{"prefix": "prefix", "labels": [{"value": "page-label"}]}]} in metadata
+
+    def test_reading_order_layers_and_relations(self):
+        dct: dict = convert("/type/reading-order-layers-relations-type.xml")
+        metadata: dict = {key: value for meta in dct["meta"] for key, value in meta["data"].items()}
+        text_1, text_2, image = [content["oid"] for content in dct["content"] if content["otype"] == "region"]
+
+        reading_order: dict = metadata["readingOrder"]
+        assert reading_order["ordered"] and reading_order["confidence"] == 0.5
+        # the elements of an ordered group are sorted by their index
+        assert [element.get("oid") for element in reading_order["elements"]] == [text_1, None, image]
+        assert reading_order["elements"][1]["elements"][0]["oid"] == text_2
+
+        assert metadata["layers"][0]["regions"][0]["oid"] == image
+        assert metadata["relations"][0]["source"]["oid"] == text_2
+        assert metadata["relations"][0]["target"]["oid"] == image
@@ -0,0 +1,82 @@
+import os
+import tempfile
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from database.parquet_export import ParquetExporter, flatten_document
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DOCUMENT: dict = {"content": [
+    {"otype": "region", "oid": 1, "group": 1, "region_type": "text", "region_subtype": "paragraph",
+     "polygon": [[1, 2], [3, 4]]},
+    {"otype": "baseline", "oid": 2, "group": 1, "points": [[5, 6]]},
+    {"otype": "text", "oid": 3, "group": 1, "text": "asdf"},
+    {"otype": "meta", "oid": 4, "group": 1, "data": {}},
+]}
+
+
+class TestParquetExport(TestCase):
+
+    def test_flatten_document(self):
+        tables = flatten_document("a.xml", DOCUMENT)
+        assert tables["regions"]["xs"] == [[1, 3]]
+        assert tables["regions"]["ys"] == [[2, 4]]
+        assert tables["lines"]["line_type"] == ["baseline"]
+        assert tables["text"] == {"document_id": ["a.xml"], "oid": [3], "group": [1], "text": ["asdf"]}
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_flushes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exporter = ParquetExporter(tmp_dir, row_group_size=2, flush_interval=60)
+            first = exporter.write("0.xml", DOCUMENT)
+            # a full row group is flushed right away into a complete file
+            second = exporter.write("1.xml", DOCUMENT)
+            second.result(timeout=10)
+            assert first.done()
+            third = exporter.write("2.xml", DOCUMENT)
+            assert not third.done()
+            exporter.close()
+            assert third.done()
+
+            files = sorted(os.listdir(os.path.join(tmp_dir, "regions")))
+            assert len(files) == 2
+            assert pyarrow.parquet.ParquetFile(os.path.join(tmp_dir, "regions", files[0])).metadata.num_rows == 2
+            regions = pyarrow.parquet.read_table(os.path.join(tmp_dir, "regions"))
+            assert sorted(regions.column("document_id").to_pylist()) == ["0.xml", "1.xml", "2.xml"]
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_flush_interval(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exporter = ParquetExporter(tmp_dir, row_group_size=1000, flush_interval=0.1)
+            exporter.write("0.xml", DOCUMENT).result(timeout=10)
+            assert len(os.listdir(os.path.join(tmp_dir, "text"))) == 1
+            exporter.close()
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_files_of_earlier_runs_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(2):
+                exporter = ParquetExporter(tmp_dir, flush_interval=60)
+                exporter.write("0.xml", DOCUMENT)
+                exporter.close()
+            assert pyarrow.parquet.read_table(os.path.join(tmp_dir, "lines")).num_rows == 2
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_interrupted_flush_leaves_readable_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exporter = ParquetExporter(tmp_dir, flush_interval=60)
+            exporter.write("0.xml", DOCUMENT)
+            exporter.close()
+            # the process dies before the temporary file is moved into place
+            exporter = ParquetExporter(tmp_dir, flush_interval=60)
+            with patch("os.replace", side_effect=OSError("killed")):
+                flushed = exporter.write("1.xml", DOCUMENT)
+                exporter.close()
+            self.assertIsInstance(flushed.exception(timeout=10), OSError)
+            assert len([filename for filename in os.listdir(os.path.join(tmp_dir, "regions"))
+                        if filename.startswith(".")]) == 1
+            assert pyarrow.parquet.read_table(os.path.join(tmp_dir, "regions")).num_rows == 1
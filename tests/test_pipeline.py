@@ -0,0 +1,112 @@
+import itertools
+import os
+import tempfile
+import threading
+import time
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from converter.validator import reader
+from converter.validator.incoming_file import IncomingFile
+from converter.validator.validation_cache import ValidationCache
+from scripts.pipeline import Pipeline, Stage, WorkItem, parse
+
+script_dir = os.path.dirname(__file__)
+
+
+class TestPipeline(TestCase):
+
+    def setUp(self):
+        self.errors: List[tuple] = []
+        self.results: List[int] = []
+
+    def on_error(self, item, stage_name: str, exception: Exception):
+        self.errors.append((item, stage_name, str(exception)))
+
+    def test_items_pass_all_stages_in_order(self):
+        stages = [Stage("double", lambda item: item * 2), Stage("collect", self.results.append)]
+        pipeline = Pipeline(range(100), stages, 4, self.on_error)
+        pipeline.run(60, stop_when_exhausted=True)
+        assert self.results == [item * 2 for item in range(100)]
+        assert self.errors == []
+
+    def test_failed_item_is_dropped(self):
+        def fail_on_odd(item: int) -> int:
+            if item % 2 == 1:
+                raise ValueError("odd")
+            return item
+
+        stages = [Stage("even", fail_on_odd, concurrency=2), Stage("collect", self.results.append)]
+        Pipeline(range(6), stages, 2, self.on_error).run(60, stop_when_exhausted=True)
+        assert sorted(self.results) == [0, 2, 4]
+        assert sorted(self.errors) == [(1, "even", "odd"), (3, "even", "odd"), (5, "even", "odd")]
+
+    def test_backpressure(self):
+        produced: List[int] = []
+        release = threading.Event()
+
+        def source():
+            for item in itertools.count():
+                produced.append(item)
+                yield item
+
+        pipeline = Pipeline(source(), [Stage("blocked", lambda item: release.wait())], 1, self.on_error)
+        pipeline.start()
+        time.sleep(0.2)
+        # one item in the stage, one in its queue and one waiting for the queue
+        assert len(produced) == 3
+        pipeline.stop()
+        release.set()
+
+    def test_stop(self):
+        pipeline = Pipeline(itertools.count(), [Stage("collect", self.results.append)], 1, self.on_error)
+        runner = threading.Thread(target=pipeline.run, args=(60,))
+        runner.start()
+        time.sleep(0.1)
+        pipeline.stop()
+        runner.join(10)
+        assert not runner.is_alive()
+        assert len(self.results) > 0
+
+    def test_failed_source_stops_the_pipeline(self):
+        def source():
+            yield 1
+            raise OSError("input dir is gone")
+
+        pipeline = Pipeline(source(), [Stage("collect", self.results.append)], 1, self.on_error)
+        with self.assertRaises(RuntimeError) as context:
+            pipeline.run(60)
+        assert isinstance(context.exception.__cause__, OSError)
+
+
+class TestParse(TestCase):
+
+    def setUp(self):
+        self.filepath: str = script_dir + "/fixtures/page-xml/2017-07-15/type/border-type.xml"
+
+    def parse(self, hash_input: bool) -> WorkItem:
+        item: WorkItem = WorkItem(self.filepath, incoming_file=IncomingFile(self.filepath))
+        with patch.object(item.incoming_file, "_compute_sha256",
+                          wraps=item.incoming_file._compute_sha256) as compute_sha256:
+            parse(None, item, hash_input)
+        self.hashes: int = compute_sha256.call_count
+        return item
+
+    def test_input_is_only_hashed_when_needed(self):
+        assert self.parse(hash_input=False).source_sha256 is None
+        assert self.hashes == 0
+        assert self.parse(hash_input=True).source_sha256 == reader.sha256_of_file(self.filepath)
+        assert self.hashes == 1
+
+    def test_hash_of_validation_cache_is_reused(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ValidationCache(os.path.join(tmp_dir, "validation.sqlite"))
+            reader.set_validation_cache(cache)
+            try:
+                assert self.parse(hash_input=False).source_sha256 == reader.sha256_of_file(self.filepath)
+                assert self.parse(hash_input=True).source_sha256 == reader.sha256_of_file(self.filepath)
+            finally:
+                reader.set_validation_cache(None)
+                cache.close()
+            assert self.hashes == 1
@@ -0,0 +1,103 @@
+import os
+import pstats
+import tempfile
+import threading
+from typing import List
+from unittest import TestCase
+
+from loguru import logger
+
+from converter.stage_hooks import stage, current_stages, finish
+
+from scripts.utility_memory import MemoryAccounting, set_memory_accounting
+from scripts.utility_profiling import Profiler, PER_FILE, RUN
+
+
+def work():
+    return sum(range(1000))
+
+
+class TestProfiler(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def count_calls(self, name: str) -> int:
+        stats: pstats.Stats = pstats.Stats(os.path.join(self.tmp_dir.name, name + ".pstats"))
+        return sum(calls for (_, _, function), (_, calls, _, _, _) in stats.stats.items() if function == "work")
+
+    def profile_names(self) -> List[str]:
+        return sorted(filename[:-len(".pstats")] for filename in os.listdir(self.tmp_dir.name)
+                      if filename.endswith(".pstats"))
+
+    def test_stages_of_a_file_are_added_up(self):
+        profiler: Profiler = Profiler(self.tmp_dir.name, PER_FILE, top=5)
+        for _ in range(2):
+            with profiler.profile("/input/page.xml"):
+                work()
+        assert self.profile_names() == []
+        profiler.finish("/input/page.xml")
+        names: List[str] = self.profile_names()
+        assert len(names) == 1 and names[0].startswith("page.xml-")
+        assert self.count_calls(names[0]) == 2
+        assert os.path.exists(os.path.join(self.tmp_dir.name, names[0] + ".txt"))
+
+    def test_each_conversion_gets_its_own_profile(self):
+        profiler: Profiler = Profiler(self.tmp_dir.name, PER_FILE)
+        # e.g. files with the same name in different directories, or the same file in another run
+        for filepath in ["/input/a/page.xml", "/input/b/page.xml", "/input/a/page.xml"]:
+            with profiler.profile(filepath):
+                work()
+            profiler.finish(filepath)
+        names: List[str] = self.profile_names()
+        assert len(names) == 3
+        assert [self.count_calls(name) for name in names] == [1, 1, 1]
+
+    def test_threads_are_merged_for_the_run(self):
+        profiler: Profiler = Profiler(self.tmp_dir.name, RUN)
+
+        def profile_work():
+            with profiler.profile("page.xml"):
+                work()
+
+        threads = [threading.Thread(target=profile_work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profiler.close()
+        assert self.count_calls("run") == 3
+
+
+class TestMemoryAccounting(TestCase):
+
+    def test_peak_per_stage(self):
+        messages: list = []
+        handler_id: int = logger.add(messages.append, format="{message}")
+        memory_accounting: MemoryAccounting = MemoryAccounting(top=3)
+        set_memory_accounting(memory_accounting)
+        try:
+            with stage("page.xml", "add_regions"):
+                assert list(current_stages().values()) == [("page.xml", "add_regions")]
+                allocated = [bytearray(1024) for _ in range(100)]
+            with stage("page.xml", "serialization"):
+                pass
+            finish("page.xml")
+            # a failed document is summarized as well
+            with self.assertRaises(ValueError), stage("failed.xml", "parse"):
+                raise ValueError()
+            finish("failed.xml")
+            remaining_peaks = len(memory_accounting._peaks)
+        finally:
+            set_memory_accounting(None)
+            logger.remove(handler_id)
+        assert current_stages() == {}
+        assert len(allocated) == 100
+        assert messages[0].startswith("memory [page.xml] stage [add_regions]: peak 1")
+        assert [message for message in messages if "peaks" in message][0].startswith(
+            "memory [page.xml] peaks: add_regions=1")
+        assert messages[-1].startswith("memory [failed.xml] peaks: parse=")
+        assert remaining_peaks == 0
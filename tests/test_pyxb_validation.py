@@ -0,0 +1,50 @@
+import threading
+from unittest import TestCase
+
+import pyxb
+
+from converter.strategies.generated.page_xml import py_xb_2017
+from converter.validator.pyxb_validation import validation_when_parsing
+
+# the Page element is missing the required imageFilename attribute
+UNVALIDATED_XML: str = """<?xml version="1.0" encoding="UTF-8"?>
+<pc:PcGts xmlns:pc="http://schema.primaresearch.org/PAGE/gts/pagecontent/2017-07-15">
+    <pc:Metadata>
+        <pc:Creator>pc:Creator</pc:Creator>
+        <pc:Created>2001-12-31T12:00:00</pc:Created>
+        <pc:LastChange>2001-12-31T12:00:00</pc:LastChange>
+    </pc:Metadata>
+    <pc:Page imageHeight="123" imageWidth="456"/>
+</pc:PcGts>"""
+
+
+class TestValidationWhenParsing(TestCase):
+
+    def test_unvalidated_parsing_is_restored(self):
+        with validation_when_parsing(False):
+            py_xb_2017.CreateFromDocument(UNVALIDATED_XML)
+        assert pyxb.GlobalValidationConfig.forBinding
+        with self.assertRaises(pyxb.ValidationError):
+            py_xb_2017.CreateFromDocument(UNVALIDATED_XML)
+
+    def test_unvalidated_parsing_is_limited_to_its_thread(self):
+        entered = threading.Event()
+        leave = threading.Event()
+        results = []
+
+        def parse_unvalidated():
+            with validation_when_parsing(False):
+                entered.set()
+                leave.wait(5)
+                results.append(py_xb_2017.CreateFromDocument(UNVALIDATED_XML))
+
+        thread = threading.Thread(target=parse_unvalidated)
+        thread.start()
+        entered.wait(5)
+        try:
+            with self.assertRaises(pyxb.ValidationError):
+                py_xb_2017.CreateFromDocument(UNVALIDATED_XML)
+        finally:
+            leave.set()
+            thread.join()
+        assert len(results) == 1
@@ -0,0 +1,143 @@
+import bz2
+import gzip
+import os
+import tempfile
+from unittest import TestCase
+
+from converter import stage_hooks
+from converter.stage_hooks import StageHook
+from converter.strategies.generated.page_xml import py_xb_2017
+from converter.validator.incoming_file import IncomingFile
+from converter.validator.reader import open_xml, create_from_xml, handle_incoming_file, \
+    handle_incoming_file_speculatively, handle_force_incoming_file
+
+LATIN_1_XML: str = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<pc:PcGts xmlns:pc="http://schema.primaresearch.org/PAGE/gts/pagecontent/2017-07-15">
+    <pc:Metadata>
+        <pc:Creator>pc:Creator</pc:Creator>
+        <pc:Created>2001-12-31T12:00:00</pc:Created>
+        <pc:LastChange>2001-12-31T12:00:00</pc:LastChange>
+        <pc:Comments>Größe</pc:Comments>
+    </pc:Metadata>
+    <pc:Page imageFilename="filename" imageHeight="123" imageWidth="456"/>
+</pc:PcGts>"""
+
+
+class ValidationCounter(StageHook):
+
+    def __init__(self):
+        self.count = 0
+
+    def enter(self, filepath: str, stage_name: str):
+        if stage_name == "validation":
+            self.count += 1
+
+
+class TestOpenXml(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, filename: str, content: bytes) -> str:
+        filepath: str = os.path.join(self.tmp_dir.name, filename)
+        with open(filepath, "wb") as file:
+            file.write(content)
+        return filepath
+
+    def test_encoding_is_taken_from_xml_declaration(self):
+        filepath: str = self.write("latin-1.xml", LATIN_1_XML.encode("latin-1"))
+        with open_xml(filepath) as xml:
+            pyxb_object = create_from_xml(py_xb_2017, xml)
+        assert pyxb_object.Metadata.Comments == "Größe"
+
+    def test_mapped_file_can_be_parsed_twice(self):
+        filepath: str = self.write("utf-8.xml", LATIN_1_XML.replace("ISO-8859-1", "UTF-8").encode("utf-8"))
+        with open_xml(filepath) as xml:
+            first = create_from_xml(py_xb_2017, xml)
+            second = create_from_xml(py_xb_2017, xml)
+        assert first.Page.imageFilename == second.Page.imageFilename == "filename"
+
+    def test_empty_file(self):
+        filepath: str = self.write("empty.xml", b"")
+        with open_xml(filepath) as xml:
+            assert xml == b""
+
+
+class TestSpeculativeConversion(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_result_as_sequential_conversion(self):
+        fixtures_dir: str = os.path.dirname(__file__) + "/fixtures/page-xml"
+        for filepath in [fixtures_dir + "/2017-07-15/type/border-type.xml",
+                         fixtures_dir + "/2019-07-15/region/map-custom-table-region.xml"]:
+            speculative = handle_incoming_file_speculatively(filepath).to_dict()
+            sequential = handle_incoming_file(filepath).to_dict()
+            assert [(content["otype"], content.get("region_type")) for content in speculative["content"]] == \
+                   [(content["otype"], content.get("region_type")) for content in sequential["content"]]
+            assert speculative["creators"][0] == sequential["creators"][0]
+
+    def test_invalid_file_is_discarded(self):
+        filepath: str = os.path.join(self.tmp_dir.name, "invalid.xml")
+        with open(filepath, "w") as file:
+            file.write(LATIN_1_XML.replace("<pc:Metadata>", "<pc:Bogus/><pc:Metadata>"))
+        validations: ValidationCounter = ValidationCounter()
+        stage_hooks.add_hook(validations)
+        try:
+            assert handle_incoming_file_speculatively(filepath) is None
+        finally:
+            stage_hooks.remove_hook(validations)
+        # the 2017 handler isn't asked again after the speculative validation failed
+        assert validations.count == 1
+
+
+class TestCompressedInput(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath: str = os.path.dirname(__file__) + "/fixtures/page-xml/2017-07-15/type/border-type.xml"
+        with open(self.filepath, "rb") as file:
+            self.content: bytes = file.read()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_result_as_uncompressed_file(self):
+        expected = handle_incoming_file(self.filepath).to_dict()
+        for extension, compress in [(".gz", gzip.compress), (".bz2", bz2.compress)]:
+            filepath: str = os.path.join(self.tmp_dir.name, "border-type.xml" + extension)
+            with open(filepath, "wb") as file:
+                file.write(compress(self.content))
+            incoming_file = IncomingFile(filepath)
+            assert incoming_file.compression is not None
+            assert incoming_file.sha256() == IncomingFile(self.filepath).sha256()
+            with incoming_file.stream() as stream:
+                assert stream.read() == self.content
+            assert [content["data"] for content in handle_incoming_file(filepath).to_dict()["meta"]] == \
+                   [content["data"] for content in expected["meta"]]
+
+
+class TestForcedConversion(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_invalid_file_is_parsed_leniently(self):
+        # the required Creator is missing
+        content: bytes = LATIN_1_XML.replace("<pc:Creator>pc:Creator</pc:Creator>", "").encode("latin-1")
+        for filename, file_content in [("invalid.xml", content), ("invalid.xml.gz", gzip.compress(content))]:
+            filepath: str = os.path.join(self.tmp_dir.name, filename)
+            with open(filepath, "wb") as file:
+                file.write(file_content)
+            document = handle_force_incoming_file(filepath, "page2017")
+            assert document.to_dict()["meta"][0]["data"] == {"LastChange": "2001-12-31 12:00:00"}
@@ -5,6 +5,7 @@ from unittest import TestCase
 from bson import json_util
 from deepdiff import DeepDiff
 
+from converter.elements import ConversionOptions
 from converter.validator import reader
 from docrecjson.elements import Document
 
@@ -16,6 +17,14 @@ def read_json(filepath: str):
         return json.loads(simple_image_region.read(), object_hook=json_util.object_hook)
 
 
+def geometry(dct: dict) -> list:
+    """
+    :return: the polygons and baselines of the content in document order, as json lists
+    """
+    return json.loads(json.dumps([(entry["otype"], entry.get("polygon", entry.get("points")))
+                                  for entry in dct["content"] if "polygon" in entry or "points" in entry]))
+
+
 def run_end_to_end_conversion(xml_path: str, json_path: str):
     """
     :param xml_path: path to your xml file as seen from /tests/fixtures/page-xml/2017-07-15/ e.g.
@@ -29,6 +38,7 @@ def run_end_to_end_conversion(xml_path: str, json_path: str):
     # .pop("creators") is necessary, because this application adds the current date as the last creator.
     ddiff = DeepDiff(document.to_dict().pop("creators"), manual_json.pop("creators"), ignore_order=True)
     assert ddiff == {}
+    assert geometry(document.to_dict()) == geometry(manual_json)
 
 
 class TestImageRegion(TestCase):
@@ -58,3 +68,17 @@ class TestTextRegion(TestCase):
     def test_text_region_with_text_style(self):
         xml_filepath: str = "/text-region/text-region-with-text-style.xml"
         run_end_to_end_conversion(xml_filepath, xml_filepath + ".json")
+
+    def test_text_line_words(self):
+        reader.set_conversion_options(ConversionOptions(convert_words=True))
+        try:
+            document: Document = reader.handle_incoming_file(
+                script_dir + "/fixtures/page-xml/2017-07-15/region/text-region/text-region-with-text-line.xml")
+        finally:
+            reader.set_conversion_options(ConversionOptions())
+        words: list = [content["data"]["words"] for content in document.to_dict()["content"]
+                       if content["otype"] == "meta" and "words" in content["data"]]
+        assert words == [{"id": ["identifier"], "text": ["asdf"], "confidence": [0.5], "pointOffsets": [0, 4],
+                          "points": [123, 456, 123, 456],
+                          "glyphs": {"id": ["id"], "text": [None], "confidence": [None], "pointOffsets": [0, 4],
+                                     "points": [123, 456, 123, 456], "word": [0]}}]
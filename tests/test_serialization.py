@@ -0,0 +1,39 @@
+import json
+import os
+from unittest import TestCase, skipIf
+
+from converter import serialization
+
+script_dir = os.path.dirname(__file__)
+
+
+@skipIf(serialization.msgpack is None, "msgpack is not installed")
+class TestMsgpack(TestCase):
+
+    def test_round_trip(self):
+        with open(script_dir + "/fixtures/page-xml/2017-07-15/region/text-region/text-region-with-text-line.xml.json") \
+                as file:
+            dct: dict = json.load(file)
+        dct["content"].append({"otype": "region", "oid": 100, "polygon": [[1, 2], [-3, 2 ** 31 - 1]]})
+        dct["content"].append({"otype": "region", "oid": 101, "polygon": [[1.5, 2], [3, 4]]})
+
+        content: bytes = serialization.dumps(dct, serialization.MSGPACK)
+        assert serialization.loads(content, serialization.MSGPACK) == dct
+        assert len(content) < len(serialization.dumps(dct, serialization.JSON))
+
+
+class TestGeometryProfiles(TestCase):
+
+    def test_round_trip(self):
+        with open(script_dir + "/fixtures/page-xml/2017-07-15/region/text-region/text-region-with-text-line.xml.json") \
+                as file:
+            dct: dict = json.load(file)
+        for profile in (serialization.FLAT, serialization.DELTA):
+            encoded: dict = serialization.encode_geometry(dct, profile)
+            assert encoded["geometry_profile"] == profile
+            assert all(isinstance(value, int) for value in encoded["content"][0]["polygon"])
+            assert serialization.decode_geometry(encoded) == dct
+            if serialization.msgpack is not None:
+                content: bytes = serialization.dumps(encoded, serialization.MSGPACK)
+                assert serialization.decode_geometry(serialization.loads(content, serialization.MSGPACK)) == dct
+        assert serialization.encode_geometry(dct, serialization.NESTED) is dct
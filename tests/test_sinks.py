@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Set
+from unittest import TestCase, skipIf
+
+from database.parquet_export import ParquetExporter
+from scripts.pipeline import WorkItem
+from scripts.sinks import AsyncSinkRunner, ParquetSink, Sink
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class RecordingSink(Sink):
+
+    def __init__(self, name: str, release: Optional[threading.Event] = None, fails: bool = False):
+        self.name = name
+        self.release = release
+        self.fails = fails
+        self.written: List[str] = []
+        self.closed = False
+
+    async def write(self, item: WorkItem):
+        if self.release is not None:
+            await self._run_blocking(self.release.wait)
+        if self.fails:
+            raise OSError("disk full")
+        self.written.append(item.filepath)
+
+    def close(self):
+        self.closed = True
+
+
+class TestAsyncSinkRunner(TestCase):
+
+    def setUp(self):
+        self.done_steps: List[tuple] = []
+        self.finished: List[tuple] = []
+
+    def on_sink_done(self, item: WorkItem, sink_name: str):
+        self.done_steps.append((item.filepath, sink_name, threading.current_thread().name))
+
+    def on_finished(self, item: WorkItem, exception: Optional[BaseException]):
+        self.finished.append((item.filepath, exception, threading.current_thread().name))
+
+    def test_submit_blocks_at_max_in_flight(self):
+        release = threading.Event()
+        sink = RecordingSink("file", release)
+        runner = AsyncSinkRunner([sink], max_in_flight=2, io_threads=4)
+        runner.submit(WorkItem("0.xml"), set())
+        runner.submit(WorkItem("1.xml"), set())
+        submitter = threading.Thread(target=runner.submit, args=(WorkItem("2.xml"), set()))
+        submitter.start()
+        submitter.join(0.2)
+        assert submitter.is_alive()
+        release.set()
+        submitter.join(10)
+        assert not submitter.is_alive()
+        runner.close()
+        assert sorted(sink.written) == ["0.xml", "1.xml", "2.xml"]
+
+    def test_failed_sink_is_retried_alone(self):
+        succeeding = RecordingSink("file")
+        failing = RecordingSink("sqlite", fails=True)
+        runner = AsyncSinkRunner([succeeding, failing], max_in_flight=2, io_threads=2)
+        future: Future = runner.submit(WorkItem("page.xml"), set(), self.on_sink_done, self.on_finished)
+        self.assertIsInstance(future.exception(10), OSError)
+        runner.drain()
+        assert [step[:2] for step in self.done_steps] == [("page.xml", "file")]
+        assert [(filepath, str(exception)) for filepath, exception, _ in self.finished] == [("page.xml", "disk full")]
+
+        # a resumed item is only written into the sinks which are not completed yet
+        failing.fails = False
+        completed_sinks: Set[str] = {sink_name for _, sink_name, _ in self.done_steps}
+        runner.submit(WorkItem("page.xml"), completed_sinks, self.on_sink_done, self.on_finished).result(10)
+        runner.close()
+        assert succeeding.written == ["page.xml"]
+        assert failing.written == ["page.xml"]
+        assert self.finished[-1][:2] == ("page.xml", None)
+
+    def test_callbacks_run_in_io_threads(self):
+        runner = AsyncSinkRunner([RecordingSink("file"), RecordingSink("log")], max_in_flight=2, io_threads=2)
+        runner.submit(WorkItem("page.xml"), set(), self.on_sink_done, self.on_finished).result(10)
+        runner.close()
+        thread_names: List[str] = [step[2] for step in self.done_steps] + [self.finished[0][2]]
+        assert len(thread_names) == 3
+        assert all(name.startswith("sink-io") for name in thread_names)
+
+    def test_close_waits_for_writes_and_callbacks(self):
+        release = threading.Event()
+        sink = RecordingSink("file", release)
+        runner = AsyncSinkRunner([sink], max_in_flight=4, io_threads=4)
+        for index in range(3):
+            runner.submit(WorkItem(str(index) + ".xml"), set(), on_finished=self.on_finished)
+        threading.Timer(0.1, release.set).start()
+        start: float = time.perf_counter()
+        runner.close()
+        assert time.perf_counter() - start >= 0.05
+        assert len(sink.written) == 3
+        assert len(self.finished) == 3
+        assert sink.closed
+
+
+class TestDocumentSinks(TestCase):
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_rows_keep_source_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            runner = AsyncSinkRunner([ParquetSink(ParquetExporter(tmp_dir, flush_interval=0))], max_in_flight=1,
+                                     io_threads=1)
+            item = WorkItem("processing/worker/1-page.xml", source_path="input/page.xml",
+                            dct={"content": [{"otype": "text", "oid": 1, "text": "asdf"}]})
+            runner.submit(item, set()).result(10)
+            runner.close()
+            text = pyarrow.parquet.read_table(os.path.join(tmp_dir, "text"))
+            assert text.column("document_id").to_pylist() == ["input/page.xml"]
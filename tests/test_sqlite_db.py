@@ -0,0 +1,55 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from database.sqlite_db import SQLiteStorage
+
+
+class TestSQLiteStorage(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path: str = os.path.join(self.tmp_dir.name, "documents.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_documents_survive_restart(self):
+        for compress in [True, False]:
+            storage = SQLiteStorage(self.path, compress=compress)
+            storage.insert("a.xml", "hash", "0.3", {"content": [{"otype": "region", "compress": compress}]})
+            storage.close()
+
+            storage = SQLiteStorage(self.path)
+            assert storage.get("a.xml") == {"content": [{"otype": "region", "compress": compress}]}
+            assert storage.get("b.xml") is None
+            storage.close()
+
+    def test_concurrent_inserts(self):
+        storage = SQLiteStorage(self.path, batch_size=4)
+        threads = [threading.Thread(target=storage.insert, args=(str(index) + ".xml", None, "0.3", {"index": index}))
+                   for index in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [storage.get(str(index) + ".xml")["index"] for index in range(32)] == list(range(32))
+        storage.close()
+
+    def test_submitted_documents_are_committed_together(self):
+        storage = SQLiteStorage(self.path, batch_size=4)
+        with patch.object(storage, "_commit", wraps=storage._commit) as commit:
+            # the first document is committed alone, the others queue up meanwhile
+            with storage._commit_lock:
+                futures = [storage.submit("0.xml", None, "0.3", {"index": 0})]
+                while storage._pending:
+                    pass
+                futures += [storage.submit(str(index) + ".xml", None, "0.3", {"index": index})
+                            for index in range(1, 10)]
+            for future in futures:
+                future.result(timeout=10)
+        assert [len(call.args[0]) for call in commit.call_args_list] == [1, 4, 4, 1]
+        assert storage.get("9.xml") == {"index": 9}
+        storage.close()
@@ -0,0 +1,19 @@
+import os
+from unittest import TestCase
+
+from converter.validator import reader
+
+script_dir = os.path.dirname(__file__)
+local_fixture_path: str = "/fixtures/page-xml/2017-07-15/type"
+
+
+class TestTypesPage2017(TestCase):
+
+    def test_relation_region_refs(self):
+        dct: dict = reader.handle_incoming_file(script_dir + local_fixture_path + "/relations-type.xml").to_dict()
+        relations: list = [meta["data"]["relations"] for meta in dct["meta"] if "relations" in meta["data"]][0]
+        regions: list = [content for content in dct["content"] if content["otype"] == "region"]
+        assert relations[0]["type"] == "join"
+        assert relations[0]["source"] == {"regionRef": "textRegion1", "oid": regions[0]["oid"],
+                                          "group": regions[0]["group"]}
+        assert relations[0]["target"]["oid"] == regions[1]["oid"]
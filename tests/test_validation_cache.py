@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from converter.validator import reader
+from converter.validator.incoming_file import IncomingFile
+from converter.validator.validation_cache import ValidationCache
+
+script_dir = os.path.dirname(__file__)
+
+
+class TestValidationCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path: str = os.path.join(self.tmp_dir.name, "validation.sqlite")
+
+    def tearDown(self):
+        reader.set_validation_cache(None)
+        self.tmp_dir.cleanup()
+
+    def test_result_survives_restart(self):
+        cache = ValidationCache(self.cache_path)
+        cache.put("input", "xsd", False, "error")
+        cache.close()
+
+        cache = ValidationCache(self.cache_path)
+        assert cache.get("input", "xsd") == (False, "error")
+        assert cache.get("input", "other xsd") is None
+        cache.close()
+
+    def test_expired_results_are_ignored(self):
+        cache = ValidationCache(self.cache_path, max_age=-1)
+        cache.put("input", "xsd", True, "")
+        assert cache.get("input", "xsd") is None
+        cache.close()
+
+    def test_oldest_results_are_evicted(self):
+        cache = ValidationCache(self.cache_path, max_entries=2, eviction_interval=4)
+        for index in range(3):
+            cache.put("input" + str(index), "xsd", True, "")
+        # the eviction only runs every eviction_interval puts
+        assert len(cache) == 3
+        cache.put("input3", "xsd", True, "")
+        assert len(cache) == 2
+        assert cache.get("input1", "xsd") is None
+        cache.close()
+
+    def test_file_is_hashed_once(self):
+        cache = ValidationCache(self.cache_path)
+        reader.set_validation_cache(cache)
+        incoming_file = IncomingFile(script_dir + "/fixtures/page-xml/2017-07-15/type/border-type.xml")
+        with patch.object(incoming_file, "_compute_sha256", wraps=incoming_file._compute_sha256) as compute_sha256:
+            # falls through the 2019 handler to the 2017 handler, both look up the cache
+            assert reader.handle_incoming_file(incoming_file) is not None
+            assert incoming_file.sha256() == reader.sha256_of_file(incoming_file.name)
+        assert compute_sha256.call_count == 1
+        cache.close()
+
+    def test_handler_uses_cached_result(self):
+        cache = ValidationCache(self.cache_path)
+        reader.set_validation_cache(cache)
+        filepath: str = script_dir + "/fixtures/page-xml/2017-07-15/type/border-type.xml"
+        handler = reader.PageXML2017Handler()
+        assert handler.is_instance_of(filepath)
+        assert len(cache) == 1
+
+        # a wrong cached result shows that the file is not validated again
+        cache.put(reader.sha256_of_file(filepath), reader._xsd_sha256(str(handler._VALIDATION_FILEPATH)), False, "")
+        assert not handler.is_instance_of(filepath)
+        cache.close()
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+from unittest import TestCase
+
+from converter.validator import reader
+from converter.validator.incoming_file import IncomingFile
+from converter.validator.validation_policy import ValidationPolicies, ValidationPolicy
+
+script_dir = os.path.dirname(__file__)
+
+
+class TestValidationPolicy(TestCase):
+
+    def tearDown(self):
+        reader.set_validation_policies(ValidationPolicies())
+
+    def test_longest_prefix_wins(self):
+        policies = ValidationPolicies.parse(["/data=never", "/data/partner=sample=1/10"])
+        assert policies.for_file("/data/internal/a.xml").mode == ValidationPolicy.NEVER
+        assert policies.for_file("/data/partner/a.xml").sample_size == 10
+        assert policies.for_file("/database/a.xml").mode == ValidationPolicy.ALWAYS
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            ValidationPolicies.parse(["/data=sample=2/10"])
+
+    def test_sample_is_stable_per_content(self):
+        policy = ValidationPolicy.parse("sample=1/4")
+        hashes = [hashlib.sha256(str(index).encode("utf-8")).hexdigest() for index in range(1000)]
+        sampled = [content_sha256 for content_sha256 in hashes if policy.should_validate(lambda: content_sha256)]
+        assert 150 < len(sampled) < 350
+        assert sampled == [other for other in hashes if policy.should_validate(lambda: other)]
+
+    def test_sample_ignores_the_claimed_filepath(self):
+        policy = ValidationPolicy.parse("sample=1/4")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            decisions = set()
+            for filename in ["page.xml", "processing/worker-a/page.xml", "processing/worker-b/3-page.xml"]:
+                filepath: str = os.path.join(tmp_dir, filename)
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                with open(filepath, "w") as file:
+                    file.write("<PcGts/>")
+                decisions.add(policy.should_validate(IncomingFile(filepath).sha256))
+            assert len(decisions) == 1
+
+    def test_never_skips_hashing(self):
+        def fail() -> str:
+            raise AssertionError("hashed")
+
+        assert not ValidationPolicy.parse("never").should_validate(fail)
+
+    def test_unvalidated_file_is_matched_by_namespace(self):
+        fixture_dir: str = script_dir + "/fixtures/page-xml/2017-07-15/type"
+        reader.set_validation_policies(ValidationPolicies.parse([fixture_dir + "=never"]))
+        filepath: str = fixture_dir + "/border-type.xml"
+        assert not reader.PageXML2019Handler().is_instance_of(filepath)
+        assert reader.PageXML2017Handler().is_instance_of(filepath)
+        assert reader.handle_incoming_file(filepath) is not None